@@ -0,0 +1,220 @@
+"""Module for caching release planning results between runs."""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional, Tuple
+
+from pagekey_semver.config import SemverConfig
+from pagekey_semver.models import ReleaseType
+
+
+# Bump when the schema changes - older caches are discarded.
+SCHEMA_VERSION = 1
+CACHE_FILE_NAME = "cache.sqlite3"
+# One range is stored per planned HEAD, so far fewer of them are kept than
+# commit classifications.
+RANGES_PER_ENTRY = 0.01
+# Commit hashes looked up per query, below SQLite's limit on query parameters.
+QUERY_BATCH_SIZE = 500
+
+
+class ReleaseCache:
+    """SQLite-backed cache of commit classifications.
+
+    Two kinds of entries are stored, both keyed by a hash of the prefix config
+    so that changing `prefixes` invalidates them:
+
+    - The classification of each commit (its ReleaseType and whether it matched a prefix).
+    - The ReleaseType of whole `base..head` ranges, which lets a later run only
+      read the commits added since a previously planned HEAD.
+
+    Entries are evicted least-recently-used first once `max_entries` is exceeded.
+    """
+
+    def __init__(self, path: str, config: SemverConfig):
+        """Open (or create) the cache database.
+
+        Args:
+            path: Path to the SQLite database file. Parent directories are created.
+            config: Semver application config. Its prefixes determine the cache key.
+        """
+        dirs = os.path.dirname(path)
+        if len(dirs) > 0:
+            os.makedirs(dirs, exist_ok=True)
+        self._max_entries = config.cache.max_entries
+        self._config_hash = hash_prefix_config(config)
+        self._connection = sqlite3.connect(path, timeout=10)
+        self._create_schema()
+
+    @staticmethod
+    def from_dir(cache_dir: str, config: SemverConfig) -> "ReleaseCache":
+        """Open the cache stored in a cache directory.
+
+        Args:
+            cache_dir: Directory holding the cache, usually from `GitManager.get_cache_dir`.
+            config: Semver application config.
+
+        Returns:
+            The opened ReleaseCache.
+        """
+        return ReleaseCache(os.path.join(cache_dir, CACHE_FILE_NAME), config)
+
+    def get_classifications(
+        self, commit_hashes: List[str]
+    ) -> Dict[str, Tuple[ReleaseType, bool]]:
+        """Look up previously stored commit classifications.
+
+        Runs one query per `QUERY_BATCH_SIZE` hashes, and marks the entries
+        found as used with a single statement.
+
+        Args:
+            commit_hashes: Full hashes of the commits.
+
+        Returns:
+            Tuple of (release type, whether a prefix matched) for each known commit hash.
+        """
+        classifications = {}
+        for start in range(0, len(commit_hashes), QUERY_BATCH_SIZE):
+            batch = commit_hashes[start : start + QUERY_BATCH_SIZE]
+            rows = self._connection.execute(
+                "SELECT commit_hash, release_type, matched FROM classifications"
+                f" WHERE config_hash = ? AND commit_hash IN ({', '.join('?' * len(batch))})",
+                (self._config_hash, *batch),
+            ).fetchall()
+            for commit_hash, release_type, matched in rows:
+                classifications[commit_hash] = ReleaseType(release_type), bool(matched)
+        now = time.time()
+        self._connection.executemany(
+            "UPDATE classifications SET used_at = ?"
+            " WHERE config_hash = ? AND commit_hash = ?",
+            [(now, self._config_hash, commit_hash) for commit_hash in classifications],
+        )
+        return classifications
+
+    def put_classifications(
+        self, classifications: List[Tuple[str, ReleaseType, bool]]
+    ) -> None:
+        """Store commit classifications with a single statement.
+
+        Args:
+            classifications: Tuples of (full commit hash, ReleaseType triggered
+                by the commit alone, whether the message started with a
+                configured prefix).
+        """
+        now = time.time()
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO classifications"
+            " (config_hash, commit_hash, release_type, matched, used_at)"
+            " VALUES (?, ?, ?, ?, ?)",
+            [
+                (self._config_hash, commit_hash, release_type.value, matched, now)
+                for commit_hash, release_type, matched in classifications
+            ],
+        )
+
+    def get_range(self, base: str, head: str) -> Optional[ReleaseType]:
+        """Look up the release type previously computed for `base..head`.
+
+        Args:
+            base: Commit hash of the last release tag, or "" for the whole history.
+            head: Commit hash of HEAD at the time.
+
+        Returns:
+            The ReleaseType for the range, or None if unknown.
+        """
+        row = self._connection.execute(
+            "SELECT release_type FROM ranges"
+            " WHERE config_hash = ? AND base = ? AND head = ?",
+            (self._config_hash, base, head),
+        ).fetchone()
+        if row is None:
+            return None
+        self._touch("ranges", "base = ? AND head = ?", (base, head))
+        return ReleaseType(row[0])
+
+    def get_range_heads(self, base: str, limit: int = 5) -> List[str]:
+        """List heads of cached ranges starting at `base`, most recently used first.
+
+        Args:
+            base: Commit hash of the last release tag, or "" for the whole history.
+            limit: Maximum number of heads to return.
+
+        Returns:
+            Commit hashes of previously planned heads.
+        """
+        rows = self._connection.execute(
+            "SELECT head FROM ranges WHERE config_hash = ? AND base = ?"
+            " ORDER BY used_at DESC LIMIT ?",
+            (self._config_hash, base, limit),
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def put_range(self, base: str, head: str, release_type: ReleaseType) -> None:
+        """Store the release type computed for `base..head`.
+
+        Args:
+            base: Commit hash of the last release tag, or "" for the whole history.
+            head: Commit hash of HEAD.
+            release_type: ReleaseType for all commits in the range.
+        """
+        self._connection.execute(
+            "INSERT OR REPLACE INTO ranges"
+            " (config_hash, base, head, release_type, used_at)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (self._config_hash, base, head, release_type.value, time.time()),
+        )
+
+    def close(self) -> None:
+        """Evict old entries, save changes, and close the database."""
+        self._evict("classifications", self._max_entries)
+        self._evict("ranges", max(1, int(self._max_entries * RANGES_PER_ENTRY)))
+        self._connection.commit()
+        self._connection.close()
+
+    def _create_schema(self) -> None:
+        (version,) = self._connection.execute("PRAGMA user_version").fetchone()
+        if version != SCHEMA_VERSION:
+            self._connection.execute("DROP TABLE IF EXISTS classifications")
+            self._connection.execute("DROP TABLE IF EXISTS ranges")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS classifications ("
+            " config_hash TEXT, commit_hash TEXT, release_type TEXT,"
+            " matched INTEGER, used_at REAL,"
+            " PRIMARY KEY (config_hash, commit_hash))"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS ranges ("
+            " config_hash TEXT, base TEXT, head TEXT, release_type TEXT, used_at REAL,"
+            " PRIMARY KEY (config_hash, base, head))"
+        )
+        self._connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._connection.commit()
+
+    def _touch(self, table: str, where: str, args: tuple) -> None:
+        self._connection.execute(
+            f"UPDATE {table} SET used_at = ? WHERE config_hash = ? AND {where}",
+            (time.time(), self._config_hash, *args),
+        )
+
+    def _evict(self, table: str, max_entries: int) -> None:
+        self._connection.execute(
+            f"DELETE FROM {table} WHERE rowid IN ("
+            f" SELECT rowid FROM {table} ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+            (max_entries,),
+        )
+
+
+def hash_prefix_config(config: SemverConfig) -> str:
+    """Hash the parts of the config that affect commit classification.
+
+    Args:
+        config: Semver application config.
+
+    Returns:
+        Hex digest that changes whenever the prefixes change.
+    """
+    prefixes = [prefix.model_dump() for prefix in config.prefixes]
+    return hashlib.sha256(json.dumps(prefixes).encode()).hexdigest()
@@ -0,0 +1,187 @@
+"""Module for the index of changelog sections."""
+
+from dataclasses import asdict, dataclass
+import hashlib
+import json
+import mmap
+import os
+from typing import Dict, Iterable, List, Optional
+
+from pagekey_semver.util.atomic_file import atomic_write
+
+
+# Bump when the file layout changes - older indexes are rebuilt.
+INDEX_FORMAT_VERSION = 2
+# Directory in the cache directory that holds the indexes.
+INDEX_DIR_NAME = "changelog-index"
+
+
+@dataclass
+class ChangelogSection:
+    """Location of one version's section in the changelog file."""
+
+    # The version name, as in the tag.
+    name: str
+    # Byte offset of the section from the start of the changelog.
+    offset: int
+    # Length of the section in bytes.
+    length: int
+
+
+class ChangelogIndex:
+    """Sidecar file mapping each version in the changelog to its byte range.
+
+    Stored in the cache directory (see `INDEX_DIR_NAME`) rather than next to
+    the changelog, so it is never committed. The index records the size and
+    modification time of the changelog it describes; if the changelog was
+    changed by something else, the index is treated as stale.
+    """
+
+    def __init__(
+        self,
+        changelog_path: str,
+        sections: Iterable[ChangelogSection] = (),
+        index_dir: Optional[str] = None,
+    ):
+        """Initialize the index.
+
+        Args:
+            changelog_path: Path to the changelog this index describes.
+            sections: Sections in file order.
+            index_dir: Directory to keep the index in. If None, the index is
+                never saved or loaded.
+        """
+        self._changelog_path = changelog_path
+        self._index_dir = index_dir
+        self._sections = list(sections)
+        self._by_name: Dict[str, ChangelogSection] = {
+            section.name: section for section in reversed(self._sections)
+        }
+
+    @property
+    def path(self) -> Optional[str]:
+        """Path to the index file, named after the changelog's absolute path."""
+        if self._index_dir is None:
+            return None
+        changelog_path = os.path.abspath(self._changelog_path)
+        digest = hashlib.sha256(changelog_path.encode()).hexdigest()[:16]
+        return os.path.join(
+            self._index_dir, f"{os.path.basename(changelog_path)}-{digest}.json"
+        )
+
+    @property
+    def sections(self) -> List[ChangelogSection]:
+        """Indexed sections, in file order."""
+        return self._sections
+
+    @staticmethod
+    def load(
+        changelog_path: str, index_dir: Optional[str] = None
+    ) -> Optional["ChangelogIndex"]:
+        """Load the index for a changelog, if it is present and up to date.
+
+        Args:
+            changelog_path: Path to the changelog.
+            index_dir: Directory the index is kept in.
+
+        Returns:
+            The index, or None if it is missing, unreadable, or stale.
+        """
+        index = ChangelogIndex(changelog_path, index_dir=index_dir)
+        if index.path is None:
+            return None
+        try:
+            with open(index.path, "r") as index_file:
+                data = json.load(index_file)
+            stat = os.stat(changelog_path)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get("format") != INDEX_FORMAT_VERSION:
+            return None
+        if (
+            data.get("changelog_size") != stat.st_size
+            or data.get("changelog_mtime_ns") != stat.st_mtime_ns
+        ):
+            return None
+        try:
+            sections = [ChangelogSection(**section) for section in data["sections"]]
+        except (KeyError, TypeError):
+            return None
+        return ChangelogIndex(changelog_path, sections, index_dir)
+
+    def find(self, name: str) -> Optional[ChangelogSection]:
+        """Look up a version's section.
+
+        Args:
+            name: The version name, e.g. "v1.2.0".
+
+        Returns:
+            The section, or None if the version is not indexed.
+        """
+        return self._by_name.get(name)
+
+    def prepend(self, name: str, length: int) -> None:
+        """Record a section added at the start of the changelog.
+
+        Args:
+            name: The version name.
+            length: Length of the new section in bytes.
+        """
+        for section in self._sections:
+            section.offset += length
+        section = ChangelogSection(name=name, offset=0, length=length)
+        self._sections.insert(0, section)
+        self._by_name[name] = section
+
+    def append(self, name: str, offset: int, length: int) -> None:
+        """Record a section added at the end of the changelog.
+
+        Args:
+            name: The version name.
+            offset: Byte offset of the section.
+            length: Length of the section in bytes.
+        """
+        section = ChangelogSection(name=name, offset=offset, length=length)
+        self._sections.append(section)
+        self._by_name.setdefault(name, section)
+
+    def save(self) -> None:
+        """Write the index, recording the changelog's current size and modification time.
+
+        Does nothing if the index has no directory to be kept in.
+        """
+        if self.path is None:
+            return
+        stat = os.stat(self._changelog_path)
+        data = {
+            "format": INDEX_FORMAT_VERSION,
+            "changelog_size": stat.st_size,
+            "changelog_mtime_ns": stat.st_mtime_ns,
+            "sections": [asdict(section) for section in self._sections],
+        }
+        os.makedirs(self._index_dir, exist_ok=True)
+        with atomic_write(self.path) as index_file:
+            json.dump(data, index_file, indent=1)
+            index_file.write("\n")
+
+    def read_section(self, name: str) -> Optional[str]:
+        """Read one version's section from the changelog without reading the rest.
+
+        Args:
+            name: The version name, e.g. "v1.2.0".
+
+        Returns:
+            The section text, or None if the version is not indexed.
+        """
+        section = self.find(name)
+        if section is None:
+            return None
+        if section.length == 0:
+            # Empty files cannot be memory-mapped.
+            return ""
+        with open(self._changelog_path, "rb") as changelog_file:
+            with mmap.mmap(
+                changelog_file.fileno(), 0, access=mmap.ACCESS_READ
+            ) as contents:
+                end = section.offset + section.length
+                return contents[section.offset : end].decode()
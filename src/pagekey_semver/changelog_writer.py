@@ -2,26 +2,42 @@
 
 from __future__ import annotations
 import abc
+import contextlib
+import mmap
 import os
-import tempfile
-from typing import List, TextIO
+import re
+import shutil
+from typing import Callable, Dict, Iterable, List, Optional, TextIO, Tuple, Union
 
+from pagekey_semver.changelog_index import ChangelogIndex, ChangelogSection
 from pagekey_semver.util.dynamic_import import dynamic_import
 from pagekey_semver.config import SemverConfig
-from pagekey_semver.models import Commit, Tag
+from pagekey_semver.models import ClassifiedCommits, Commit, Tag
+from pagekey_semver.release import PrefixMatcher, SemverRelease
+from pagekey_semver.util.atomic_file import atomic_write
+
+
+# Size of each read when copying the existing changelog.
+COPY_CHUNK_SIZE = 1024 * 1024
+# Start of each section written by DefaultChangelogWriter.
+SECTION_HEADER_PATTERN = re.compile(rb"^## (.*)$", re.MULTILINE)
 
 
 class ChangelogWriter(abc.ABC):
     """Base class for all ChangelogWriters."""
 
     @staticmethod
-    def from_config(config: SemverConfig) -> ChangelogWriter:
+    def from_config(
+        config: SemverConfig, index_dir: Optional[str] = None
+    ) -> ChangelogWriter:
         """Create a ChangelogWriter from a config file.
 
         Uses the `changelog_writer` string to dynamically import a Changelog class for use.
 
         Args:
             Config that defines where the ChangelogWriter class is.
+            index_dir: Directory to keep the changelog index in, or None to
+                not keep one.
 
         Returns:
             ChangelogWriter instance with imported class, initialized with config.
@@ -30,7 +46,14 @@ class ChangelogWriter(abc.ABC):
             ImportError, AttributeError if the import string is not valid.
         """
         changelog_writer_cls = dynamic_import(config.changelog_writer)
-        return changelog_writer_cls(config)
+        # Custom writers may define `__init__(self, config)`, so the index
+        # directory is set after construction.
+        changelog_writer = changelog_writer_cls(config)
+        changelog_writer.set_index_dir(index_dir)
+        return changelog_writer
+
+    # Directory holding the changelog index, set with `set_index_dir`.
+    _index_dir: Optional[str] = None
 
     def __init__(self, config: SemverConfig):
         """Initialize the writer.
@@ -40,7 +63,22 @@ class ChangelogWriter(abc.ABC):
         """
         self._config = config
 
-    def update_changelog(self, version: Tag, commits: List[Commit]) -> None:
+    def set_index_dir(self, index_dir: Optional[str]) -> None:
+        """Set where to keep the changelog index.
+
+        Args:
+            index_dir: Directory to keep the index in, usually under
+                `GitManager.get_cache_dir`. If None, no index is kept and the
+                changelog is scanned with `find_sections` whenever it is needed.
+        """
+        self._index_dir = index_dir
+
+    def update_changelog(
+        self,
+        version: Tag,
+        commits: Union[Iterable[Commit], ClassifiedCommits],
+        previous_version: Optional[Tag] = None,
+    ) -> None:
         """Update changelog.
 
         This is the method called by the CLI to perform the update.
@@ -50,40 +88,266 @@ class ChangelogWriter(abc.ABC):
 
         Args:
             version: The new version being added.
-            commits: Full list of commits since last release.
+            commits: Full list (or stream) of commits since last release,
+                or the result of `SemverRelease.classify_commits`.
+            previous_version: The latest release before `version`, if any.
+                With `changelog_shard_by_major`, the changelog is moved to
+                that release's shard when `version` starts a new major.
         """
         self._create_dirs()
         filtered_commits = self._filter_commits(commits)
-        # Write new version info to temp file.
-        with tempfile.NamedTemporaryFile(mode="w", delete=False) as temp_file:
+        path = self._config.changelog_path
+        if self._config.changelog_shard_by_major and previous_version is not None:
+            self._rotate_changelog(version, previous_version)
+        index = self._load_index(path)
+        # Write the new section, then the existing changelog, to a temp file
+        # next to the changelog and swap it in, so a crash never truncates it.
+        with atomic_write(path) as temp_file:
             self.write_changelog(temp_file, version, filtered_commits)
-            # Write existing changelog to temp file.
-            if os.path.exists(self._config.changelog_path):
-                with open(self._config.changelog_path, "r") as changelog_file:
-                    temp_file.write(changelog_file.read())
-            temp_file_name = temp_file.name
-        with open(temp_file_name, "r") as temp_file:
-            # Copy temp file to changelog, effectively prepending.
-            with open(self._config.changelog_path, "w") as changelog_file:
-                changelog_file.write(temp_file.read())
-        # Delete temp_file
-        os.unlink(temp_file_name)
-
-    def _filter_commits(self, commits: List[Commit]) -> List[Commit]:
+            section_length = self._tell(temp_file)
+            if os.path.exists(path):
+                with open(path, "r") as changelog_file:
+                    # Copy in chunks so memory does not grow with the changelog.
+                    shutil.copyfileobj(changelog_file, temp_file, COPY_CHUNK_SIZE)
+        index.prepend(version.name, section_length)
+        index.save()
+
+    def rebuild_changelog(
+        self, releases: Iterable[Tuple[Tag, Iterable[Commit]]]
+    ) -> None:
+        """Regenerate the whole changelog from history.
+
+        Each release is rendered with `write_changelog` as it arrives and
+        written straight to a temporary file, which then replaces the
+        changelog, so only one release is held in memory at a time. With
+        `changelog_shard_by_major`, the releases of each older major go to
+        their own shard instead. A shard stays open until every release has
+        been written, so releases of one major need not be next to each other
+        (e.g. a `v1` patch released after `v2.0.0`).
+
+        Args:
+            releases: Tuples of (version, commits in that version), newest first,
+                such as `SemverRelease.split_into_releases`.
+        """
+        self._create_dirs()
+        path = self._config.changelog_path
+        if not self._config.changelog_shard_by_major:
+            self._write_sections(releases, lambda version: path)
+            return
+        # The newest major stays in the changelog, even with no releases at all.
+        newest_major: List[int] = []
+
+        def get_path(version: Tag) -> str:
+            if len(newest_major) == 0:
+                newest_major.append(version.major)
+            if version.major == newest_major[0]:
+                return path
+            return self.get_shard_path(version.major)
+
+        self._write_sections(releases, get_path)
+
+    def get_section(self, version_name: str) -> Optional[str]:
+        """Get one version's section of the changelog.
+
+        Uses the index written by `update_changelog` to read only that
+        section from a memory-mapped changelog. If the index is missing or
+        out of date, the changelog is scanned with `find_sections` instead.
+
+        Args:
+            version_name: Name of the version, e.g. "v1.2.0".
+
+        Returns:
+            The section as written by `write_changelog`, or None if not found.
+        """
+        section = self._read_section(self._config.changelog_path, version_name)
+        if section is None and self._config.changelog_shard_by_major:
+            version = self._parse_version(version_name)
+            if version is not None:
+                section = self._read_section(
+                    self.get_shard_path(version.major), version_name
+                )
+        return section
+
+    def get_shard_path(self, major: int) -> str:
+        """Get the path of the changelog holding an older major's releases.
+
+        Args:
+            major: The major version.
+
+        Returns:
+            The changelog path with `-v<major>` added before the extension,
+            e.g. `CHANGELOG-v1.md`.
+        """
+        root, extension = os.path.splitext(self._config.changelog_path)
+        return f"{root}-v{major}{extension}"
+
+    def find_sections(self, contents: bytes) -> Optional[List[ChangelogSection]]:
+        """Locate the version sections in an existing changelog.
+
+        Used to rebuild the changelog index when it is missing or out of date.
+        Override this along with `write_changelog` to index a custom format.
+
+        Args:
+            contents: The raw changelog (may be a memory-mapped file).
+
+        Returns:
+            Sections in file order, or None if this writer cannot parse its output.
+        """
+        return None
+
+    def _load_index(self, path: str) -> ChangelogIndex:
+        """Load the changelog index, rebuilding it from the changelog if needed.
+
+        Args:
+            path: Path to the changelog (or shard).
+
+        Returns:
+            The index, possibly empty.
+        """
+        index = ChangelogIndex.load(path, self._index_dir)
+        if index is not None:
+            return index
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return ChangelogIndex(path, index_dir=self._index_dir)
+        with open(path, "rb") as changelog_file:
+            with mmap.mmap(
+                changelog_file.fileno(), 0, access=mmap.ACCESS_READ
+            ) as contents:
+                sections = self.find_sections(contents)
+        # Sections of a format this writer cannot parse stay unindexed.
+        return ChangelogIndex(path, sections or [], self._index_dir)
+
+    def _read_section(self, path: str, version_name: str) -> Optional[str]:
+        """Read one version's section from a changelog, if it is there."""
+        if not os.path.exists(path):
+            return None
+        return self._load_index(path).read_section(version_name)
+
+    def _write_sections(
+        self,
+        releases: Iterable[Tuple[Tag, Iterable[Commit]]],
+        get_path: Callable[[Tag], str],
+    ) -> None:
+        """Replace the changelog, and any shards, with the given releases and index them.
+
+        Args:
+            releases: Tuples of (version, commits in that version), newest first.
+            get_path: Gives the changelog (or shard) each version belongs in.
+        """
+        indexes: Dict[str, ChangelogIndex] = {}
+        with contextlib.ExitStack() as stack:
+            files: Dict[str, TextIO] = {}
+
+            def open_file(path: str) -> TextIO:
+                if path not in files:
+                    files[path] = stack.enter_context(atomic_write(path))
+                    indexes[path] = ChangelogIndex(path, index_dir=self._index_dir)
+                return files[path]
+
+            open_file(self._config.changelog_path)
+            for version, commits in releases:
+                path = get_path(version)
+                changelog_file = open_file(path)
+                offset = self._tell(changelog_file)
+                self.write_changelog(
+                    changelog_file, version, self._filter_commits(commits)
+                )
+                end = self._tell(changelog_file)
+                indexes[path].append(version.name, offset, end - offset)
+        for index in indexes.values():
+            index.save()
+
+    def _rotate_changelog(self, version: Tag, previous_version: Tag) -> None:
+        """Move the current changelog to its major's shard if `version` starts a new major.
+
+        The previous release tells which major the current changelog holds,
+        so this works without an index and for writers that cannot parse
+        their own output. Renaming the file keeps the cost of a release
+        independent of how many older releases there are.
+
+        Args:
+            version: The new version being added.
+            previous_version: The latest release before `version`.
+        """
+        if previous_version.major >= version.major:
+            return
+        path = self._config.changelog_path
+        if not os.path.exists(path):
+            return
+        index = self._load_index(path)
+        shard_path = self.get_shard_path(previous_version.major)
+        sections = self._get_known_sections(path, index)
+        if os.path.exists(shard_path):
+            # The shard was started before (e.g. sharding was turned off and
+            # on again) - keep its releases below the current ones.
+            shard_sections = self._get_known_sections(
+                shard_path, self._load_index(shard_path)
+            )
+            if sections is not None and shard_sections is not None:
+                size = os.path.getsize(path)
+                sections = sections + [
+                    ChangelogSection(
+                        section.name, section.offset + size, section.length
+                    )
+                    for section in shard_sections
+                ]
+            else:
+                sections = None
+            with atomic_write(shard_path) as shard_file:
+                for source_path in (path, shard_path):
+                    with open(source_path, "r") as source_file:
+                        shutil.copyfileobj(source_file, shard_file, COPY_CHUNK_SIZE)
+            os.remove(path)
+        else:
+            os.replace(path, shard_path)
+        shard_index = ChangelogIndex(shard_path, sections or [], self._index_dir)
+        if sections is not None:
+            shard_index.save()
+        else:
+            # Unknown offsets - let the next lookup scan the shard instead.
+            self._remove_index_file(shard_index)
+        self._remove_index_file(index)
+
+    def _remove_index_file(self, index: ChangelogIndex) -> None:
+        """Delete an index's file, if it has one."""
+        if index.path is not None and os.path.exists(index.path):
+            os.remove(index.path)
+
+    def _get_known_sections(
+        self, path: str, index: ChangelogIndex
+    ) -> Optional[List[ChangelogSection]]:
+        """Get an index's sections, or None if the changelog has unindexed content."""
+        if len(index.sections) == 0 and os.path.getsize(path) > 0:
+            return None
+        return index.sections
+
+    def _parse_version(self, version_name: str) -> Optional[Tag]:
+        """Parse a section name with the configured tag format."""
+        versions = SemverRelease(self._config).get_matching_tags([version_name])
+        if len(versions) == 0:
+            return None
+        return versions[0]
+
+    def _tell(self, file_handle: TextIO) -> int:
+        """Get the number of bytes written so far to a text file."""
+        file_handle.flush()
+        return os.fstat(file_handle.fileno()).st_size
+
+    def _filter_commits(
+        self, commits: Union[Iterable[Commit], ClassifiedCommits]
+    ) -> List[Commit]:
         """Filter out any commits that do not start with a valid prefix.
 
         Args:
-            commits: Full list of commits since last release.
+            commits: Full list (or stream) of commits since last release,
+                or already classified commits.
 
         Returns:
             List of commits that start with a prefix defined in config.
         """
-        result = []
-        for commit in commits:
-            for prefix in self._config.prefixes:
-                if commit.message.startswith(f"{prefix.label}: "):
-                    result.append(commit)
-        return result
+        if isinstance(commits, ClassifiedCommits):
+            return commits.matched
+        return PrefixMatcher(self._config.prefixes).classify(commits).matched
 
     def _create_dirs(self) -> None:
         """Make directories for Changelog."""
@@ -124,3 +388,27 @@ class DefaultChangelogWriter(ChangelogWriter):
         for commit in commits:
             changelog_file.write(f"- {commit.message} ({commit.hash[0:8]})\n")
         changelog_file.write("\n")
+
+    def find_sections(self, contents: bytes) -> Optional[List[ChangelogSection]]:
+        """Locate the version sections by their level-2 headers.
+
+        Args:
+            contents: The raw changelog (may be a memory-mapped file).
+
+        Returns:
+            Sections in file order.
+        """
+        headers = list(SECTION_HEADER_PATTERN.finditer(contents))
+        sections = []
+        for position, header in enumerate(headers):
+            end = len(contents)
+            if position + 1 < len(headers):
+                end = headers[position + 1].start()
+            sections.append(
+                ChangelogSection(
+                    name=header.group(1).decode().strip(),
+                    offset=header.start(),
+                    length=end - header.start(),
+                )
+            )
+        return sections
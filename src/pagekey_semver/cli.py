@@ -1,19 +1,350 @@
-"""Module for CLI."""
+"""Module for CLI.
+
+Only what parsing the arguments needs is imported up front. Config models,
+Git, the cache and the integrations are imported by the commands that use
+them, so `--help` and commands that need none of them start quickly.
+"""
+
+from __future__ import annotations
 
 import argparse
+import itertools
 import os
 import sys
 from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, List, Optional, Tuple
+
+from pagekey_semver.changelog_index import INDEX_DIR_NAME
+from pagekey_semver.util.command_runner import CommandRunnerException
+
+if TYPE_CHECKING:
+    from pagekey_semver.cache import ReleaseCache
+    from pagekey_semver.config import SemverConfig
+    from pagekey_semver.file_replacer.base import FileReplacer
+    from pagekey_semver.git.manager import GitManager
+    from pagekey_semver.integrations.http_client import EtagCache, HttpClient
+    from pagekey_semver.integrations.release_creator import CreateReleaseConfig
+    from pagekey_semver.integrations.release_spool import ReleaseSpool
+    from pagekey_semver.models import ClassifiedCommits, Commit, ReleaseType, Tag
+    from pagekey_semver.release import SemverRelease
+
+
+# Commits looked up in and saved to the cache at once.
+CACHE_BATCH_SIZE = 500
+
+
+def open_cache(manager: GitManager, config: SemverConfig) -> Optional[ReleaseCache]:
+    """Open the release-planning cache for the current repository.
+
+    A cache that cannot be opened (read-only `.git`, corrupt database, ...)
+    is skipped rather than failing the release.
+
+    Args:
+        manager: GitManager for the repository.
+        config: Semver application config.
+
+    Returns:
+        The opened cache, or None if it could not be opened.
+    """
+    import sqlite3
+
+    from pagekey_semver.cache import ReleaseCache
+
+    try:
+        return ReleaseCache.from_dir(manager.get_cache_dir(), config)
+    except (CommandRunnerException, OSError, sqlite3.Error) as e:
+        print(f"Not using the cache: {e}")
+        return None
+
+
+def get_changelog_index_dir(manager: GitManager, use_cache: bool) -> Optional[str]:
+    """Get the directory to keep the changelog index in.
+
+    Args:
+        manager: GitManager for the repository.
+        use_cache: Whether the cache directory may be used.
+
+    Returns:
+        A directory under the cache directory, or None to not keep an index
+        (the changelog is scanned instead).
+    """
+    if not use_cache:
+        return None
+    try:
+        return os.path.join(manager.get_cache_dir(), INDEX_DIR_NAME)
+    except CommandRunnerException as e:
+        print(f"Not using the changelog index: {e}")
+        return None
+
+
+def classify_cached_commits(
+    release: SemverRelease,
+    commits: Iterable[Commit],
+    cache: ReleaseCache,
+    stop_at_max: bool = False,
+) -> ClassifiedCommits:
+    """Classify commits, reusing the classifications stored in the cache.
+
+    Commits are read in batches of `CACHE_BATCH_SIZE`. Each batch is looked
+    up with one query, and its new classifications are saved with one more.
+    If `commits` is a generator, it is closed when done.
+
+    Args:
+        release: Classifies the commits missing from the cache.
+        commits: Commits since last tag, as a list or a stream.
+        cache: Cache to read from and save to.
+        stop_at_max: Stop reading after the batch in which the biggest
+            release type any configured prefix can produce was found.
+
+    Returns:
+        The overall release type and the commits that matched a prefix, in order.
+    """
+    from pagekey_semver.models import ClassifiedCommits, ReleaseType
+    from pagekey_semver.release import release_greater
+
+    max_release_type = release.get_max_release_type()
+    release_type = ReleaseType.NO_RELEASE
+    matched_commits = []
+    iterator = iter(commits)
+    try:
+        while True:
+            batch = list(itertools.islice(iterator, CACHE_BATCH_SIZE))
+            if len(batch) == 0:
+                break
+            known = cache.get_classifications([commit.hash for commit in batch])
+            new = []
+            for commit in batch:
+                classification = known.get(commit.hash)
+                if classification is None:
+                    classification = release.classify_commit(commit)
+                    new.append((commit.hash, *classification))
+                commit_type, matched = classification
+                if matched:
+                    matched_commits.append(commit)
+                if release_greater(release_type, commit_type):
+                    release_type = commit_type
+            cache.put_classifications(new)
+            if stop_at_max and release_type == max_release_type:
+                break
+    finally:
+        close = getattr(commits, "close", None)
+        if close is not None:
+            close()
+    return ClassifiedCommits(release_type=release_type, matched=matched_commits)
+
+
+def compute_cached_release_type(
+    release: SemverRelease,
+    manager: GitManager,
+    since_ref: Optional[str],
+    cache: ReleaseCache,
+) -> ReleaseType:
+    """Compute the release type for `since_ref..HEAD`, reusing earlier runs.
+
+    If this exact range was computed before, the cached result is returned
+    without reading any commits. If an earlier run computed the range up to
+    an ancestor of HEAD, only the commits added since then are read.
+
+    Args:
+        release: Computes the release type of the commits that are read.
+        manager: GitManager for the repository.
+        since_ref: Name of the last release tag, or None if there is none.
+        cache: Cache to read from and save to.
+
+    Returns:
+        ReleaseType that should be generated for the commits since `since_ref`.
+    """
+    from pagekey_semver.models import ReleaseType
+    from pagekey_semver.release import release_greater
+
+    head = manager.resolve_commit("HEAD")
+    base = ""
+    if since_ref is not None:
+        base = manager.resolve_commit(since_ref)
+    if head is None or base is None:
+        # Nothing can be keyed on; let Git report any errors.
+        return classify_cached_commits(
+            release, manager.iter_commits_since(since_ref), cache, stop_at_max=True
+        ).release_type
+    release_type = cache.get_range(base, head)
+    if release_type is not None:
+        return release_type
+
+    # Look for an earlier HEAD in the same range, so that
+    # base..HEAD = base..previous_head + previous_head..HEAD.
+    release_type = ReleaseType.NO_RELEASE
+    walk_from = since_ref
+    for previous_head in cache.get_range_heads(base):
+        if not manager.is_ancestor(previous_head, head):
+            continue
+        if len(base) > 0 and not manager.is_ancestor(base, previous_head):
+            continue
+        previous_type = cache.get_range(base, previous_head)
+        if previous_type is None:
+            continue
+        release_type = previous_type
+        walk_from = previous_head
+        break
+
+    if release_type != release.get_max_release_type():
+        new_type = classify_cached_commits(
+            release, manager.iter_commits_since(walk_from), cache, stop_at_max=True
+        ).release_type
+        if release_greater(release_type, new_type):
+            release_type = new_type
+    cache.put_range(base, head, release_type)
+    return release_type
+
+
+def open_spool(manager: GitManager, config: SemverConfig) -> ReleaseSpool:
+    """Open the spool of releases waiting to be published.
+
+    Args:
+        manager: GitManager for the repository.
+        config: Semver application config.
+
+    Returns:
+        The spool at the configured path, or in the cache directory by default.
+    """
+    from pagekey_semver.integrations.release_spool import ReleaseSpool
+
+    if config.integrations.spool.path is not None:
+        return ReleaseSpool(config.integrations.spool.path)
+    return ReleaseSpool.from_dir(manager.get_cache_dir())
+
+
+def open_http_client(
+    manager: GitManager, config: SemverConfig, use_cache: bool
+) -> Tuple[HttpClient, Optional[EtagCache]]:
+    """Create the HTTP client for the release creators.
+
+    Args:
+        manager: GitManager for the repository.
+        config: Semver application config.
+        use_cache: Whether to keep release lookups' ETags in the cache directory.
 
-from pagekey_semver.changelog_writer import ChangelogWriter
-from pagekey_semver.git.manager import GitManager
-from pagekey_semver.integrations.release_creator import (
-    GitHubReleaseCreator,
-    GitLabReleaseCreator,
-)
-from pagekey_semver.release import SemverRelease
-from pagekey_semver.models import Tag
-from pagekey_semver.config import load_config
+    Returns:
+        The client, and the ETag cache to save once done, if any.
+    """
+    from pagekey_semver.integrations.http_client import EtagCache, HttpClient
+
+    etag_cache = None
+    if use_cache:
+        etag_cache = EtagCache.from_dir(manager.get_cache_dir())
+    return HttpClient(config.integrations.http, etag_cache=etag_cache), etag_cache
+
+
+def get_release_configs(config: SemverConfig) -> List[Tuple[str, CreateReleaseConfig]]:
+    """Get the enabled release creators' names and configs.
+
+    Args:
+        config: Semver application config.
+
+    Returns:
+        The name of each release creator with a `create_release` config, and that config.
+    """
+    from pagekey_semver.integrations.release_creator import RELEASE_CREATORS
+
+    releases = []
+    for name in RELEASE_CREATORS:
+        release_config = getattr(config.integrations, name).create_release
+        if release_config is not None:
+            releases.append((name, release_config))
+    return releases
+
+
+def publish_releases() -> None:
+    """Publish the releases waiting in the spool, exiting with 1 if any failed."""
+    from pagekey_semver.config import load_config
+    from pagekey_semver.git.manager import GitManager
+    from pagekey_semver.integrations.release_creator import RELEASE_CREATORS
+    from pagekey_semver.integrations.release_spool import publish_spooled_releases
+
+    config = load_config(Path(".semver"))
+    manager = GitManager(config)
+    spool = open_spool(manager, config)
+    client, etag_cache = open_http_client(manager, config, config.cache.enabled)
+    creators = {
+        name: creator_cls(client) for name, creator_cls in RELEASE_CREATORS.items()
+    }
+    try:
+        failed = publish_spooled_releases(
+            spool,
+            creators,
+            config.integrations.spool.batch_size,
+            config.integrations.spool.max_workers,
+        )
+    finally:
+        client.close()
+        if etag_cache is not None:
+            etag_cache.save()
+    manager.close()
+    if len(failed) > 0:
+        names = ", ".join(f"{release.creator} {release.tag.name}" for release in failed)
+        print(f"Could not publish {len(failed)} release(s), left in the spool: {names}")
+        sys.exit(1)
+
+
+def rebuild_changelog() -> None:
+    """Regenerate the changelog from every release tag in one pass over history."""
+    from pagekey_semver.changelog_writer import ChangelogWriter
+    from pagekey_semver.config import load_config
+    from pagekey_semver.git.manager import GitManager
+    from pagekey_semver.release import SemverRelease
+
+    config = load_config(Path(".semver"))
+    manager = GitManager(config)
+    release = SemverRelease(config)
+    writer = ChangelogWriter.from_config(
+        config, get_changelog_index_dir(manager, config.cache.enabled)
+    )
+    print(f"Rebuilding {config.changelog_path}.", flush=True)
+    writer.rebuild_changelog(release.split_into_releases(manager.iter_tagged_commits()))
+    manager.close()
+
+
+def show_changelog_section(version_name: str) -> None:
+    """Print one version's section of the changelog.
+
+    Args:
+        version_name: Name of the version, e.g. "v1.2.0".
+    """
+    from pagekey_semver.changelog_writer import ChangelogWriter
+    from pagekey_semver.config import load_config
+    from pagekey_semver.git.manager import GitManager
+
+    config = load_config(Path(".semver"))
+    manager = GitManager(config)
+    writer = ChangelogWriter.from_config(
+        config, get_changelog_index_dir(manager, config.cache.enabled)
+    )
+    section = writer.get_section(version_name)
+    manager.close()
+    if section is None:
+        print(f"Version {version_name} not found in {config.changelog_path}.")
+        sys.exit(1)
+    print(section, end="")
+
+
+def replace_files(replacers: List[FileReplacer], tag: Tag, max_workers: int) -> None:
+    """Run the file replacers and print how each file went.
+
+    Args:
+        replacers: File replacers from the config. Names may be glob patterns.
+        tag: The new version.
+        max_workers: Maximum number of files edited at once.
+    """
+    from pagekey_semver.file_replacer.base import run_replacers
+
+    expanded = []
+    for replacer in replacers:
+        matches = replacer.expand()
+        if len(matches) == 0:
+            print(f"  {replacer.name}: no matching files")
+        expanded.extend(matches)
+    for result in run_replacers(expanded, tag, max_workers):
+        status = "changed" if result.changed else "unchanged"
+        print(f"  {result.name}: {status} ({result.seconds * 1000:.1f} ms)")
 
 
 def cli_entrypoint(args=sys.argv[1:]):
@@ -24,26 +355,84 @@ def cli_entrypoint(args=sys.argv[1:]):
     """
     parser = argparse.ArgumentParser(description="PageKey Semver")
     subparsers = parser.add_subparsers(title="Commands", dest="command")
-    subparsers.add_parser(
+    plan_parser = subparsers.add_parser(
         "plan", help="Compute which version would be created. (Dry-run)"
     )
-    subparsers.add_parser("apply", help="Compute version, then commit, tag, and push.")
+    apply_parser = subparsers.add_parser(
+        "apply", help="Compute version, then commit, tag, and push."
+    )
+    subparsers.add_parser("publish", help="Create the releases spooled by apply.")
+    changelog_parser = subparsers.add_parser(
+        "changelog", help="Regenerate the changelog from Git history."
+    )
+    changelog_parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Rewrite the changelog with a section for every release tag.",
+    )
+    changelog_parser.add_argument(
+        "--show",
+        metavar="VERSION",
+        help="Print the changelog section of one version, e.g. v1.2.0.",
+    )
+    for subparser in (plan_parser, apply_parser):
+        subparser.add_argument(
+            "--no-cache",
+            action="store_true",
+            help="Ignore and do not update the cache under .git/pagekey-semver/.",
+        )
+        subparser.add_argument(
+            "--jobs",
+            type=int,
+            default=1,
+            help="Number of processes used to read the full history"
+            " (apply, or plan without a previous tag). 0 means one per CPU.",
+        )
     parsed_args = parser.parse_args(args)
 
     if parsed_args.command == "plan":
         dry_run = True
     elif parsed_args.command == "apply":
         dry_run = False
+    elif parsed_args.command == "publish":
+        publish_releases()
+        return
+    elif parsed_args.command == "changelog" and parsed_args.rebuild:
+        rebuild_changelog()
+        return
+    elif parsed_args.command == "changelog" and parsed_args.show is not None:
+        show_changelog_section(parsed_args.show)
+        return
+    elif parsed_args.command == "changelog":
+        changelog_parser.print_usage()
+        return
     else:
         parser.print_usage()
         return
+    jobs = parsed_args.jobs if parsed_args.jobs > 0 else os.cpu_count() or 1
+
+    from pagekey_semver.changelog_writer import ChangelogWriter
+    from pagekey_semver.config import load_config
+    from pagekey_semver.git.manager import GitManager
+    from pagekey_semver.integrations.release_creator import (
+        RELEASE_CREATORS,
+        create_releases,
+    )
+    from pagekey_semver.models import TagIndex
+    from pagekey_semver.release import SemverRelease
 
     config = load_config(Path(".semver"))
 
     # Init classes.
     manager = GitManager(config)
     release = SemverRelease(config)
-    writer = ChangelogWriter.from_config(config)
+    use_cache = config.cache.enabled and not parsed_args.no_cache
+    writer = ChangelogWriter.from_config(
+        config, get_changelog_index_dir(manager, use_cache)
+    )
+    cache = None
+    if use_cache:
+        cache = open_cache(manager, config)
 
     # Check out branch on GitLab
     gitlab_branch = os.getenv("CI_COMMIT_BRANCH", "")
@@ -54,14 +443,47 @@ def cli_entrypoint(args=sys.argv[1:]):
         manager._effector.fetch_tags()
 
     # Compute tags, commits
-    tags = manager.get_git_tags()
-    print(f"Found tags: {' '.join(tags)}")
-    max_tag: Tag = release.get_biggest_tag(tags)
+    tag_glob = release.get_tag_glob()
+    if dry_run and tag_glob is not None:
+        # Let Git sort the tags by version and stop at the first match. The
+        # next version only depends on the biggest tag.
+        max_tag: Tag = release.find_biggest_tag(manager.iter_tags_by_version(tag_glob))
+        tags = TagIndex([], [] if max_tag is None else [max_tag])
+        print(f"Found latest tag: {' '.join(tag.name for tag in tags)}")
+    else:
+        # Applying needs every tag to check whether the new one already exists.
+        # Parse them once and share the index from here on.
+        tags = release.index_tags(manager.get_git_tags())
+        print(f"Found tags: {' '.join(tags.names)}")
+        max_tag: Tag = tags.biggest()
     hash = None
     if max_tag is not None:
         hash = max_tag.name
-    commits = manager.get_commit_messages_since(hash)
-    release_type = release.compute_release_type(commits)
+    if dry_run and hash is None and jobs > 1:
+        # First run: there is no tag to stop at, so scan all history in parallel.
+        release_type = release.compute_release_type(
+            release.classify_commits_parallel(manager, hash, jobs)
+        )
+    elif dry_run and cache is not None:
+        # Reuse the result of earlier runs, reading only commits added since.
+        release_type = compute_cached_release_type(release, manager, hash, cache)
+    elif dry_run:
+        # Only the release type is needed, so stream commits and stop reading
+        # history as soon as the biggest possible release type is found.
+        release_type = release.compute_release_type(manager.iter_commits_since(hash))
+    elif jobs > 1:
+        # Same result as below, with history split across worker processes.
+        commits = release.classify_commits_parallel(manager, hash, jobs)
+        release_type = release.compute_release_type(commits)
+    else:
+        # The changelog needs every commit, so read them all and match them
+        # against the prefixes once for both the release type and the changelog.
+        commits = manager.get_commit_messages_since(hash)
+        if cache is not None:
+            commits = classify_cached_commits(release, commits, cache)
+        else:
+            commits = release.classify_commits(commits)
+        release_type = release.compute_release_type(commits)
     next_version: Tag = release.compute_next_version(release_type, tags)
 
     print("Next version:", next_version, flush=True)
@@ -75,33 +497,53 @@ def cli_entrypoint(args=sys.argv[1:]):
         if not dry_run:
             print(f"Applying version {next_version.name}.")
             # Write to changelog.
-            writer.update_changelog(next_version, commits)
+            writer.update_changelog(next_version, commits, max_tag)
             # File Replacers
             print("Running file replacers.")
-            for file_replacer in config.file_replacers:
-                print(f"  {file_replacer.name}")
-                file_replacer.perform_replace(next_version)
+            replace_files(
+                config.file_replacers, next_version, config.file_replacer_workers
+            )
             # Apply tag, commit, push
             manager.apply_tag(tags, next_version)
             # Set an env var for subsequent steps in GitHub Actions.
             if "GITHUB_OUTPUT" in os.environ:
                 with open(os.environ["GITHUB_OUTPUT"], "w") as f:
                     f.write("semver_release_occurred=true")
-            # Create releases if enabled.
-            if config.integrations.github.create_release is not None:
-                GitHubReleaseCreator().create_release(
-                    config.integrations.github.create_release, next_version
+            release_configs = get_release_configs(config)
+            if config.integrations.spool.enabled:
+                # Leave the network to `publish`, so an API outage cannot
+                # fail the job after the tag was pushed.
+                spool = open_spool(manager, config)
+                for name, release_config in release_configs:
+                    spool.queue(name, release_config, next_version)
+                print(
+                    f"Spooled {len(release_configs)} release(s);"
+                    " run `pagekey-semver publish` to create them."
                 )
-            if config.integrations.gitlab.create_release is not None:
-                GitLabReleaseCreator().create_release(
-                    config.integrations.gitlab.create_release, next_version
+            else:
+                # Create releases if enabled, all at once over shared connections.
+                client, etag_cache = open_http_client(
+                    manager, config, cache is not None
                 )
+                releases = [
+                    (RELEASE_CREATORS[name](client), release_config)
+                    for name, release_config in release_configs
+                ]
+                try:
+                    create_releases(releases, next_version)
+                finally:
+                    client.close()
+                    if etag_cache is not None:
+                        etag_cache.save()
         else:
             print(f"Would apply version {next_version.name}.", flush=True)
             print("Dry run mode - not applying version.", flush=True)
             if "GITHUB_OUTPUT" in os.environ:
                 with open(os.environ["GITHUB_OUTPUT"], "w") as f:
                     f.write("semver_release_occurred=false")
+    if cache is not None:
+        cache.close()
+    manager.close()
 
 
 if __name__ == "__main__":
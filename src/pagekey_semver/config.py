@@ -2,16 +2,18 @@
 
 import os
 from pathlib import Path
-from typing import Annotated
+from typing import TYPE_CHECKING, Annotated
 
 from pydantic import BaseModel, Field
-import yaml
 
+from pagekey_semver.integrations.http_client import HttpClientConfig
 from pagekey_semver.integrations.release_creator import (
     GitHubIntegrationConfig,
     GitLabIntegrationConfig,
 )
+from pagekey_semver.integrations.release_spool import SpoolConfig
 from pagekey_semver.models import (
+    CacheConfig,
     GitConfig,
     Prefix,
 )
@@ -20,14 +22,24 @@ from pagekey_semver.file_replacer.sed import SedFileReplacer
 from pagekey_semver.file_replacer.toml import TomlFileReplacer
 from pagekey_semver.file_replacer.yaml import YamlFileReplacer
 from pagekey_semver.util.env_to_dict import convert_env_to_dict
+from pagekey_semver.util.lazy_import import lazy_import
 from pagekey_semver.util.update_dict import merge_dicts
 
+# `load_config` imports PyYAML whenever a `.semver` file exists, so deferring
+# it only helps runs without one and code that imports this module alone.
+if TYPE_CHECKING:
+    import yaml
+else:
+    yaml = lazy_import("yaml")
+
 
 class IntegrationsConfig(BaseModel):
     """Holds all configs for integrating with external services."""
 
     github: GitHubIntegrationConfig = GitHubIntegrationConfig()
     gitlab: GitLabIntegrationConfig = GitLabIntegrationConfig()
+    http: HttpClientConfig = HttpClientConfig()
+    spool: SpoolConfig = SpoolConfig()
 
 
 FileReplacersUnion = (
@@ -40,11 +52,15 @@ class SemverConfig(BaseModel):
 
     changelog_path: str
     changelog_writer: str
+    changelog_shard_by_major: bool = False
     format: str
     git: GitConfig
     prefixes: list[Prefix]
     file_replacers: list[Annotated[FileReplacersUnion, Field(discriminator="type")]]
+    # Maximum number of files edited at once by the file replacers.
+    file_replacer_workers: int = Field(default=8, ge=1)
     integrations: IntegrationsConfig = IntegrationsConfig()
+    cache: CacheConfig = CacheConfig()
 
 
 DEFAULT_CONFIG = SemverConfig(
@@ -1,8 +1,17 @@
 import abc
 import enum
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence, Tuple
+
 from pydantic import BaseModel, field_serializer
 
 from pagekey_semver.models import Tag
+from pagekey_semver.util.atomic_file import atomic_write
+from pagekey_semver.util.file_glob import expand_glob, is_glob
+from pagekey_semver.util.update_dict import get_dict_value
 
 
 class FileReplacerType(str, enum.Enum):
@@ -14,11 +23,47 @@ class FileReplacerType(str, enum.Enum):
     YAML = "yaml"
 
 
+def replace_placeholders(text: str, tag: Tag) -> str:
+    """Replace %M/%m/%p with tag's major/minor/patch.
+
+    Args:
+        text: Format or script containing the placeholders.
+        tag: The version tag.
+
+    Returns:
+        The text with the placeholders replaced.
+    """
+    return (
+        text.replace("%M", str(tag.major))
+        .replace("%m", str(tag.minor))
+        .replace("%p", str(tag.patch))
+    )
+
+
+def has_values(contents: Any, updates: Sequence[Tuple[str, str]]) -> bool:
+    """Check whether parsed file contents already hold the new values.
+
+    Args:
+        contents: The parsed file.
+        updates: Keys and their new values.
+
+    Returns:
+        True if every key is present with its new value.
+    """
+    try:
+        return all(get_dict_value(contents, key) == value for key, value in updates)
+    except (KeyError, TypeError, IndexError):
+        return False
+
+
 class FileReplacer(BaseModel, abc.ABC):
     """File to be replaced on new release."""
 
+    # A path, or a glob pattern such as "**/package.json".
     name: str
     type: FileReplacerType
+    # Glob patterns of files and directories that `name` should not match.
+    exclude: List[str] = []
 
     @field_serializer("type")
     def get_enum_value(self, v, info) -> str:
@@ -26,9 +71,164 @@ class FileReplacer(BaseModel, abc.ABC):
         return str(v.value)
 
     @abc.abstractmethod
-    def perform_replace(self, tag: Tag) -> str:
+    def perform_replace(self, tag: Tag) -> bool:
         """Parse the `name` filepath and replace some part of it with the attributes of `tag`.
 
         Args:
             tag: The version tag to be used when replacing part of the file.
+
+        Returns:
+            Whether the file changed. Files that would not change are not written.
+        """
+
+    @classmethod
+    def perform_replace_many(
+        cls, replacers: Sequence["FileReplacer"], tag: Tag
+    ) -> bool:
+        """Run several replacers of this type on the same file.
+
+        Subclasses override this to read and write the file only once. By
+        default, the replacers run one after the other.
+
+        Args:
+            replacers: Replacers of this type, all with the same `name`.
+            tag: The version tag to be used when replacing part of the file.
+
+        Returns:
+            Whether the file changed.
+        """
+        changed = False
+        for replacer in replacers:
+            changed = bool(replacer.perform_replace(tag)) or changed
+        return changed
+
+    def expand(self) -> List["FileReplacer"]:
+        """Get a replacer for each file that `name` matches.
+
+        Returns:
+            This replacer if `name` is a plain path, or a copy of it for each
+            matching file if `name` is a glob pattern.
+        """
+        if not is_glob(self.name):
+            return [self]
+        return [
+            self.model_copy(update={"name": path})
+            for path in expand_glob(self.name, self.exclude)
+        ]
+
+    def _read_text(self) -> str:
+        """Read the file as UTF-8 text, keeping its line endings."""
+        with open(self.name, "r", encoding="utf-8", newline="") as file_handle:
+            return file_handle.read()
+
+    def _write_spans(
+        self, contents: str, replacements: List[Tuple[Tuple[int, int], str]]
+    ) -> bool:
+        """Write the file back with some ranges of it replaced.
+
+        Args:
+            contents: The file contents, as returned by `_read_text`.
+            replacements: Start and end offsets of the text to replace, and
+                the text to put in its place, in file order and not overlapping.
+
+        Returns:
+            Whether the file changed. It is not written if it did not.
         """
+        if all(contents[start:end] == value for (start, end), value in replacements):
+            return False
+        pieces = []
+        position = 0
+        for (start, end), value in replacements:
+            pieces.append(contents[position:start])
+            pieces.append(value)
+            position = end
+        pieces.append(contents[position:])
+        with atomic_write(self.name, "wb") as file_handle:
+            file_handle.write("".join(pieces).encode())
+        return True
+
+
+@dataclass
+class ReplaceResult:
+    """Outcome of running the file replacers of one file."""
+
+    name: str
+    changed: bool
+    seconds: float
+
+
+def group_replacers(replacers: Sequence[FileReplacer]) -> List[List[FileReplacer]]:
+    """Group replacers that can edit their file in one read and write.
+
+    Replacers are grouped by file, in the order each file first appears.
+    Within a file, consecutive replacers of the same type form one group,
+    so replacers of different types still run in the configured order.
+
+    Args:
+        replacers: Replacers from the config.
+
+    Returns:
+        Groups to pass to `perform_replace_many` of their type, in order.
+    """
+    return [group for groups in _group_by_file(replacers) for group in groups]
+
+
+def run_replacers(
+    replacers: Sequence[FileReplacer], tag: Tag, max_workers: int
+) -> List[ReplaceResult]:
+    """Run replacers on a thread pool, one file per task.
+
+    Replacers for the same file are grouped as in `group_replacers` and run
+    in order within one task; different files are edited concurrently.
+
+    Args:
+        replacers: Replacers to run, with glob patterns already expanded.
+        tag: The version tag to be used when replacing part of the files.
+        max_workers: Maximum number of files edited at once.
+
+    Returns:
+        The result for each file, in the order each file first appears.
+    """
+
+    def run_file(groups: List[List[FileReplacer]]) -> ReplaceResult:
+        start = time.perf_counter()
+        changed = False
+        for group in groups:
+            changed = group[0].perform_replace_many(group, tag) or changed
+        return ReplaceResult(
+            name=groups[0][0].name,
+            changed=bool(changed),
+            seconds=time.perf_counter() - start,
+        )
+
+    files = _group_by_file(replacers)
+    if len(files) == 0:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(files))) as executor:
+        return list(executor.map(run_file, files))
+
+
+def _group_by_file(
+    replacers: Sequence[FileReplacer],
+) -> List[List[List[FileReplacer]]]:
+    """Group replacers by file, then into runs of the same type."""
+    by_path: Dict[str, List[List[FileReplacer]]] = {}
+    for replacer in replacers:
+        groups = by_path.setdefault(os.path.normpath(replacer.name), [])
+        if len(groups) > 0 and type(groups[-1][-1]) is type(replacer):
+            groups[-1].append(replacer)
+        else:
+            groups.append([replacer])
+    return list(by_path.values())
+
+
+def spans_overlap(spans: Sequence[Tuple[int, int]]) -> bool:
+    """Check whether any of the sorted ranges overlap.
+
+    Args:
+        spans: Start and end offsets, sorted by start.
+
+    Returns:
+        True if a range starts before the previous one ends.
+    """
+    return any(spans[i][0] < spans[i - 1][1] for i in range(1, len(spans)))
@@ -1,37 +1,156 @@
 import json
-from typing import Literal
+import mmap
+import os
+from typing import List, Literal, Optional, Sequence, Tuple
 
 from pagekey_semver.models import Tag
-from pagekey_semver.file_replacer.base import FileReplacer, FileReplacerType
+from pagekey_semver.file_replacer.base import (
+    FileReplacer,
+    FileReplacerType,
+    has_values,
+    replace_placeholders,
+    spans_overlap,
+)
+from pagekey_semver.util.atomic_file import atomic_write
+from pagekey_semver.util.json_span import find_value_span
 from pagekey_semver.util.update_dict import set_dict_value
 
 
+# Size of each read when copying the untouched parts of the file.
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
 class JsonFileReplacer(FileReplacer):
     """Represents JSON file to replaced on new release."""
 
     type: Literal[FileReplacerType.JSON] = FileReplacerType.JSON
     key: str
     format: str
+    # "rewrite" parses and rewrites the whole file; "patch" only replaces
+    # the value and leaves the rest of the file as it is.
+    mode: Literal["rewrite", "patch"] = "rewrite"
 
-    def perform_replace(self, tag: Tag) -> str:
+    def perform_replace(self, tag: Tag) -> bool:
         """Replace a key in a JSON file using the provided format.
 
         Args:
             tag: Version tag to replace key with.
+
+        Returns:
+            Whether the file changed.
+        """
+        return self.perform_replace_many([self], tag)
+
+    @classmethod
+    def perform_replace_many(
+        cls, replacers: Sequence["JsonFileReplacer"], tag: Tag
+    ) -> bool:
+        """Replace several keys in one JSON file, reading and writing it once.
+
+        The file is patched if every replacer uses patch mode and every key
+        is found, and rewritten otherwise. It is not written if every key
+        already has its new value.
+
+        Args:
+            replacers: Replacers for the same file.
+            tag: Version tag to replace keys with.
+
+        Returns:
+            Whether the file changed.
+        """
+        # Compute the values based on format and tag.
+        updates = [
+            (replacer.key, replace_placeholders(replacer.format, tag))
+            for replacer in replacers
+        ]
+        file_replacer = replacers[0]
+        if all(replacer.mode == "patch" for replacer in replacers):
+            spans = file_replacer._find_spans([key for key, _ in updates])
+            if spans is not None:
+                return file_replacer._patch(
+                    sorted(
+                        (span, json.dumps(value).encode())
+                        for span, (_, value) in zip(spans, updates)
+                    )
+                )
+        return file_replacer._rewrite(updates)
+
+    def _find_spans(self, keys: List[str]) -> Optional[List[Tuple[int, int]]]:
+        """Find the byte ranges of the keys' values in the file.
+
+        Returns:
+            The start and end offsets for each key, or None if a key is
+            missing, values overlap, or the file could not be scanned - the
+            full rewrite handles those cases.
+        """
+        with open(self.name, "rb") as file_handle:
+            if os.fstat(file_handle.fileno()).st_size == 0:
+                return None
+            with mmap.mmap(file_handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                try:
+                    spans = [find_value_span(data, key) for key in keys]
+                except ValueError:
+                    return None
+        if None in spans or spans_overlap(sorted(spans)):
+            return None
+        return spans
+
+    def _patch(self, replacements: List[Tuple[Tuple[int, int], bytes]]) -> bool:
+        """Replace byte ranges of the file, streaming the rest through.
+
+        Args:
+            replacements: Start and end offsets of the old values and the
+                new values as JSON, in file order.
+
+        Returns:
+            Whether the file changed. It is not written if it did not.
+        """
+        with open(self.name, "rb") as source:
+            old_values = []
+            for (start, end), _ in replacements:
+                source.seek(start)
+                old_values.append(source.read(end - start))
+            if old_values == [value for _, value in replacements]:
+                return False
+            source.seek(0)
+            with atomic_write(self.name, "wb") as target:
+                position = 0
+                for (start, end), value in replacements:
+                    remaining = start - position
+                    while remaining > 0:
+                        chunk = source.read(min(COPY_CHUNK_SIZE, remaining))
+                        if len(chunk) == 0:
+                            break
+                        target.write(chunk)
+                        remaining -= len(chunk)
+                    target.write(value)
+                    source.seek(end)
+                    position = end
+                while chunk := source.read(COPY_CHUNK_SIZE):
+                    target.write(chunk)
+        return True
+
+    def _rewrite(self, updates: List[Tuple[str, str]]) -> bool:
+        """Parse the whole file, set the keys, and write the file back.
+
+        Args:
+            updates: Keys and their new values.
+
+        Returns:
+            Whether the file changed. It is not written if every key
+            already has its new value.
         """
         # Read the file.
         with open(self.name, "r") as file_handle:
             contents = json.load(file_handle)
+        if has_values(contents, updates):
+            return False
 
-        # Compute the value based on format and tag.
-        new_version_str = (
-            self.format.replace("%M", str(tag.major))
-            .replace("%m", str(tag.minor))
-            .replace("%p", str(tag.patch))
-        )
-        # Replace the key with the computed value.
-        set_dict_value(contents, self.key, new_version_str)
+        # Replace the keys with the computed values.
+        for key, value in updates:
+            set_dict_value(contents, key, value)
 
         # Write the new file contents back to the same file.
         with open(self.name, "w") as file_handle:
             json.dump(contents, file_handle, indent=4)
+        return True
@@ -1,8 +1,18 @@
-from typing import Literal
+import shlex
+from typing import Literal, Sequence
 
 from pagekey_semver.models import Tag
-from pagekey_semver.file_replacer.base import FileReplacer, FileReplacerType
+from pagekey_semver.file_replacer.base import (
+    FileReplacer,
+    FileReplacerType,
+    replace_placeholders,
+)
 from pagekey_semver.util.command_runner import CommandRunner, SubprocessCommandRunner
+from pagekey_semver.util.sed_script import (
+    SedScript,
+    SedScriptException,
+    compile_script,
+)
 
 
 class SedFileReplacer(FileReplacer):
@@ -10,30 +20,81 @@ class SedFileReplacer(FileReplacer):
 
     type: Literal[FileReplacerType.SED] = FileReplacerType.SED
     script: str
+    # "auto" runs supported scripts in-process and others with sed;
+    # "sed" always runs the sed executable.
+    engine: Literal["auto", "sed"] = "auto"
 
     def perform_replace(
         self, tag: Tag, runner: CommandRunner = SubprocessCommandRunner()
-    ) -> str:
-        """Run the sed program to replace a tag in a file.
+    ) -> bool:
+        """Run the sed script to replace a tag in a file.
 
-        Replaces %M/%m/%p with tag's major/minor/patch,
-        then calls sed with the provided `script`.
+        Replaces %M/%m/%p with tag's major/minor/patch, then applies the
+        provided `script` in-process if it only uses supported sed features
+        (see `SedScript`), or with the sed program otherwise.
 
         Args:
             script: Sed script to run on the file.
+
+        Returns:
+            Whether the file changed. The sed program always rewrites the
+            file, so it is reported as changed.
         """
+        # Replace placeholders in script using tag's major/minor/patch.
+        script_replaced = replace_placeholders(self.script, tag)
+        if self.engine == "auto":
+            try:
+                compiled_script = compile_script(script_replaced)
+            except SedScriptException:
+                pass
+            else:
+                return compiled_script.apply_to_file(self.name)
         # Check if the sed executable is available.
         result = runner.run("which sed", raise_on_command_fail=False)
         if result.exit_code != 0:
             raise EnvironmentError(
                 "Sed executable not found on system - have you installed sed?"
             )
-        # Replace placeholders in script using tag's major/minor/patch.
-        script_escaped = self.script.replace("'", "\\'")
-        script_replaced = (
-            script_escaped.replace("%M", str(tag.major))
-            .replace("%m", str(tag.minor))
-            .replace("%p", str(tag.patch))
-        )
-        # Run sed.
-        runner.run(f"sed -i '{script_replaced}' {self.name}")
+        # Run sed, with the script always in single quotes.
+        script_quoted = "'" + script_replaced.replace("'", "'\"'\"'") + "'"
+        runner.run(f"sed -i {script_quoted} {shlex.quote(self.name)}")
+        return True
+
+    @classmethod
+    def perform_replace_many(
+        cls,
+        replacers: Sequence["SedFileReplacer"],
+        tag: Tag,
+        runner: CommandRunner = SubprocessCommandRunner(),
+    ) -> bool:
+        """Run several sed scripts on one file.
+
+        If every script can run in-process, they are combined into one script
+        and the file is read and written once. Otherwise, they run one after
+        the other as with `perform_replace`.
+
+        Args:
+            replacers: Replacers for the same file.
+            tag: Version tag to replace placeholders with.
+            runner: Runner for the sed program, if it is needed.
+
+        Returns:
+            Whether the file changed.
+        """
+        try:
+            scripts = [
+                compile_script(replace_placeholders(replacer.script, tag))
+                for replacer in replacers
+                if replacer.engine == "auto"
+            ]
+        except SedScriptException:
+            scripts = []
+        # A newline inserted by one script would be a line break for the next.
+        if len(scripts) == len(replacers) and not any(
+            script.splits_lines for script in scripts[:-1]
+        ):
+            return SedScript.combine(scripts).apply_to_file(replacers[0].name)
+        changed = False
+        for replacer in replacers:
+            changed = replacer.perform_replace(tag, runner) or changed
+        return changed
@@ -1,10 +1,30 @@
-import toml
-from typing import Literal
+import json
+import sys
+from typing import TYPE_CHECKING, List, Literal, Optional, Sequence, Tuple
 
 from pagekey_semver.models import Tag
-from pagekey_semver.file_replacer.base import FileReplacer, FileReplacerType
+from pagekey_semver.file_replacer.base import (
+    FileReplacer,
+    FileReplacerType,
+    has_values,
+    replace_placeholders,
+    spans_overlap,
+)
+from pagekey_semver.util.lazy_import import lazy_import
+from pagekey_semver.util.toml_span import find_value_span
 from pagekey_semver.util.update_dict import set_dict_value
 
+if TYPE_CHECKING:
+    import toml
+else:
+    toml = lazy_import("toml")
+
+# tomllib is part of the standard library from Python 3.11.
+if sys.version_info >= (3, 11):
+    tomllib = lazy_import("tomllib")
+else:
+    tomllib = None
+
 
 class TomlFileReplacer(FileReplacer):
     """Represents TOML file to replaced on new release."""
@@ -12,26 +32,108 @@ class TomlFileReplacer(FileReplacer):
     type: Literal[FileReplacerType.TOML] = FileReplacerType.TOML
     key: str
     format: str
+    # "rewrite" parses and rewrites the whole file; "patch" only replaces
+    # the value and leaves the rest of the file as it is.
+    mode: Literal["rewrite", "patch"] = "rewrite"
 
-    def perform_replace(self, tag: Tag) -> str:
+    def perform_replace(self, tag: Tag) -> bool:
         """Replace a key in a TOML file using the provided format.
 
         Args:
             tag: Version tag to replace key with.
+
+        Returns:
+            Whether the file changed.
+        """
+        return self.perform_replace_many([self], tag)
+
+    @classmethod
+    def perform_replace_many(
+        cls, replacers: Sequence["TomlFileReplacer"], tag: Tag
+    ) -> bool:
+        """Replace several keys in one TOML file, reading and writing it once.
+
+        The file is patched if every replacer uses patch mode and every key
+        is found, and rewritten otherwise. It is not written if every key
+        already has its new value.
+
+        Args:
+            replacers: Replacers for the same file.
+            tag: Version tag to replace keys with.
+
+        Returns:
+            Whether the file changed.
+        """
+        # Compute the values based on format and tag.
+        updates = [
+            (replacer.key, replace_placeholders(replacer.format, tag))
+            for replacer in replacers
+        ]
+        file_replacer = replacers[0]
+        if all(replacer.mode == "patch" for replacer in replacers):
+            changed = file_replacer._patch(updates)
+            if changed is not None:
+                return changed
+        return file_replacer._rewrite(updates)
+
+    def _patch(self, updates: List[Tuple[str, str]]) -> Optional[bool]:
+        """Replace only the keys' values, keeping comments and formatting.
+
+        Args:
+            updates: Keys and their new values.
+
+        Returns:
+            Whether the file changed, or None if a value could not be found
+            and replaced.
+        """
+        contents = self._read_text()
+        try:
+            spans = [find_value_span(contents, key) for key, _ in updates]
+        except ValueError:
+            return None
+        if None in spans or spans_overlap(sorted(spans)):
+            return None
+        replacements = []
+        for (start, end), (_, value) in zip(spans, updates):
+            old_value = contents[start:end]
+            if (
+                old_value.startswith("'")
+                and not old_value.startswith("'''")
+                and "'" not in value
+                and "\n" not in value
+            ):
+                # Keep literal strings literal.
+                new_value = f"'{value}'"
+            else:
+                new_value = json.dumps(value, ensure_ascii=False)
+            replacements.append(((start, end), new_value))
+        return self._write_spans(contents, sorted(replacements))
+
+    def _rewrite(self, updates: List[Tuple[str, str]]) -> bool:
+        """Parse the whole file, set the keys, and write the file back.
+
+        Args:
+            updates: Keys and their new values.
+
+        Returns:
+            Whether the file changed. It is not written if every key
+            already has its new value.
         """
-        # Read the file.
-        with open(self.name, "r") as file_handle:
-            contents = toml.load(file_handle)
-
-        # Compute the value based on format and tag.
-        new_version_str = (
-            self.format.replace("%M", str(tag.major))
-            .replace("%m", str(tag.minor))
-            .replace("%p", str(tag.patch))
-        )
-        # Replace the key with the computed value.
-        set_dict_value(contents, self.key, new_version_str)
+        # Read the file, with the faster standard library parser if available.
+        if tomllib is not None:
+            with open(self.name, "rb") as file_handle:
+                contents = tomllib.load(file_handle)
+        else:
+            with open(self.name, "r") as file_handle:
+                contents = toml.load(file_handle)
+        if has_values(contents, updates):
+            return False
+
+        # Replace the keys with the computed values.
+        for key, value in updates:
+            set_dict_value(contents, key, value)
 
         # Write the new file contents back to the same file.
         with open(self.name, "w") as file_handle:
             toml.dump(contents, file_handle)
+        return True
@@ -1,10 +1,32 @@
-from typing import Literal
-
-import yaml
+import json
+from typing import TYPE_CHECKING, List, Literal, Optional, Sequence, Tuple
 
 from pagekey_semver.models import Tag
-from pagekey_semver.file_replacer.base import FileReplacer, FileReplacerType
+from pagekey_semver.file_replacer.base import (
+    FileReplacer,
+    FileReplacerType,
+    has_values,
+    replace_placeholders,
+    spans_overlap,
+)
+from pagekey_semver.util.lazy_import import lazy_import
 from pagekey_semver.util.update_dict import set_dict_value
+from pagekey_semver.util.yaml_span import find_value_span
+
+if TYPE_CHECKING:
+    import yaml
+else:
+    yaml = lazy_import("yaml")
+
+
+def get_safe_loader() -> type:
+    """Get the safe YAML loader, using the libyaml bindings if PyYAML has them."""
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def get_safe_dumper() -> type:
+    """Get the safe YAML dumper, using the libyaml bindings if PyYAML has them."""
+    return getattr(yaml, "CSafeDumper", yaml.SafeDumper)
 
 
 class YamlFileReplacer(FileReplacer):
@@ -13,26 +35,116 @@ class YamlFileReplacer(FileReplacer):
     type: Literal[FileReplacerType.YAML] = FileReplacerType.YAML
     key: str
     format: str
+    # "rewrite" parses and rewrites the whole file; "patch" only replaces
+    # the value and leaves the rest of the file as it is.
+    mode: Literal["rewrite", "patch"] = "rewrite"
 
-    def perform_replace(self, tag: Tag) -> str:
+    def perform_replace(self, tag: Tag) -> bool:
         """Replace a key in a YAML file using the provided format.
 
         Args:
             tag: Version tag to replace key with.
+
+        Returns:
+            Whether the file changed.
+        """
+        return self.perform_replace_many([self], tag)
+
+    @classmethod
+    def perform_replace_many(
+        cls, replacers: Sequence["YamlFileReplacer"], tag: Tag
+    ) -> bool:
+        """Replace several keys in one YAML file, reading and writing it once.
+
+        The file is patched if every replacer uses patch mode and every key
+        is found, and rewritten otherwise. It is not written if every key
+        already has its new value.
+
+        Args:
+            replacers: Replacers for the same file.
+            tag: Version tag to replace keys with.
+
+        Returns:
+            Whether the file changed.
+        """
+        # Compute the values based on format and tag.
+        updates = [
+            (replacer.key, replace_placeholders(replacer.format, tag))
+            for replacer in replacers
+        ]
+        file_replacer = replacers[0]
+        if all(replacer.mode == "patch" for replacer in replacers):
+            changed = file_replacer._patch(updates)
+            if changed is not None:
+                return changed
+        return file_replacer._rewrite(updates)
+
+    def _patch(self, updates: List[Tuple[str, str]]) -> Optional[bool]:
+        """Replace only the keys' values, keeping comments and formatting.
+
+        Args:
+            updates: Keys and their new values.
+
+        Returns:
+            Whether the file changed, or None if a value could not be found
+            and replaced.
+        """
+        contents = self._read_text()
+        spans = [find_value_span(contents, key) for key, _ in updates]
+        if None in spans or spans_overlap(sorted(spans)):
+            return None
+        replacements = []
+        for (start, end), (_, value) in zip(spans, updates):
+            new_value = self._format_scalar(contents[start:end], value)
+            if new_value is None:
+                return None
+            replacements.append(((start, end), new_value))
+        return self._write_spans(contents, sorted(replacements))
+
+    def _format_scalar(self, old_value: str, new_version_str: str) -> Optional[str]:
+        """Write a string as a YAML scalar in the same style as the old value.
+
+        Args:
+            old_value: The scalar being replaced, including any quotes.
+            new_version_str: The new value.
+
+        Returns:
+            The scalar, or None if it cannot be written on one line.
+        """
+        if old_value.startswith('"'):
+            return json.dumps(new_version_str, ensure_ascii=False)
+        if old_value.startswith("'"):
+            new_value = "'" + new_version_str.replace("'", "''") + "'"
+        else:
+            # Let the dumper decide whether the string needs quotes, e.g. "1.0".
+            new_value = yaml.dump(
+                new_version_str, Dumper=get_safe_dumper(), width=2**31 - 1
+            ).removesuffix("\n...\n")
+        if "\n" in new_value.rstrip("\n"):
+            return None
+        return new_value.rstrip("\n")
+
+    def _rewrite(self, updates: List[Tuple[str, str]]) -> bool:
+        """Parse the whole file, set the keys, and write the file back.
+
+        Args:
+            updates: Keys and their new values.
+
+        Returns:
+            Whether the file changed. It is not written if every key
+            already has its new value.
         """
         # Read the file.
         with open(self.name, "r") as file_handle:
-            contents = yaml.safe_load(file_handle)
+            contents = yaml.load(file_handle, Loader=get_safe_loader())
+        if has_values(contents, updates):
+            return False
 
-        # Compute the value based on format and tag.
-        new_version_str = (
-            self.format.replace("%M", str(tag.major))
-            .replace("%m", str(tag.minor))
-            .replace("%p", str(tag.patch))
-        )
-        # Replace the key with the computed value.
-        set_dict_value(contents, self.key, new_version_str)
+        # Replace the keys with the computed values.
+        for key, value in updates:
+            set_dict_value(contents, key, value)
 
         # Write the new file contents back to the same file.
         with open(self.name, "w") as file_handle:
-            yaml.dump(contents, file_handle)
+            yaml.dump(contents, file_handle, Dumper=get_safe_dumper())
+        return True
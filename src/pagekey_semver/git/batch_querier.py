@@ -0,0 +1,380 @@
+"""Module for querying Git through long-lived `git cat-file` processes."""
+
+from dataclasses import dataclass
+import heapq
+import subprocess
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from pagekey_semver.git.querier import CommandGitQuerier, filter_by_prefixes
+from pagekey_semver.git.refs import FilesystemRefReader, RefReaderException
+from pagekey_semver.models import Commit
+from pagekey_semver.util.command_runner import CommandRunner, SubprocessCommandRunner
+
+
+class BatchGitQuerierException(Exception):
+    """Raised when the `git cat-file` pipe cannot answer a query."""
+
+
+@dataclass
+class ObjectInfo:
+    """Header information returned by `git cat-file` for an object."""
+
+    oid: str
+    type: str
+    size: int
+
+
+@dataclass
+class CommitObject:
+    """A parsed Git commit object."""
+
+    oid: str
+    parents: List[str]
+    # Committer timestamp, in seconds since the epoch.
+    timestamp: int
+    message: str
+
+    @property
+    def subject(self) -> str:
+        """The subject line as `git log --pretty=%s` gives it, with whitespace collapsed.
+
+        Runs of whitespace become single spaces, the same as in every other
+        commit reader, so a commit gets the same release type whichever
+        reader found it.
+        """
+        lines = self.message.split("\n")
+        # Skip leading blank lines.
+        while len(lines) > 0 and len(lines[0].strip()) == 0:
+            lines.pop(0)
+        # The subject is the first paragraph, joined onto one line.
+        subject_lines = []
+        for line in lines:
+            if len(line.strip()) == 0:
+                break
+            subject_lines.append(line)
+        return " ".join(" ".join(subject_lines).split())
+
+
+class CatFileProcess:
+    """A persistent `git cat-file --batch` or `--batch-check` process.
+
+    The process is started on first use and kept open until `close` is called,
+    so any number of lookups cost a single process spawn.
+    """
+
+    def __init__(self, mode: str, cwd: Optional[str] = None):
+        """Initialize the process wrapper.
+
+        Args:
+            mode: Either "--batch" (header and contents) or "--batch-check" (header only).
+            cwd: Directory of the repository to query, or None for the current directory.
+        """
+        self._mode = mode
+        self._cwd = cwd
+        self._process: Optional[subprocess.Popen] = None
+
+    def _ensure_started(self) -> subprocess.Popen:
+        if self._process is None or self._process.poll() is not None:
+            self._process = subprocess.Popen(
+                ["git", "cat-file", self._mode],
+                cwd=self._cwd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        return self._process
+
+    def query(self, spec: str) -> Tuple[Optional[ObjectInfo], Optional[bytes]]:
+        """Look up an object by name.
+
+        Args:
+            spec: Any revision understood by Git, e.g. a hash, "HEAD", or "v1.0.0^{commit}".
+
+        Returns:
+            Tuple of the object header and the object contents.
+            Contents are always None in "--batch-check" mode.
+            Both are None if the object does not exist.
+        """
+        if "\n" in spec:
+            raise BatchGitQuerierException(f"Invalid object name: {spec!r}")
+        process = self._ensure_started()
+        process.stdin.write(spec.encode() + b"\n")
+        process.stdin.flush()
+        header = process.stdout.readline()
+        if len(header) == 0:
+            raise BatchGitQuerierException(
+                f"git cat-file {self._mode} exited unexpectedly"
+            )
+        fields = header.decode().split()
+        if len(fields) != 3:
+            # "<spec> missing" or "<spec> ambiguous"
+            return None, None
+        info = ObjectInfo(oid=fields[0], type=fields[1], size=int(fields[2]))
+        contents = None
+        if self._mode == "--batch":
+            contents = process.stdout.read(info.size)
+            # Each object is followed by a newline.
+            process.stdout.read(1)
+        return info, contents
+
+    def close(self) -> None:
+        """Close the pipe and wait for the process to exit."""
+        if self._process is not None:
+            self._process.stdin.close()
+            self._process.wait()
+            self._process.stdout.close()
+            self._process = None
+
+
+def parse_commit(oid: str, contents: bytes) -> CommitObject:
+    """Parse the raw contents of a commit object.
+
+    Args:
+        oid: Object ID of the commit.
+        contents: Raw object contents as printed by `git cat-file commit`.
+
+    Returns:
+        The parsed commit.
+    """
+    header, _, message = contents.partition(b"\n\n")
+    parents = []
+    timestamp = 0
+    for line in header.split(b"\n"):
+        if line.startswith(b"parent "):
+            parents.append(line[len(b"parent ") :].decode())
+        elif line.startswith(b"committer "):
+            # committer Name <email> 1700000000 +0000
+            timestamp = int(line.rsplit(b" ", 2)[1])
+    return CommitObject(
+        oid=oid,
+        parents=parents,
+        timestamp=timestamp,
+        message=message.decode(errors="replace"),
+    )
+
+
+class BatchGitQuerier(CommandGitQuerier):
+    """Query Git over long-lived `git cat-file` pipes.
+
+    Object, ref, and commit lookups are answered by one `--batch-check` and one
+    `--batch` process that stay open for the whole run, instead of spawning
+    a shell and a Git process per query. Queries that `cat-file` cannot answer
+    (config values, tag listing) are delegated to `CommandGitQuerier`.
+    """
+
+    def __init__(
+        self,
+        command_runner: CommandRunner = SubprocessCommandRunner(),
+        cwd: Optional[str] = None,
+    ):
+        super().__init__(command_runner)
+        self._check_process = CatFileProcess("--batch-check", cwd)
+        self._batch_process = CatFileProcess("--batch", cwd)
+        self._ref_reader = FilesystemRefReader(cwd or ".")
+
+    def get_tag_names(self) -> List[str]:
+        # Sorted by name, like `git tag`.
+        return sorted(self.get_tag_refs())
+
+    def get_tag_refs(self) -> Dict[str, str]:
+        try:
+            return self._ref_reader.get_tag_refs()
+        except RefReaderException as e:
+            print(f"Reading tags with the Git CLI: {e}")
+            return super().get_tag_refs()
+
+    def resolve_ref(self, ref: str) -> Optional[str]:
+        """Resolve a ref or revision to an object ID.
+
+        Args:
+            ref: Any revision understood by Git.
+
+        Returns:
+            The object ID, or None if the ref does not exist.
+        """
+        info, _ = self._check_process.query(ref)
+        if info is None:
+            return None
+        return info.oid
+
+    def resolve_commit(self, ref: str) -> Optional[str]:
+        return self.resolve_ref(f"{ref}^{{commit}}")
+
+    def get_git_common_dir(self) -> str:
+        try:
+            _, common_dir = self._ref_reader.find_git_dirs()
+            return common_dir
+        except RefReaderException:
+            return super().get_git_common_dir()
+
+    def get_object(self, spec: str) -> Optional[Tuple[ObjectInfo, bytes]]:
+        """Read an object's header and raw contents.
+
+        Args:
+            spec: Any revision understood by Git.
+
+        Returns:
+            Tuple of header and contents, or None if the object does not exist.
+        """
+        info, contents = self._batch_process.query(spec)
+        if info is None:
+            return None
+        return info, contents
+
+    def get_commit(self, ref: str) -> Optional[CommitObject]:
+        """Read and parse a commit.
+
+        Args:
+            ref: Any revision that points to a commit (tags are peeled).
+
+        Returns:
+            The parsed commit, or None if it does not exist.
+        """
+        result = self.get_object(f"{ref}^{{commit}}")
+        if result is None:
+            return None
+        info, contents = result
+        return parse_commit(info.oid, contents)
+
+    def get_commit_subject(self, ref: str) -> Optional[str]:
+        """Get the subject line of a commit.
+
+        Args:
+            ref: Any revision that points to a commit.
+
+        Returns:
+            The subject line, or None if the commit does not exist.
+        """
+        commit = self.get_commit(ref)
+        if commit is None:
+            return None
+        return commit.subject
+
+    def get_commits(
+        self, since_ref: Optional[str] = None, prefixes: Optional[List[str]] = None
+    ) -> List[Commit]:
+        return list(self.iter_commits(since_ref, prefixes))
+
+    def get_commits_by_hash(
+        self, hashes: List[str], prefixes: Optional[List[str]] = None
+    ) -> List[Commit]:
+        commits = []
+        for commit_hash in hashes:
+            commit = self.get_commit(commit_hash)
+            if commit is None:
+                raise BatchGitQuerierException(f"Unknown revision: {commit_hash}")
+            commits.append(Commit(hash=commit.oid, message=commit.subject))
+        return list(filter_by_prefixes(commits, prefixes))
+
+    def close(self) -> None:
+        """Shut down the `git cat-file` processes."""
+        self._check_process.close()
+        self._batch_process.close()
+
+    def iter_commits(
+        self, since_ref: Optional[str] = None, prefixes: Optional[List[str]] = None
+    ) -> Iterator[Commit]:
+        """Walk history from HEAD in the same order as `git log`.
+
+        Commits are visited newest-first by committer date, with ties broken
+        by insertion order, which matches Git's default revision walk.
+        Without `since_ref`, commits are yielded as they are read.
+
+        Args:
+            since_ref: Commits reachable from this ref are excluded, or None for all commits.
+            prefixes: If provided, only yield commits whose message starts
+                with "<label>: " for one of these labels.
+
+        Yields:
+            Each commit in `since_ref..HEAD`, or all commits if `since_ref` is None.
+        """
+        head = self.get_commit("HEAD")
+        if head is None:
+            # Empty repository.
+            return
+        if since_ref is None or len(since_ref) == 0:
+            commits = self._walk_all(head)
+        else:
+            base = self.get_commit(since_ref)
+            if base is None:
+                raise BatchGitQuerierException(f"Unknown revision: {since_ref}")
+            commits = self._walk_range(base, head)
+        yield from filter_by_prefixes(commits, prefixes)
+
+    def _walk_all(self, head: CommitObject) -> Iterator[Commit]:
+        seen = {head.oid}
+        queue = [(-head.timestamp, 0, head)]
+        counter = 1
+        while len(queue) > 0:
+            _, _, commit = heapq.heappop(queue)
+            yield Commit(hash=commit.oid, message=commit.subject)
+            for parent_oid in commit.parents:
+                if parent_oid in seen:
+                    continue
+                seen.add(parent_oid)
+                parent = self.get_commit(parent_oid)
+                if parent is None:
+                    # Parent is beyond a shallow clone boundary.
+                    continue
+                heapq.heappush(queue, (-parent.timestamp, counter, parent))
+                counter += 1
+
+    def _walk_range(self, base: CommitObject, head: CommitObject) -> Iterator[Commit]:
+        # Like `git log base..head`: walk both sides by date, propagating the
+        # "uninteresting" flag from base, and stop once only uninteresting
+        # commits remain in the queue. As in Git's `everybody_uninteresting`,
+        # the interesting commits in the queue are counted as they come and
+        # go, so checking whether to stop does not rescan the queue.
+        uninteresting: Set[str] = {base.oid}
+        parents: Dict[str, List[str]] = {}
+        seen = {base.oid, head.oid}
+        queue: List[Tuple[int, int, CommitObject]] = []
+        queued: Set[str] = set()
+        interesting_queued = 0
+        counter = 0
+        visited: List[CommitObject] = []
+
+        def push(commit: CommitObject) -> None:
+            nonlocal counter, interesting_queued
+            heapq.heappush(queue, (-commit.timestamp, counter, commit))
+            counter += 1
+            queued.add(commit.oid)
+            if commit.oid not in uninteresting:
+                interesting_queued += 1
+
+        def mark_uninteresting(oid: str) -> None:
+            # Mark the parents of `oid`, and the ancestors already read.
+            nonlocal interesting_queued
+            stack = [oid]
+            while len(stack) > 0:
+                current = stack.pop()
+                for parent_oid in parents.get(current, []):
+                    if parent_oid not in uninteresting:
+                        uninteresting.add(parent_oid)
+                        if parent_oid in queued:
+                            interesting_queued -= 1
+                        stack.append(parent_oid)
+
+        push(base)
+        if head.oid != base.oid:
+            push(head)
+        while interesting_queued > 0:
+            _, _, commit = heapq.heappop(queue)
+            queued.remove(commit.oid)
+            parents[commit.oid] = commit.parents
+            if commit.oid in uninteresting:
+                mark_uninteresting(commit.oid)
+            else:
+                interesting_queued -= 1
+                visited.append(commit)
+            for parent_oid in commit.parents:
+                if parent_oid in seen:
+                    continue
+                seen.add(parent_oid)
+                parent = self.get_commit(parent_oid)
+                if parent is None:
+                    continue
+                push(parent)
+        for commit in visited:
+            if commit.oid not in uninteresting:
+                yield Commit(hash=commit.oid, message=commit.subject)
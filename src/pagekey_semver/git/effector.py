@@ -1,6 +1,8 @@
 """Module for making changes to Git."""
 
 import abc
+import os
+from typing import List, Optional
 
 from pagekey_semver.util.command_runner import CommandRunner, SubprocessCommandRunner
 
@@ -29,6 +31,16 @@ class GitEffector(abc.ABC):
             message: The commit message.
         """
 
+    @abc.abstractmethod
+    def create_commit_as(self, message: str, name: str, email: str) -> None:
+        """Make a new commit as the given author, without changing Git config.
+
+        Args:
+            message: The commit message.
+            name: Author and committer name.
+            email: Author and committer email.
+        """
+
     @abc.abstractmethod
     def create_tag(self, name: str) -> None:
         """Create a tag with the provided name.
@@ -46,6 +58,21 @@ class GitEffector(abc.ABC):
             ref: Which commit, branch, or tag to push.
         """
 
+    @abc.abstractmethod
+    def push_atomic(
+        self, remote: str, refs: List[str], extra_header: Optional[str] = None
+    ) -> None:
+        """Push several refs to a remote in one push that succeeds or fails as a whole.
+
+        Args:
+            remote: Where to push, as a remote name or URL.
+            refs: Which commits, branches, or tags to push.
+            extra_header: HTTP header to send with the push, e.g. for
+                authorization, without storing it in Git config. Replaces
+                any extra headers configured for the remote; `remote` must
+                be a URL.
+        """
+
     def checkout(self, ref: str) -> None:
         """Check out a ref.
 
@@ -72,12 +99,46 @@ class CommandGitEffector(GitEffector):
     def create_commit(self, message: str) -> None:
         self._runner.run(f'git commit -m "{message}"')
 
+    def create_commit_as(self, message: str, name: str, email: str) -> None:
+        self._runner.run(
+            f'git commit -m "{message}"',
+            env={
+                "GIT_AUTHOR_NAME": name,
+                "GIT_AUTHOR_EMAIL": email,
+                "GIT_COMMITTER_NAME": name,
+                "GIT_COMMITTER_EMAIL": email,
+            },
+        )
+
     def create_tag(self, name: str) -> None:
         self._runner.run(f"git tag {name}")
 
     def push(self, remote: str, ref: str) -> None:
         self._runner.run(f"git push {remote} {ref}")
 
+    def push_atomic(
+        self, remote: str, refs: List[str], extra_header: Optional[str] = None
+    ) -> None:
+        env = None
+        if extra_header is not None:
+            # Pass the header as config through the environment rather than
+            # with `-c`, so it is not visible in the process list. Entries
+            # already set this way are kept. The header is keyed by the push
+            # URL, which beats less specific keys such as the
+            # `http.https://github.com/.extraheader` set by actions/checkout,
+            # and the empty entry first clears the headers collected so far,
+            # so only one Authorization header is sent.
+            index = int(os.environ.get("GIT_CONFIG_COUNT", "0"))
+            key = f"http.{remote}.extraHeader"
+            env = {
+                "GIT_CONFIG_COUNT": str(index + 2),
+                f"GIT_CONFIG_KEY_{index}": key,
+                f"GIT_CONFIG_VALUE_{index}": "",
+                f"GIT_CONFIG_KEY_{index + 1}": key,
+                f"GIT_CONFIG_VALUE_{index + 1}": extra_header,
+            }
+        self._runner.run(f"git push --atomic {remote} {' '.join(refs)}", env=env)
+
     def checkout(self, ref: str) -> None:
         self._runner.run(f"git checkout {ref}")
 
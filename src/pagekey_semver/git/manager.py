@@ -1,13 +1,15 @@
 """Module for interacting with Git."""
 
+import base64
 import os
 from dataclasses import dataclass
 import re
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple, Union
+from pagekey_semver.git.batch_querier import BatchGitQuerier
 from pagekey_semver.git.effector import CommandGitEffector, GitEffector
 from pagekey_semver.git.querier import CommandGitQuerier, GitQuerier
 from pagekey_semver.config import SemverConfig
-from pagekey_semver.models import Commit, Tag
+from pagekey_semver.models import Commit, Tag, TagIndex
 
 
 @dataclass
@@ -23,20 +25,63 @@ class GitManagerException(Exception):
     """Exception managing Git."""
 
 
+HTTPS_WITH_CREDENTIALS_PATTERN = r"https\://[^:@]+:[^:@]+@"
+MISSING_CREDENTIALS_WARNING = (
+    "Warning: SEMVER_USER and/or SEMVER_TOKEN not defined."
+    " Consider defining them for push authorization."
+)
+
+
+def get_https_remote(remote: str) -> str:
+    """Turn a remote URL into an HTTPS URL without credentials.
+
+    Args:
+        remote: SSH (`git@host:path`) or HTTPS remote URL.
+
+    Returns:
+        The HTTPS URL of the same repository.
+
+    Raises:
+        GitManagerException: If the URL format is not supported.
+    """
+    if remote.startswith("git@"):
+        # Replace SSH url.
+        return remote.replace(":", "/").replace("git@", "https://")
+    if remote.startswith("https://"):
+        # Remove any existing auth.
+        return re.sub(HTTPS_WITH_CREDENTIALS_PATTERN, "https://", remote)
+    raise GitManagerException(f"Unsupported remote URL format: {remote}")
+
+
 class GitManager:
     """Class to handle all communications with Git executable."""
 
     def __init__(
         self,
         config: SemverConfig,
-        querier: GitQuerier = CommandGitQuerier(),
+        querier: Optional[GitQuerier] = None,
         effector: GitEffector = CommandGitEffector(),
     ):
-        """Initialize Git manager."""
+        """Initialize Git manager.
+
+        Args:
+            config: The SemverConfig to dictate behavior.
+            querier: GitQuerier to use, or None to pick one based on `config.git.querier`.
+            effector: GitEffector to use for making changes.
+        """
         self._config = config
+        if querier is None:
+            if config.git.querier == "batch":
+                querier = BatchGitQuerier()
+            else:
+                querier = CommandGitQuerier()
         self._querier = querier
         self._effector = effector
 
+    def close(self) -> None:
+        """Release any resources (such as long-lived Git processes) held by the querier."""
+        self._querier.close()
+
     def get_existing_git_info(self) -> LocalGitOptions:
         """Determine exisitng Git config information.
 
@@ -73,21 +118,129 @@ class GitManager:
         Returns:
             Commit messages since `commit_hash` if provided.
             All commit messages if `commit_hash` is None.
+            Only commits with a configured prefix if `git.filter_commits` is enabled.
+        """
+        return self._querier.get_commits(commit_hash, **self._commit_filter())
+
+    def iter_commits_since(self, commit_hash: Optional[str]) -> Iterator[Commit]:
+        """Stream commits since a commit ref without building a list.
+
+        Args:
+            commit_hash: Reference to a commit to pull messages since, or None.
+
+        Returns:
+            Iterator over commits since `commit_hash` if provided,
+            or over all commits if `commit_hash` is None.
+            Only commits with a configured prefix if `git.filter_commits` is enabled.
+        """
+        return self._querier.iter_commits(commit_hash, **self._commit_filter())
+
+    def iter_tagged_commits(self) -> Iterator[Tuple[Commit, List[str]]]:
+        """Stream all of history with the tags on each commit, in one `git log`.
+
+        Returns:
+            Generator of (commit, tag names) tuples, newest first.
+        """
+        return self._querier.iter_tagged_commits()
+
+    def get_commit_hashes_since(self, commit_hash: Optional[str]) -> List[str]:
+        """Get the hashes of the commits `get_commit_messages_since` would return.
+
+        Args:
+            commit_hash: Hash (or tag name) of the last release, or None for all history.
+
+        Returns:
+            Commit hashes, in the same order as `get_commit_messages_since`.
+        """
+        return self._querier.get_commit_hashes(commit_hash)
+
+    def get_commits_by_hash(self, hashes: List[str]) -> List[Commit]:
+        """Read specific commits, e.g. one shard of a parallel scan.
+
+        Args:
+            hashes: Hashes of the commits to read.
+
+        Returns:
+            The commits in the given order, filtered like `get_commit_messages_since`.
+        """
+        return self._querier.get_commits_by_hash(hashes, **self._commit_filter())
+
+    def iter_tags_by_version(self, pattern: str) -> Iterator[str]:
+        """Stream tag names matching a glob, highest version first.
+
+        Args:
+            pattern: Glob matched against tag names, e.g. "v*.*.*".
+
+        Returns:
+            Generator of tag names. Close it to stop reading early.
         """
-        return self._querier.get_commits(commit_hash)
+        return self._querier.iter_tag_names_by_version(pattern)
 
-    def apply_tag(self, existing_tags: List[Tag], new_tag: Tag) -> None:
+    def resolve_commit(self, ref: str) -> Optional[str]:
+        """Resolve a ref (tag name, "HEAD", ...) to a commit hash.
+
+        Args:
+            ref: The ref to resolve.
+
+        Returns:
+            The commit hash, or None if the ref does not exist.
+        """
+        return self._querier.resolve_commit(ref)
+
+    def is_ancestor(self, ancestor: str, descendant: str) -> bool:
+        """Check whether `ancestor` is reachable from `descendant`.
+
+        Args:
+            ancestor: The possible ancestor commit.
+            descendant: The commit to walk back from.
+
+        Returns:
+            True if `ancestor` is `descendant` or one of its ancestors.
+        """
+        return self._querier.is_ancestor(ancestor, descendant)
+
+    def get_cache_dir(self) -> str:
+        """Get the directory where pagekey-semver may cache data for this repo.
+
+        The directory lives inside the Git directory, so it is never committed
+        and is shared by all worktrees.
+
+        Returns:
+            Path to `<git common dir>/pagekey-semver`.
+        """
+        return os.path.join(self._querier.get_git_common_dir(), "pagekey-semver")
+
+    def _commit_filter(self) -> dict:
+        """Keyword args that make the querier filter commits by prefix, if enabled.
+
+        Commits without a prefix never affect the release type or the changelog,
+        so filtering them out inside Git gives identical results while keeping
+        them from crossing the process boundary.
+        """
+        if not self._config.git.filter_commits:
+            return {}
+        return {"prefixes": [prefix.label for prefix in self._config.prefixes]}
+
+    def apply_tag(
+        self, existing_tags: Union[List[str], TagIndex], new_tag: Tag
+    ) -> None:
         """Commit, tag, and push.
 
-        Changes Git username, email based on config
-        and restores them to what they were previously when done.
+        With the "config" apply strategy, changes Git username, email based
+        on config and restores them to what they were previously when done.
+        With the "env" strategy, Git config is not changed at all.
 
         Args:
-            existing_tags: List of pre-existing Git tags in repo.
+            existing_tags: Pre-existing Git tags in repo, as a list of names or a TagIndex.
             new_tag: Tag to be added, if it does not already exist.
         """
+        if not isinstance(existing_tags, TagIndex):
+            existing_tags = TagIndex(existing_tags)
         if new_tag not in existing_tags:
             print(f"Tagging/pushing new tag: {new_tag}", flush=True)
+            if self._config.git.apply_strategy == "env":
+                self._apply_tag_with_env(new_tag)
+                return
             original_git_config = self.get_existing_git_info()
 
             self.set_git_remote()
@@ -110,38 +263,55 @@ class GitManager:
         else:
             print(f"Tag {new_tag} already exists - skipping tag/push.", flush=True)
 
+    def _apply_tag_with_env(self, new_tag: Tag) -> None:
+        """Commit, tag, and push without changing Git config.
+
+        The identity is passed to `git commit` in environment variables, the
+        credentials to `git push` as an HTTP header, and the branch and tag
+        are pushed together in one atomic push.
+
+        Args:
+            new_tag: Tag to be added.
+        """
+        remote, extra_header = self.get_push_target()
+        self._effector.add_all()
+        self._effector.create_commit_as(
+            new_tag.name, self._config.git.name, self._config.git.email
+        )
+        self._effector.create_tag(new_tag.name)
+        self._effector.push_atomic(
+            remote, ["HEAD", f"refs/tags/{new_tag.name}"], extra_header
+        )
+
+    def get_push_target(self) -> Tuple[str, Optional[str]]:
+        """Get where to push and how to authenticate, based on SEMVER_USER and SEMVER_TOKEN env vars.
+
+        Returns:
+            The HTTPS URL of origin and a basic authorization header if both
+            env vars are set, or "origin" and None otherwise.
+
+        Raises:
+            GitManagerException: If the origin URL format is not supported.
+        """
+        user = os.getenv("SEMVER_USER", "")
+        token = os.getenv("SEMVER_TOKEN", "")
+        if len(user) == 0 or len(token) == 0:
+            print(MISSING_CREDENTIALS_WARNING)
+            return "origin", None
+        remote = get_https_remote(self._querier.get_config_item("remote.origin.url"))
+        credentials = base64.b64encode(f"{user}:{token}".encode()).decode()
+        return remote, f"Authorization: Basic {credentials}"
+
     def set_git_remote(self) -> None:
         """Set push remote based on SEMVER_USER and SEMVER_TOKEN env vars."""
         user = os.getenv("SEMVER_USER", "")
         token = os.getenv("SEMVER_TOKEN", "")
         if len(user) > 0 and len(token) > 0:
             existing_remote = self._querier.get_config_item("remote.origin.url")
-            if existing_remote.startswith("git@"):
-                # Replace SSH url.
-                new_remote = existing_remote.replace(":", "/").replace(
-                    "git@", f"https://{user}:{token}@"
-                )
-            elif existing_remote.startswith("https://"):
-                HTTPS_WITH_CREDENTIALS_PATTERN = r"https\://[^:@]+:[^:@]+@"
-                if re.search(HTTPS_WITH_CREDENTIALS_PATTERN, existing_remote):
-                    # Replace HTTPS with existing auth.
-                    new_remote = re.sub(
-                        HTTPS_WITH_CREDENTIALS_PATTERN,
-                        f"https://{user}:{token}@",
-                        existing_remote,
-                    )
-                else:
-                    # Add auth to HTTPS without any credentials.
-                    new_remote = existing_remote.replace(
-                        "https://", f"https://{user}:{token}@"
-                    )
-            else:
-                raise GitManagerException(
-                    f"Unsupported remote URL format: {existing_remote}"
-                )
+            new_remote = get_https_remote(existing_remote).replace(
+                "https://", f"https://{user}:{token}@", 1
+            )
             # Set the new remote.
             self._effector.set_config_item("remote.origin.url", new_remote)
         else:
-            print(
-                "Warning: SEMVER_USER and/or SEMVER_TOKEN not defined. Consider defining them for push authorization."
-            )
+            print(MISSING_CREDENTIALS_WARNING)
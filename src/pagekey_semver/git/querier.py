@@ -1,7 +1,8 @@
 """Module for querying Git."""
 
 import abc
-from typing import List, Optional
+import shlex
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 from pagekey_semver.models import Commit
 from pagekey_semver.util.command_runner import (
@@ -11,6 +12,70 @@ from pagekey_semver.util.command_runner import (
 )
 
 
+# Characters with a special meaning in POSIX extended regular expressions.
+ERE_SPECIAL_CHARACTERS = set("\\.[]()*+?{}|^$")
+
+
+def matches_prefixes(message: str, prefixes: List[str]) -> bool:
+    """Check whether a commit message starts with any of the prefix labels.
+
+    Args:
+        message: Commit subject line.
+        prefixes: Prefix labels, such as "fix" or "feat".
+
+    Returns:
+        True if the message starts with "<label>: " for at least one label.
+    """
+    return any(message.startswith(f"{label}: ") for label in prefixes)
+
+
+def filter_by_prefixes(
+    commits: Iterable[Commit], prefixes: Optional[List[str]]
+) -> Iterator[Commit]:
+    """Yield only commits whose message starts with one of the prefix labels.
+
+    Args:
+        commits: Commits to filter.
+        prefixes: Prefix labels, or None to yield every commit.
+
+    Yields:
+        Each matching commit, in the original order.
+    """
+    for commit in commits:
+        if prefixes is None or matches_prefixes(commit.message, prefixes):
+            yield commit
+
+
+def build_prefix_pattern(prefixes: List[str]) -> str:
+    """Build an anchored extended regex that matches any of the prefix labels.
+
+    `git log --grep` matches every line of the message rather than just the subject,
+    and a subject that wraps onto a second line loses the space after the colon,
+    so this pattern is a superset of the exact filter. Results must still be passed
+    through `filter_by_prefixes`.
+
+    Subjects are matched after collapsing runs of whitespace, so the pattern allows
+    leading whitespace and any whitespace wherever the filter expects one space.
+
+    Args:
+        prefixes: Prefix labels, such as "fix" or "feat".
+
+    Returns:
+        Pattern such as "^[[:space:]]*(fix|feat):([[:space:]]|$)".
+    """
+    escaped = [
+        "[[:space:]]+".join(
+            "".join(
+                f"\\{character}" if character in ERE_SPECIAL_CHARACTERS else character
+                for character in word
+            )
+            for word in label.split()
+        )
+        for label in prefixes
+    ]
+    return f"^[[:space:]]*({'|'.join(escaped)}):([[:space:]]|$)"
+
+
 class GitQuerier(abc.ABC):
     """Query the current Git repo for data."""
 
@@ -34,17 +99,126 @@ class GitQuerier(abc.ABC):
         """
 
     @abc.abstractmethod
-    def get_commits(self, since_ref: Optional[str] = None) -> List[str]:
+    def get_commits(
+        self, since_ref: Optional[str] = None, prefixes: Optional[List[str]] = None
+    ) -> List[Commit]:
         """Return commits in this repo since provided ref, or all commits.
 
         Args:
             since_ref: Reference to a commit to pull messages since, or None.
+            prefixes: If provided, only return commits whose message starts
+                with "<label>: " for one of these labels.
 
         Returns:
             Commits since `commit_hash` if provided.
             All commits if `commit_hash` is None.
         """
 
+    def iter_commits(
+        self, since_ref: Optional[str] = None, prefixes: Optional[List[str]] = None
+    ) -> Iterator[Commit]:
+        """Yield commits in this repo since provided ref, or all commits, one at a time.
+
+        Unlike `get_commits`, implementations should not hold the full history in memory.
+        Closing the generator early releases any resources used to read history.
+        The default implementation falls back to `get_commits`.
+
+        Args:
+            since_ref: Reference to a commit to pull messages since, or None.
+            prefixes: If provided, only yield commits whose message starts
+                with "<label>: " for one of these labels.
+
+        Yields:
+            Commits since `commit_hash` if provided, newest first.
+            All commits if `commit_hash` is None.
+        """
+        yield from self.get_commits(since_ref, prefixes)
+
+    @abc.abstractmethod
+    def iter_tagged_commits(self) -> Iterator[Tuple[Commit, List[str]]]:
+        """Stream every commit together with the names of the tags pointing at it.
+
+        Commits are yielded in the same order as `iter_commits`, and annotated
+        tags are listed on the commit they point to.
+
+        Yields:
+            Tuples of (commit, tag names), newest commit first.
+        """
+
+    @abc.abstractmethod
+    def get_commit_hashes(self, since_ref: Optional[str] = None) -> List[str]:
+        """Get the hashes of commits, in the same order as `get_commits`.
+
+        Args:
+            since_ref: Commits reachable from this ref are excluded, or None for all commits.
+
+        Returns:
+            Commit hashes, newest first.
+        """
+
+    @abc.abstractmethod
+    def get_commits_by_hash(
+        self, hashes: List[str], prefixes: Optional[List[str]] = None
+    ) -> List[Commit]:
+        """Get the commits with the given hashes, in the given order.
+
+        Args:
+            hashes: Hashes of the commits to read.
+            prefixes: If provided, only return commits whose message starts
+                with "<label>: " for one of these labels.
+
+        Returns:
+            The commits, parsed the same way as in `get_commits`.
+        """
+
+    @abc.abstractmethod
+    def iter_tag_names_by_version(self, pattern: str) -> Iterator[str]:
+        """Stream the names of tags matching a glob, highest version first.
+
+        Versions are compared the way `git tag --sort=-v:refname` compares them.
+        The consumer may stop early; closing the generator stops Git.
+
+        Args:
+            pattern: Glob matched against the tag name, e.g. "v*.*.*".
+
+        Yields:
+            Tag names, highest version first.
+        """
+
+    @abc.abstractmethod
+    def resolve_commit(self, ref: str) -> Optional[str]:
+        """Resolve a ref to the hash of the commit it points to.
+
+        Args:
+            ref: Any revision, such as a tag name or "HEAD". Annotated tags are peeled.
+
+        Returns:
+            The full commit hash, or None if the ref does not exist.
+        """
+
+    @abc.abstractmethod
+    def is_ancestor(self, ancestor: str, descendant: str) -> bool:
+        """Check whether one commit is reachable from another.
+
+        Args:
+            ancestor: The possible ancestor.
+            descendant: The commit to walk back from.
+
+        Returns:
+            True if `ancestor` is `descendant` or one of its ancestors.
+        """
+
+    @abc.abstractmethod
+    def get_git_common_dir(self) -> str:
+        """Get the Git directory shared by all worktrees of the repo.
+
+        Returns:
+            Path to the common Git directory (usually `.git`).
+        """
+
+    def close(self) -> None:
+        """Release any resources held by the querier."""
+
 
 class CommandGitQuerier(GitQuerier):
     """Use the Git CLI to query Git."""
@@ -65,16 +239,117 @@ class CommandGitQuerier(GitQuerier):
         # Filter out empty strings and return.
         return [tag for tag in result.stdout.split() if len(tag) > 0]
 
-    def get_commits(self, since_ref: Optional[str] = None) -> List[str]:
+    def iter_tag_names_by_version(self, pattern: str) -> Iterator[str]:
+        ref_pattern = shlex.quote(f"refs/tags/{pattern}")
+        chunks = self._runner.stream(
+            "git for-each-ref --sort=-v:refname"
+            f' --format="%(refname:strip=2)" {ref_pattern}'
+        )
+        try:
+            for record in self._split_stream(chunks, b"\n"):
+                if len(record) > 0:
+                    yield record.decode(errors="replace")
+        finally:
+            # Stops `git for-each-ref` if the consumer closed this generator early.
+            chunks.close()
+
+    def resolve_commit(self, ref: str) -> Optional[str]:
+        result = self._runner.run(
+            f"git rev-parse --verify --quiet {ref}^{{commit}}",
+            raise_on_command_fail=False,
+        )
+        if result.exit_code != 0:
+            return None
+        return result.stdout.strip()
+
+    def is_ancestor(self, ancestor: str, descendant: str) -> bool:
+        result = self._runner.run(
+            f"git merge-base --is-ancestor {ancestor} {descendant}",
+            raise_on_command_fail=False,
+        )
+        return result.exit_code == 0
+
+    def get_git_common_dir(self) -> str:
+        result = self._runner.run("git rev-parse --git-common-dir")
+        return result.stdout.strip()
+
+    def get_tag_refs(self) -> Dict[str, str]:
+        """Get all Git tags and the object IDs they point to.
+
+        Returns:
+            Dict mapping each tag name to an object ID.
+        """
+        result = self._runner.run(
+            'git for-each-ref --format="%(objectname) %(refname:strip=2)" refs/tags'
+        )
+        refs = {}
+        for line in result.stdout.splitlines():
+            if len(line) == 0:
+                continue
+            oid, _, name = line.partition(" ")
+            refs[name] = oid
+        return refs
+
+    def get_commits(
+        self, since_ref: Optional[str] = None, prefixes: Optional[List[str]] = None
+    ) -> List[Commit]:
         # Create command.
-        command = 'git log --pretty="format:%H %s"'
-        if since_ref is not None and len(since_ref) > 0:
-            command += f" {since_ref}..HEAD"
+        command = self._build_log_command(
+            'git log --pretty="format:%H %s"', since_ref, prefixes
+        )
         # Run the command.
         command_result = self._runner.run(command)
-        # Parse the commit messages.
+        commits = self._parse_commit_lines(command_result.stdout)
+        return list(filter_by_prefixes(commits, prefixes))
+
+    def iter_tagged_commits(self) -> Iterator[Tuple[Commit, List[str]]]:
+        # Fields are separated by \x1f, records by NUL.
+        chunks = self._runner.stream(
+            'git log -z --decorate-refs=refs/tags --pretty="format:%H%x1f%D%x1f%s"'
+        )
+        try:
+            for record in self._split_stream(chunks, b"\0"):
+                commit_hash, decorations, subject = record.decode(
+                    errors="replace"
+                ).split("\x1f", 2)
+                tag_names = [
+                    decoration[len("tag: ") :]
+                    for decoration in decorations.split(", ")
+                    if decoration.startswith("tag: ")
+                ]
+                # Collapse whitespace the same way as `get_commits`.
+                commit = Commit(hash=commit_hash, message=" ".join(subject.split()))
+                yield commit, tag_names
+        finally:
+            # Stops `git log` if the consumer closed this generator early.
+            chunks.close()
+
+    def get_commit_hashes(self, since_ref: Optional[str] = None) -> List[str]:
+        command = "git rev-list HEAD"
+        if since_ref is not None and len(since_ref) > 0:
+            command = f"git rev-list {since_ref}..HEAD"
+        result = self._runner.run(command)
+        return result.stdout.split()
+
+    def get_commits_by_hash(
+        self, hashes: List[str], prefixes: Optional[List[str]] = None
+    ) -> List[Commit]:
+        if len(hashes) == 0:
+            # With nothing on stdin, `git log` would fall back to HEAD.
+            return []
+        command = self._build_log_command(
+            'git log --no-walk=unsorted --stdin --pretty="format:%H %s"',
+            None,
+            prefixes,
+        )
+        command_result = self._runner.run(command, stdin="\n".join(hashes) + "\n")
+        commits = self._parse_commit_lines(command_result.stdout)
+        return list(filter_by_prefixes(commits, prefixes))
+
+    def _parse_commit_lines(self, stdout: str) -> List[Commit]:
+        """Parse newline-separated "<hash> <subject>" lines from `git log`."""
         commits = []
-        for commit_log in command_result.stdout.split("\n"):
+        for commit_log in stdout.split("\n"):
             # Ignore blank lines.
             if len(commit_log) == 0:
                 continue
@@ -87,3 +362,53 @@ class CommandGitQuerier(GitQuerier):
                 )
             )
         return commits
+
+    def iter_commits(
+        self, since_ref: Optional[str] = None, prefixes: Optional[List[str]] = None
+    ) -> Iterator[Commit]:
+        # Create command. Records are NUL-terminated so that they can be split
+        # safely as chunks arrive from the pipe.
+        command = self._build_log_command(
+            'git log -z --pretty="format:%H %s"', since_ref, prefixes
+        )
+        chunks = self._runner.stream(command)
+        try:
+            yield from filter_by_prefixes(self._parse_commit_stream(chunks), prefixes)
+        finally:
+            # Stops `git log` if the consumer closed this generator early.
+            chunks.close()
+
+    def _build_log_command(
+        self, command: str, since_ref: Optional[str], prefixes: Optional[List[str]]
+    ) -> str:
+        """Add the prefix filter and revision range to a `git log` command."""
+        if prefixes is not None and len(prefixes) > 0:
+            pattern = build_prefix_pattern(prefixes)
+            command += f" --extended-regexp --grep={shlex.quote(pattern)}"
+        if since_ref is not None and len(since_ref) > 0:
+            command += f" {since_ref}..HEAD"
+        return command
+
+    def _parse_commit_stream(self, chunks: Iterable[bytes]) -> Iterator[Commit]:
+        """Parse NUL-terminated "<hash> <subject>" records as chunks arrive."""
+        for record in self._split_stream(chunks, b"\0"):
+            yield self._parse_commit_record(record)
+
+    def _split_stream(
+        self, chunks: Iterable[bytes], separator: bytes
+    ) -> Iterator[bytes]:
+        """Split a stream of chunks into records as the chunks arrive."""
+        remainder = b""
+        for chunk in chunks:
+            records = (remainder + chunk).split(separator)
+            # The last record may be incomplete - keep it for the next chunk.
+            remainder = records.pop()
+            yield from records
+        if len(remainder) > 0:
+            yield remainder
+
+    def _parse_commit_record(self, record: bytes) -> Commit:
+        """Parse one "<hash> <subject>" record from `git log`."""
+        commit_hash, _, message = record.decode(errors="replace").partition(" ")
+        # Collapse whitespace like the other readers, so prefixes match the same way.
+        return Commit(hash=commit_hash, message=" ".join(message.split()))
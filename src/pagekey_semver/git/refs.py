@@ -0,0 +1,141 @@
+"""Module for reading Git refs directly from the filesystem."""
+
+import mmap
+import os
+from typing import Dict, Optional, Tuple
+
+
+TAGS_PREFIX = "refs/tags/"
+
+
+class RefReaderException(Exception):
+    """Raised when the repository layout cannot be read from the filesystem."""
+
+
+class FilesystemRefReader:
+    """Read refs straight from `packed-refs` and the loose `refs/` directory.
+
+    This avoids spawning Git just to list tags. Repositories with a layout this
+    reader does not understand (reftable storage, `GIT_DIR` overrides, symbolic
+    tag refs) raise RefReaderException so that callers can fall back to the Git CLI.
+    """
+
+    def __init__(self, work_dir: str = "."):
+        """Initialize the reader.
+
+        Args:
+            work_dir: Any directory inside the working tree of the repository.
+        """
+        self._work_dir = work_dir
+
+    def find_git_dirs(self) -> Tuple[str, str]:
+        """Locate the Git directory and the common directory.
+
+        For a normal repository both are the `.git` directory. For a linked
+        worktree, `.git` is a file pointing at `.git/worktrees/<name>`, whose
+        `commondir` file points back at the main `.git` directory, where shared
+        refs such as tags live.
+
+        Returns:
+            Tuple of (git_dir, common_dir).
+
+        Raises:
+            RefReaderException if the repository cannot be located.
+        """
+        if "GIT_DIR" in os.environ or "GIT_COMMON_DIR" in os.environ:
+            raise RefReaderException(
+                "GIT_DIR/GIT_COMMON_DIR overrides are not supported"
+            )
+        git_dir = self._find_git_dir()
+        common_dir = git_dir
+        commondir_file = os.path.join(git_dir, "commondir")
+        if os.path.isfile(commondir_file):
+            with open(commondir_file, "r") as file_handle:
+                common_dir = os.path.join(git_dir, file_handle.read().strip())
+        common_dir = os.path.normpath(common_dir)
+        if os.path.isdir(os.path.join(common_dir, "reftable")):
+            raise RefReaderException("reftable ref storage is not supported")
+        if not os.path.isdir(os.path.join(common_dir, "refs")):
+            raise RefReaderException(f"No refs directory found in {common_dir}")
+        return git_dir, common_dir
+
+    def get_tag_refs(self) -> Dict[str, str]:
+        """Read all tags and the object IDs they point to.
+
+        Annotated tags map to the ID of the tag object, like `git for-each-ref`.
+
+        Returns:
+            Dict mapping each tag name (without `refs/tags/`) to an object ID.
+
+        Raises:
+            RefReaderException if the refs cannot be read from the filesystem.
+        """
+        _, common_dir = self.find_git_dirs()
+        refs = self._read_packed_refs(os.path.join(common_dir, "packed-refs"))
+        # Loose refs take precedence over packed ones.
+        refs.update(self._read_loose_refs(os.path.join(common_dir, "refs", "tags")))
+        return refs
+
+    def _find_git_dir(self) -> str:
+        current = os.path.abspath(self._work_dir)
+        while True:
+            candidate = os.path.join(current, ".git")
+            if os.path.isdir(candidate):
+                return candidate
+            if os.path.isfile(candidate):
+                return self._read_gitdir_file(candidate)
+            parent = os.path.dirname(current)
+            if parent == current:
+                raise RefReaderException(
+                    f"No Git repository found above {self._work_dir}"
+                )
+            current = parent
+
+    def _read_gitdir_file(self, path: str) -> str:
+        with open(path, "r") as file_handle:
+            contents = file_handle.read().strip()
+        if not contents.startswith("gitdir: "):
+            raise RefReaderException(f"Unrecognized .git file: {path}")
+        git_dir = contents[len("gitdir: ") :]
+        return os.path.normpath(os.path.join(os.path.dirname(path), git_dir))
+
+    def _read_packed_refs(self, path: str) -> Dict[str, str]:
+        refs: Dict[str, str] = {}
+        if not os.path.isfile(path) or os.path.getsize(path) == 0:
+            return refs
+        with open(path, "rb") as file_handle:
+            with mmap.mmap(file_handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                for line in iter(data.readline, b""):
+                    # Skip the header and peeled ("^<oid>") lines.
+                    if line.startswith((b"#", b"^")):
+                        continue
+                    oid, _, refname = line.rstrip(b"\n").partition(b" ")
+                    name = refname.decode()
+                    if name.startswith(TAGS_PREFIX):
+                        refs[name[len(TAGS_PREFIX) :]] = oid.decode()
+        return refs
+
+    def _read_loose_refs(self, tags_dir: str) -> Dict[str, str]:
+        refs: Dict[str, str] = {}
+        for dir_path, _, file_names in os.walk(tags_dir):
+            for file_name in file_names:
+                if file_name.endswith(".lock"):
+                    continue
+                path = os.path.join(dir_path, file_name)
+                oid = self._read_loose_ref(path)
+                if oid is None:
+                    continue
+                name = os.path.relpath(path, tags_dir).replace(os.sep, "/")
+                refs[name] = oid
+        return refs
+
+    def _read_loose_ref(self, path: str) -> Optional[str]:
+        try:
+            with open(path, "r") as file_handle:
+                contents = file_handle.read().strip()
+        except FileNotFoundError:
+            # Deleted while walking (e.g. by a concurrent `git pack-refs`).
+            return None
+        if contents.startswith("ref: "):
+            raise RefReaderException(f"Symbolic tag refs are not supported: {path}")
+        return contents
@@ -0,0 +1,365 @@
+"""Module for talking to web APIs over pooled, retrying HTTP connections."""
+
+import json
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Tuple
+
+from pydantic import BaseModel
+
+from pagekey_semver.util.atomic_file import atomic_write
+from pagekey_semver.util.lazy_import import lazy_import
+
+if TYPE_CHECKING:
+    import email.utils as email_utils
+    import requests
+    import urllib3.exceptions as urllib3_exceptions
+else:
+    email_utils = lazy_import("email.utils")
+    requests = lazy_import("requests")
+    urllib3_exceptions = lazy_import("urllib3.exceptions")
+
+
+# Responses worth retrying: rate limits and temporary server errors.
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# Responses worth retrying for requests that must not be sent twice, when the
+# server also says when to retry: it did not act on the request.
+RETRY_AFTER_STATUS_CODES = {429, 503}
+# Methods that can be sent again without changing the result.
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+ETAG_CACHE_FILE_NAME = "http-etags.json"
+
+
+class HttpClientConfig(BaseModel):
+    """Timeouts and retries for requests to external services."""
+
+    # Seconds to wait for a connection, and for each read from the server.
+    connect_timeout: float = 10.0
+    read_timeout: float = 30.0
+    # Retries after the first attempt, for connection errors, timeouts,
+    # rate limits and 5xx responses. Requests that are not idempotent (e.g.
+    # POST) are only retried if they never reached the server, or it answered
+    # 429 or 503 with a Retry-After header.
+    max_retries: int = 3
+    # Seconds before the first retry, doubled for each retry after that,
+    # unless the server says how long to wait.
+    backoff_factor: float = 1.0
+    # Longest wait before a retry, even if the server asks for more.
+    max_backoff: float = 60.0
+
+
+class EtagCache:
+    """ETags and bodies of earlier GET responses, stored in a JSON file.
+
+    Sending the ETag back in `If-None-Match` lets the server answer
+    `304 Not Modified` without a body, which GitHub does not count against
+    the rate limit. Entries are evicted oldest first once `max_entries` is
+    exceeded.
+    """
+
+    def __init__(self, path: str, max_entries: int = 1000):
+        """Load the cache, starting empty if the file is missing or unreadable.
+
+        Args:
+            path: Path to the JSON file. Parent directories are created on save.
+            max_entries: Maximum number of responses to keep.
+        """
+        self._path = path
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._changed = False
+        try:
+            with open(path, "r") as file_handle:
+                self._entries: Dict[str, Tuple[str, str]] = {
+                    url: (etag, body)
+                    for url, (etag, body) in json.load(file_handle).items()
+                }
+        except (OSError, ValueError, TypeError, AttributeError):
+            self._entries = {}
+
+    @staticmethod
+    def from_dir(cache_dir: str) -> "EtagCache":
+        """Open the cache stored in a cache directory.
+
+        Args:
+            cache_dir: Directory holding the cache, usually from `GitManager.get_cache_dir`.
+
+        Returns:
+            The opened EtagCache.
+        """
+        return EtagCache(os.path.join(cache_dir, ETAG_CACHE_FILE_NAME))
+
+    def get(self, url: str) -> Optional[Tuple[str, str]]:
+        """Get the ETag and body last received for a URL, if any."""
+        with self._lock:
+            return self._entries.get(url)
+
+    def put(self, url: str, etag: str, body: str) -> None:
+        """Remember the ETag and body received for a URL."""
+        with self._lock:
+            self._entries.pop(url, None)
+            self._entries[url] = (etag, body)
+            while len(self._entries) > self._max_entries:
+                del self._entries[next(iter(self._entries))]
+            self._changed = True
+
+    def save(self) -> None:
+        """Write the cache back to its file, if anything changed."""
+        with self._lock:
+            if not self._changed:
+                return
+            dirs = os.path.dirname(self._path)
+            if len(dirs) > 0:
+                os.makedirs(dirs, exist_ok=True)
+            with atomic_write(self._path) as file_handle:
+                json.dump(self._entries, file_handle)
+            self._changed = False
+
+
+class HttpClient:
+    """Send HTTP requests over a shared connection pool, retrying failures.
+
+    One client can be used by several threads at once; connections are kept
+    alive and reused between requests to the same host.
+    """
+
+    def __init__(
+        self,
+        config: HttpClientConfig = HttpClientConfig(),
+        pool_size: int = 10,
+        sleep: Callable[[float], None] = time.sleep,
+        etag_cache: Optional[EtagCache] = None,
+    ):
+        """Initialize the client.
+
+        Args:
+            config: Timeouts and retries.
+            pool_size: Connections kept open per host.
+            sleep: Function used to wait between retries.
+            etag_cache: Cache for conditional GET requests, or None to not cache.
+        """
+        self._config = config
+        self._etag_cache = etag_cache
+        self._sleep = sleep
+        self._session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size
+        )
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+    def close(self) -> None:
+        """Close the pooled connections."""
+        self._session.close()
+
+    def request(self, method: str, url: str, **kwargs) -> "requests.Response":
+        """Send a request, retrying on connection errors and retryable responses.
+
+        Requests that are not idempotent are not retried after a read timeout
+        or a 5xx response, since the server may already have acted on them.
+
+        Args:
+            method: HTTP method, e.g. "POST".
+            url: URL to send the request to.
+            **kwargs: Passed on to `requests.Session.request`, e.g. `json` or `headers`.
+
+        Returns:
+            The last response, which may still be an error if retries ran out.
+
+        Raises:
+            requests.RequestException: If the last attempt failed without a response.
+        """
+        kwargs.setdefault(
+            "timeout", (self._config.connect_timeout, self._config.read_timeout)
+        )
+        return self._send_with_retries(
+            lambda: self._session.request(method, url, **kwargs),
+            method.upper() in IDEMPOTENT_METHODS,
+        )
+
+    def upload(self, method: str, url: str, path: str, **kwargs) -> "requests.Response":
+        """Send a file as the request body, streaming it from disk.
+
+        The file is read in small blocks while it is sent, so memory use does
+        not depend on its size. It is opened again for each retry.
+
+        Args:
+            method: HTTP method, e.g. "POST".
+            url: URL to send the file to.
+            path: Path to the file.
+            **kwargs: Passed on to `requests.Session.request`, e.g. `headers`.
+
+        Returns:
+            The last response, which may still be an error if retries ran out.
+
+        Raises:
+            requests.RequestException: If the last attempt failed without a response.
+        """
+        kwargs.setdefault(
+            "timeout", (self._config.connect_timeout, self._config.read_timeout)
+        )
+        # Send the length up front, so the body is not chunk-encoded.
+        headers = {
+            **kwargs.pop("headers", {}),
+            "Content-Length": str(os.path.getsize(path)),
+        }
+
+        def send() -> "requests.Response":
+            with open(path, "rb") as file_handle:
+                return self._session.request(
+                    method, url, data=file_handle, headers=headers, **kwargs
+                )
+
+        return self._send_with_retries(send, method.upper() in IDEMPOTENT_METHODS)
+
+    def _send_with_retries(
+        self, send: Callable[[], "requests.Response"], idempotent: bool
+    ) -> "requests.Response":
+        """Call `send` until it succeeds, waiting between attempts.
+
+        Args:
+            send: Function sending one attempt of the request.
+            idempotent: Whether the request may be sent again after the server
+                might have acted on it.
+
+        Returns:
+            The last response.
+        """
+        attempt = 0
+        while True:
+            try:
+                response = send()
+            except (requests.ConnectionError, requests.Timeout) as error:
+                if attempt >= self._config.max_retries or not (
+                    idempotent or _is_connect_error(error)
+                ):
+                    raise
+                delay = self._get_backoff(attempt)
+            else:
+                if attempt >= self._config.max_retries or not self._should_retry(
+                    response, idempotent
+                ):
+                    return response
+                delay = self._get_delay(response, attempt)
+                # Free the connection for the next attempt.
+                response.close()
+            self._sleep(delay)
+            attempt += 1
+
+    def get(self, url: str, **kwargs) -> "requests.Response":
+        """Send a GET request, conditional on the cached ETag if there is one.
+
+        If the server answers `304 Not Modified`, the cached body is returned
+        as a `200` response.
+
+        Args:
+            url: URL to send the request to.
+            **kwargs: Passed on to `request`.
+
+        Returns:
+            The response.
+        """
+        cached = None if self._etag_cache is None else self._etag_cache.get(url)
+        if cached is not None:
+            kwargs["headers"] = {
+                **kwargs.get("headers", {}),
+                "If-None-Match": cached[0],
+            }
+        response = self.request("GET", url, **kwargs)
+        if response.status_code == 304 and cached is not None:
+            response.status_code = 200
+            response._content = cached[1].encode()
+        elif (
+            response.status_code == 200
+            and self._etag_cache is not None
+            and "ETag" in response.headers
+        ):
+            self._etag_cache.put(url, response.headers["ETag"], response.text)
+        return response
+
+    def post(self, url: str, **kwargs) -> "requests.Response":
+        """Send a POST request. See `request`."""
+        return self.request("POST", url, **kwargs)
+
+    def _should_retry(self, response: "requests.Response", idempotent: bool) -> bool:
+        """Check whether a response is a temporary failure worth retrying."""
+        if not idempotent:
+            return (
+                response.status_code in RETRY_AFTER_STATUS_CODES
+                and "Retry-After" in response.headers
+            )
+        if response.status_code in RETRY_STATUS_CODES:
+            return True
+        # GitHub answers 403 when the rate limit is used up.
+        return (
+            response.status_code == 403
+            and _get_header_number(
+                response, "X-RateLimit-Remaining", "RateLimit-Remaining"
+            )
+            == 0
+        )
+
+    def _get_delay(self, response: "requests.Response", attempt: int) -> float:
+        """Get how long to wait before retrying, as asked by the server if it did.
+
+        `Retry-After` is used first, then the time the rate limit resets if
+        it is used up, then exponential backoff.
+        """
+        delay = _get_retry_after(response)
+        if delay is None and (
+            _get_header_number(response, "X-RateLimit-Remaining", "RateLimit-Remaining")
+            == 0
+        ):
+            reset = _get_header_number(response, "X-RateLimit-Reset", "RateLimit-Reset")
+            if reset is not None:
+                delay = reset - time.time()
+        if delay is None:
+            return self._get_backoff(attempt)
+        return min(max(delay, 0.0), self._config.max_backoff)
+
+    def _get_backoff(self, attempt: int) -> float:
+        """Get the exponential backoff delay for a retry."""
+        return min(self._config.backoff_factor * 2**attempt, self._config.max_backoff)
+
+
+def _is_connect_error(error: Exception) -> bool:
+    """Check whether a request failed before the connection was made."""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    # `requests` wraps refused connections, DNS failures, etc. this way; other
+    # connection errors (e.g. a reset while waiting for the response) may
+    # come after the server received the request.
+    return (
+        isinstance(error, requests.ConnectionError)
+        and len(error.args) > 0
+        and isinstance(error.args[0], urllib3_exceptions.MaxRetryError)
+        and isinstance(error.args[0].reason, urllib3_exceptions.NewConnectionError)
+    )
+
+
+def _get_retry_after(response: "requests.Response") -> Optional[float]:
+    """Read the `Retry-After` header, given in seconds or as an HTTP date."""
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return email_utils.parsedate_to_datetime(value).timestamp() - time.time()
+    except (TypeError, ValueError):
+        return None
+
+
+def _get_header_number(response: "requests.Response", *names: str) -> Optional[float]:
+    """Read the first of the headers that is present, as a number."""
+    for name in names:
+        value = response.headers.get(name)
+        if value is not None:
+            try:
+                return float(value)
+            except ValueError:
+                return None
+    return None
@@ -1,11 +1,22 @@
 import abc
 import os
-from typing import Optional
+import re
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple, Type
 
-import requests
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
+from pagekey_semver.integrations.http_client import HttpClient
 from pagekey_semver.models import Tag
+from pagekey_semver.util.file_glob import expand_glob
+
+if TYPE_CHECKING:
+    import requests
+
+
+class ReleaseCreatorException(Exception):
+    """Raised when part of a release could not be published."""
 
 
 class CreateReleaseConfig(BaseModel):
@@ -15,13 +26,196 @@ class CreateReleaseConfig(BaseModel):
     token_variable: str
     title_format: str
     body: str
+    # Base URL of the platform's API, e.g. for GitHub Enterprise or a
+    # self-managed GitLab. Defaults to the public API.
+    api_url: Optional[str] = None
+    # Glob patterns of files to attach to the release, e.g. "dist/*.whl".
+    assets: List[str] = []
+    # Maximum number of assets uploaded at once.
+    asset_workers: int = Field(default=4, ge=1)
+    # Look the release up first and only create or update it if it differs,
+    # so that re-running a pipeline does not fail or use up the rate limit.
+    idempotent: bool = False
 
 
 class ReleaseCreator(abc.ABC):
     """Create a release on a Git hosting platform (GitHub, GitLab)."""
 
-    def create_release(self, release_config: CreateReleaseConfig, tag: Tag):
-        """."""
+    def __init__(self, client: Optional[HttpClient] = None):
+        """Initialize the release creator.
+
+        Args:
+            client: HTTP client to send requests with, shared between creators.
+                Defaults to a new client with the default config.
+        """
+        self._client = client if client is not None else HttpClient()
+
+    @abc.abstractmethod
+    def create_release(self, release_config: CreateReleaseConfig, tag: Tag) -> bool:
+        """Create the release for a tag.
+
+        Args:
+            release_config: Config of the release.
+            tag: Tag to create the release for.
+
+        Returns:
+            Whether the release was created, or already existed in idempotent mode.
+
+        Raises:
+            ReleaseCreatorException: If some of the assets could not be uploaded.
+        """
+
+    @abc.abstractmethod
+    def upload_asset(
+        self,
+        release_config: CreateReleaseConfig,
+        tag: Tag,
+        release: dict,
+        path: str,
+    ) -> bool:
+        """Attach one file to a created release.
+
+        Args:
+            release_config: Config of the release.
+            tag: Tag of the release.
+            release: The platform's response to creating the release.
+            path: File to upload.
+
+        Returns:
+            Whether the upload succeeded.
+        """
+
+    def get_existing_assets(self, release: dict) -> Dict[str, Optional[int]]:
+        """Get the files already attached to a release.
+
+        Args:
+            release: The platform's representation of the release.
+
+        Returns:
+            The size of each attached file by name, or None if the size is unknown.
+        """
+        return {}
+
+    def upload_assets(
+        self, release_config: CreateReleaseConfig, tag: Tag, release: dict
+    ) -> None:
+        """Upload the files matching `release_config.assets` to a created release.
+
+        Files are streamed from disk, several at a time.
+
+        Args:
+            release_config: Config of the release.
+            tag: Tag of the release.
+            release: The platform's response to creating the release.
+
+        Raises:
+            ReleaseCreatorException: If any file could not be uploaded.
+        """
+        existing = self.get_existing_assets(release)
+        paths = []
+        for pattern in release_config.assets:
+            matches = expand_glob(pattern)
+            if len(matches) == 0:
+                print(f"WARNING: no assets match {pattern}.")
+            for path in matches:
+                name = os.path.basename(path)
+                if name in existing and existing[name] in (None, os.path.getsize(path)):
+                    print(f"Asset {name} is already attached.")
+                elif path not in paths:
+                    paths.append(path)
+        if len(paths) == 0:
+            return
+        with ThreadPoolExecutor(
+            max_workers=min(release_config.asset_workers, len(paths))
+        ) as executor:
+            results = list(
+                executor.map(
+                    lambda path: self.upload_asset(release_config, tag, release, path),
+                    paths,
+                )
+            )
+        failed = [path for path, succeeded in zip(paths, results) if not succeeded]
+        if len(failed) > 0:
+            raise ReleaseCreatorException(
+                f"Failed to upload {len(failed)} of {len(paths)} assets: {', '.join(failed)}"
+            )
+
+    def _update_existing_release(
+        self,
+        platform: str,
+        lookup_url: str,
+        update_method: str,
+        get_update_url: Callable[[dict], str],
+        fields: dict,
+        headers: dict,
+    ) -> Tuple[bool, Optional[dict]]:
+        """Look up a release and update the fields that differ, if any.
+
+        Args:
+            platform: Name of the platform, for messages.
+            lookup_url: URL of the release for the tag.
+            update_method: HTTP method to update the release with.
+            get_update_url: Function giving the update URL for the found release.
+            fields: The release's expected fields.
+            headers: Headers to send with the requests.
+
+        Returns:
+            Whether the release must not be created: True if it exists or the
+            lookup failed. Also the up-to-date release, or None if there is
+            none or it could not be updated.
+        """
+        response = self._client.get(lookup_url, headers=headers)
+        if response.status_code == 404:
+            return False, None
+        if not response.ok:
+            _report(platform, "lookup", response)
+            return True, None
+        release = response.json()
+        changes = {
+            key: value for key, value in fields.items() if release.get(key) != value
+        }
+        if len(changes) == 0:
+            print(f"{platform} release is up to date.")
+            return True, release
+        print(f"Updating {platform} release: {', '.join(changes)}")
+        response = self._client.request(
+            update_method, get_update_url(release), json=changes, headers=headers
+        )
+        _report(platform, "update", response)
+        return True, response.json() if response.ok else None
+
+
+def _report(platform: str, action: str, response: "requests.Response") -> None:
+    """Print the outcome of a request, with the response body only if it failed."""
+    print(f"{platform} {action} status: {response.status_code}")
+    if not response.ok:
+        print(f"{platform} body: {response.text}")
+
+
+def create_releases(
+    releases: List[Tuple[ReleaseCreator, CreateReleaseConfig]], tag: Tag
+) -> None:
+    """Create releases on several platforms at once.
+
+    Each release is created on its own thread, so a slow API does not delay
+    the others. Every release is attempted even if one fails.
+
+    Args:
+        releases: Release creators with their config.
+        tag: Tag to create the releases for.
+
+    Raises:
+        Exception: The first error raised by a release creator, once all are done.
+    """
+    if len(releases) == 0:
+        return
+    with ThreadPoolExecutor(max_workers=len(releases)) as executor:
+        futures = [
+            executor.submit(creator.create_release, release_config, tag)
+            for creator, release_config in releases
+        ]
+    for future in futures:
+        future.result()
 
 
 class GitHubIntegrationConfig(BaseModel):
@@ -37,7 +231,7 @@ class GitLabIntegrationConfig(BaseModel):
 
 
 class GitHubReleaseCreator(ReleaseCreator):
-    def create_release(self, release_config: CreateReleaseConfig, tag: Tag):
+    def create_release(self, release_config: CreateReleaseConfig, tag: Tag) -> bool:
         token = os.getenv(release_config.token_variable, "")
         if len(token) < 1:
             print(
@@ -48,46 +242,154 @@ class GitHubReleaseCreator(ReleaseCreator):
             .replace("%m", str(tag.minor))
             .replace("%p", str(tag.patch))
         )
+        api_url = (release_config.api_url or "https://api.github.com").rstrip("/")
+        releases_url = f"{api_url}/repos/{release_config.project}/releases"
+        fields = {
+            "name": release_title,
+            "body": release_config.body,
+            "draft": False,
+            "prerelease": False,
+        }
+        headers = {
+            "Authorization": f"token {token}",
+            "Content-Type": "application/json",
+        }
+        if release_config.idempotent:
+            exists, release = self._update_existing_release(
+                "GitHub",
+                f"{releases_url}/tags/{urllib.parse.quote(tag.name, safe='')}",
+                "PATCH",
+                lambda release: f"{releases_url}/{release['id']}",
+                fields,
+                headers,
+            )
+            if exists:
+                if release is not None and len(release_config.assets) > 0:
+                    self.upload_assets(release_config, tag, release)
+                return release is not None
         print("POSTing GitHub release")
-        request = requests.post(
-            f"https://api.github.com/repos/{release_config.project}/releases",
-            json={
-                "tag_name": tag.name,
-                "name": release_title,
-                "body": release_config.body,
-                "draft": False,
-                "prerelease": False,
-            },
+        request = self._client.post(
+            releases_url,
+            json={"tag_name": tag.name, **fields},
+            headers=headers,
+        )
+        _report("GitHub", "create", request)
+        if request.ok and len(release_config.assets) > 0:
+            self.upload_assets(release_config, tag, request.json())
+        return request.ok
+
+    def get_existing_assets(self, release: dict) -> Dict[str, Optional[int]]:
+        return {asset["name"]: asset["size"] for asset in release.get("assets", [])}
+
+    def upload_asset(
+        self,
+        release_config: CreateReleaseConfig,
+        tag: Tag,
+        release: dict,
+        path: str,
+    ) -> bool:
+        token = os.getenv(release_config.token_variable, "")
+        name = os.path.basename(path)
+        # The upload URL ends with a URI template for the query, e.g. "{?name,label}".
+        upload_url = re.sub(r"\{[^}]*\}$", "", release["upload_url"])
+        response = self._client.upload(
+            "POST",
+            upload_url,
+            path,
+            params={"name": name},
             headers={
                 "Authorization": f"token {token}",
-                "Content-Type": "application/json",
+                "Content-Type": "application/octet-stream",
             },
         )
-        print(f"Status: {request.status_code}")
-        print(f"Body: {request.content.decode()}")
+        print(f"GitHub asset {name}: {response.status_code}")
+        return response.ok
+
+
+# Generic package that GitLab release assets are uploaded to, one version per tag.
+GITLAB_ASSET_PACKAGE = "release-assets"
 
 
 class GitLabReleaseCreator(ReleaseCreator):
-    def create_release(self, release_config: CreateReleaseConfig, tag: Tag):
+    def create_release(self, release_config: CreateReleaseConfig, tag: Tag) -> bool:
         token = os.getenv("GITLAB_TOKEN")
         release_title = (
             release_config.title_format.replace("%M", str(tag.major))
             .replace("%m", str(tag.minor))
             .replace("%p", str(tag.patch))
         )
+        api_url = (release_config.api_url or "https://gitlab.com/api/v4").rstrip("/")
+        releases_url = f"{api_url}/projects/{release_config.project}/releases"
+        fields = {
+            "name": release_title,
+            "description": release_config.body,
+        }
+        headers = {
+            "PRIVATE-TOKEN": token,
+            "Content-Type": "application/json",
+        }
+        if release_config.idempotent:
+            release_url = f"{releases_url}/{urllib.parse.quote(tag.name, safe='')}"
+            exists, release = self._update_existing_release(
+                "GitLab",
+                release_url,
+                "PUT",
+                lambda release: release_url,
+                fields,
+                headers,
+            )
+            if exists:
+                if release is not None and len(release_config.assets) > 0:
+                    self.upload_assets(release_config, tag, release)
+                return release is not None
         print("POSTing GitLab release")
-        request = requests.post(
-            f"https://gitlab.com/api/v4/projects/{release_config.project}/releases",
-            json={
-                "tag_name": tag.name,
-                "name": release_title,
-                "description": release_config.body,
-                "ref": tag.name,
-            },
-            headers={
-                "PRIVATE-TOKEN": token,
-                "Content-Type": "application/json",
-            },
+        request = self._client.post(
+            releases_url,
+            json={"tag_name": tag.name, **fields, "ref": tag.name},
+            headers=headers,
+        )
+        _report("GitLab", "create", request)
+        if request.ok and len(release_config.assets) > 0:
+            self.upload_assets(release_config, tag, request.json())
+        return request.ok
+
+    def get_existing_assets(self, release: dict) -> Dict[str, Optional[int]]:
+        links = release.get("assets", {}).get("links", [])
+        return {link["name"]: None for link in links}
+
+    def upload_asset(
+        self,
+        release_config: CreateReleaseConfig,
+        tag: Tag,
+        release: dict,
+        path: str,
+    ) -> bool:
+        """Upload a file to the generic package registry and link it from the release."""
+        token = os.getenv("GITLAB_TOKEN")
+        api_url = (release_config.api_url or "https://gitlab.com/api/v4").rstrip("/")
+        name = os.path.basename(path)
+        project_url = f"{api_url}/projects/{release_config.project}"
+        package_url = (
+            f"{project_url}/packages/generic/{GITLAB_ASSET_PACKAGE}"
+            f"/{urllib.parse.quote(tag.name, safe='')}/{urllib.parse.quote(name)}"
+        )
+        response = self._client.upload(
+            "PUT", package_url, path, headers={"PRIVATE-TOKEN": token}
         )
-        print(f"Status: {request.status_code}")
-        print(f"Body: {request.content.decode()}")
+        if response.ok:
+            response = self._client.post(
+                f"{project_url}/releases/{urllib.parse.quote(tag.name, safe='')}"
+                "/assets/links",
+                json={"name": name, "url": package_url, "link_type": "package"},
+                headers={"PRIVATE-TOKEN": token},
+            )
+        print(f"GitLab asset {name}: {response.status_code}")
+        return response.ok
+
+
+# Release creators by name. Each name is also the field of `IntegrationsConfig`
+# holding the creator's `create_release` config.
+RELEASE_CREATORS: Dict[str, Type[ReleaseCreator]] = {
+    "github": GitHubReleaseCreator,
+    "gitlab": GitLabReleaseCreator,
+}
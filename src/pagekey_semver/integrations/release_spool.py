@@ -0,0 +1,292 @@
+"""Module for spooling releases to a local journal and publishing them later."""
+
+import contextlib
+import dataclasses
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from pagekey_semver.integrations.release_creator import (
+    CreateReleaseConfig,
+    ReleaseCreator,
+)
+from pagekey_semver.models import Tag
+
+
+SPOOL_FILE_NAME = "release-spool.jsonl"
+
+
+class SpoolConfig(BaseModel):
+    """Settings for deferring release creation to `pagekey-semver publish`."""
+
+    # Write releases to the spool during `apply` instead of creating them.
+    enabled: bool = False
+    # Path of the spool journal. Defaults to `.git/pagekey-semver/release-spool.jsonl`.
+    path: Optional[str] = None
+    # Releases published before their progress is recorded in the journal.
+    batch_size: int = Field(default=10, ge=1)
+    # Maximum number of releases published at once.
+    max_workers: int = Field(default=4, ge=1)
+
+
+@dataclass
+class SpooledRelease:
+    """A release waiting in the spool to be published."""
+
+    # Name of the release creator, a key of `RELEASE_CREATORS`.
+    creator: str
+    tag: Tag
+    config: CreateReleaseConfig
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        """The (creator, tag name) pair identifying the release."""
+        return self.creator, self.tag.name
+
+
+class ReleaseSpool:
+    """Append-only JSON Lines journal of releases to publish.
+
+    Each line is an event: `queued` when a release is spooled, and
+    `published` once it was created. A release is identified by its creator
+    and tag name, and is pending until a `published` event is written for
+    it; queueing it again after that does not make it pending. Delivery is
+    at least once: releases created before their `published` event is
+    written (e.g. the rest of a batch when `publish` is killed) are sent
+    again on the next run, so use `idempotent` release configs with the
+    spool. A partial last line left by a crash is ignored.
+    """
+
+    def __init__(self, path: str):
+        """Initialize the spool. The journal is created on the first write.
+
+        Args:
+            path: Path to the journal file. Parent directories are created.
+        """
+        self._path = path
+
+    @staticmethod
+    def from_dir(cache_dir: str) -> "ReleaseSpool":
+        """Open the spool stored in a cache directory.
+
+        Args:
+            cache_dir: Directory holding the spool, usually from `GitManager.get_cache_dir`.
+
+        Returns:
+            The opened ReleaseSpool.
+        """
+        return ReleaseSpool(os.path.join(cache_dir, SPOOL_FILE_NAME))
+
+    def queue(
+        self, creator: str, release_config: CreateReleaseConfig, tag: Tag
+    ) -> None:
+        """Add a release to the spool.
+
+        Args:
+            creator: Name of the release creator.
+            release_config: Config to create the release with.
+            tag: Tag to create the release for.
+        """
+        self._append(
+            [
+                {
+                    "event": "queued",
+                    "creator": creator,
+                    "tag": dataclasses.asdict(tag),
+                    "config": release_config.model_dump(),
+                }
+            ]
+        )
+
+    def mark_published(self, releases: List[SpooledRelease]) -> None:
+        """Record that releases were published, in a single write.
+
+        Args:
+            releases: The published releases.
+        """
+        self._append(
+            [
+                {"event": "published", "creator": creator, "tag_name": tag_name}
+                for creator, tag_name in (release.key for release in releases)
+            ]
+        )
+
+    def get_pending(self) -> List[SpooledRelease]:
+        """Get the releases that were queued but not published yet.
+
+        Returns:
+            The pending releases in the order they were first queued, each
+            with the config it was last queued with.
+        """
+        queued: Dict[Tuple[str, str], SpooledRelease] = {}
+        published = set()
+        for event in self._read():
+            try:
+                if event["event"] == "queued":
+                    release = SpooledRelease(
+                        creator=event["creator"],
+                        tag=Tag(**event["tag"]),
+                        config=CreateReleaseConfig(**event["config"]),
+                    )
+                    queued[release.key] = release
+                elif event["event"] == "published":
+                    published.add((event["creator"], event["tag_name"]))
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"Skipping invalid spool entry: {e}")
+        return [release for key, release in queued.items() if key not in published]
+
+    @contextlib.contextmanager
+    def lock(self) -> Iterator[None]:
+        """Hold an exclusive lock, so only one publisher drains the spool at a time.
+
+        Waits for the lock if another process holds it. Queueing releases
+        does not need the lock.
+
+        Raises:
+            OSError: If this platform supports neither `fcntl` nor `msvcrt` locks.
+        """
+        dirs = os.path.dirname(self._path)
+        if len(dirs) > 0:
+            os.makedirs(dirs, exist_ok=True)
+        with open(f"{self._path}.lock", "a+") as lock_file:
+            _lock_file(lock_file.fileno())
+            try:
+                yield
+            finally:
+                _unlock_file(lock_file.fileno())
+
+    def _read(self) -> Iterator[dict]:
+        """Yield the events in the journal, skipping lines that do not parse."""
+        try:
+            file_handle = open(self._path, "r")
+        except FileNotFoundError:
+            return
+        with file_handle:
+            for line in file_handle:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # Partial line from an interrupted write.
+                    continue
+
+    def _append(self, events: List[dict]) -> None:
+        """Append events to the journal in one write, and flush them to disk."""
+        if len(events) == 0:
+            return
+        dirs = os.path.dirname(self._path)
+        if len(dirs) > 0:
+            os.makedirs(dirs, exist_ok=True)
+        data = "".join(
+            json.dumps({**event, "time": time.time()}) + "\n" for event in events
+        ).encode()
+        fd = os.open(self._path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o666)
+        try:
+            size = os.fstat(fd).st_size
+            if size > 0 and os.pread(fd, 1, size - 1) != b"\n":
+                # Start a new line after a partial one.
+                data = b"\n" + data
+            while len(data) > 0:
+                data = data[os.write(fd, data) :]
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def publish_spooled_releases(
+    spool: ReleaseSpool,
+    creators: Dict[str, ReleaseCreator],
+    batch_size: int,
+    max_workers: int,
+) -> List[SpooledRelease]:
+    """Publish the pending releases in the spool.
+
+    Releases are published in batches of `batch_size`, `max_workers` at a
+    time. Once a batch is done, the releases that succeeded are marked as
+    published in one write. Failed releases stay pending for the next run,
+    as do created releases whose batch was interrupted before it was
+    recorded, so these are sent again.
+
+    Args:
+        spool: The spool to drain.
+        creators: Release creators by name.
+        batch_size: Releases published before their progress is recorded.
+        max_workers: Maximum number of releases published at once.
+
+    Returns:
+        The releases that could not be published.
+    """
+    failed = []
+    with spool.lock():
+        pending = spool.get_pending()
+        print(f"Publishing {len(pending)} spooled release(s).")
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start : start + batch_size]
+            with ThreadPoolExecutor(
+                max_workers=min(max_workers, len(batch))
+            ) as executor:
+                results = list(
+                    executor.map(lambda release: _publish(release, creators), batch)
+                )
+            spool.mark_published([release for release, ok in zip(batch, results) if ok])
+            failed.extend(release for release, ok in zip(batch, results) if not ok)
+    return failed
+
+
+def _publish(release: SpooledRelease, creators: Dict[str, ReleaseCreator]) -> bool:
+    """Publish one spooled release, returning whether it succeeded."""
+    creator = creators.get(release.creator)
+    if creator is None:
+        print(f"Unknown release creator {release.creator} for {release.tag.name}.")
+        return False
+    try:
+        return creator.create_release(release.config, release.tag) is True
+    except Exception as e:
+        print(f"{release.creator} release {release.tag.name} failed: {e}")
+        return False
+
+
+def _lock_file(fd: int) -> None:
+    """Take an exclusive lock on an open file, waiting until it is free.
+
+    Uses `fcntl.flock` on POSIX and `msvcrt.locking` on Windows. Both are
+    imported here, so importing this module works on either platform.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        fcntl = None
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        return
+    try:
+        import msvcrt
+    except ImportError:
+        raise OSError("Locking the release spool needs fcntl or msvcrt.")
+    # Lock the first byte; `LK_LOCK` gives up after 10 seconds, so keep trying.
+    os.lseek(fd, 0, os.SEEK_SET)
+    while True:
+        try:
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            continue
+
+
+def _unlock_file(fd: int) -> None:
+    """Release a lock taken with `_lock_file`."""
+    try:
+        import fcntl
+    except ImportError:
+        fcntl = None
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        return
+    import msvcrt
+
+    os.lseek(fd, 0, os.SEEK_SET)
+    msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
@@ -1,7 +1,9 @@
 """Module containg data types imported throughout."""
 
+import bisect
 from dataclasses import dataclass
 import enum
+from typing import Iterable, Iterator, List, Literal, Optional, Tuple, Union
 from pydantic import BaseModel, field_serializer
 
 
@@ -19,6 +21,22 @@ class GitConfig(BaseModel):
 
     name: str
     email: str
+    # How to query Git: "command" runs one Git command per query,
+    # "batch" keeps long-lived `git cat-file` processes open for the whole run.
+    querier: Literal["command", "batch"] = "command"
+    # Whether to have Git drop commits without a configured prefix before they are read.
+    filter_commits: bool = False
+    # How to commit, tag and push: "config" sets the identity and remote in Git config and
+    # restores them afterwards, "env" passes them to each command and pushes once.
+    apply_strategy: Literal["config", "env"] = "config"
+
+
+class CacheConfig(BaseModel):
+    """Options for the release-planning cache stored under `.git/pagekey-semver/`."""
+
+    enabled: bool = True
+    # Maximum number of commit classifications to keep. Least recently used entries are evicted first.
+    max_entries: int = 100000
 
 
 class Prefix(BaseModel):
@@ -42,8 +60,24 @@ class Commit:
 
 
 @dataclass
+class ClassifiedCommits:
+    """Commits since the last release, matched against the configured prefixes."""
+
+    # The biggest release type triggered by any of the commits.
+    release_type: ReleaseType
+    # The commits that start with a configured prefix, in their original order.
+    matched: List[Commit]
+
+
+@dataclass(frozen=True, slots=True)
 class Tag:
-    """Represents a Semver logical tag."""
+    """Represents a Semver logical tag.
+
+    Tags are immutable and hashable. Comparisons with `<`, `<=`, `>`, `>=`
+    order tags by version, then by name, so they agree with `==`: two tags
+    with the same version but different names are never equal, and the one
+    with the smaller name sorts first.
+    """
 
     # The formatted tag name as it appears in Git.
     name: str
@@ -53,3 +87,114 @@ class Tag:
     minor: int
     # The patch part of the version.
     patch: int
+
+    @property
+    def version(self) -> Tuple[int, int, int]:
+        """The (major, minor, patch) sort key."""
+        return (self.major, self.minor, self.patch)
+
+    @property
+    def sort_key(self) -> Tuple[int, int, int, str]:
+        """The (major, minor, patch, name) key that comparisons use."""
+        return (self.major, self.minor, self.patch, self.name)
+
+    def __lt__(self, other: "Tag") -> bool:
+        return self.sort_key < other.sort_key
+
+    def __le__(self, other: "Tag") -> bool:
+        return self.sort_key <= other.sort_key
+
+    def __gt__(self, other: "Tag") -> bool:
+        return self.sort_key > other.sort_key
+
+    def __ge__(self, other: "Tag") -> bool:
+        return self.sort_key >= other.sort_key
+
+
+class TagIndex:
+    """All Git tags of a repo, parsed once.
+
+    Tags matching the tag format are kept sorted by version (then name) for
+    bisect queries, and every tag name is kept in a set for O(1) membership
+    checks, so the tag list only needs to be parsed once per run.
+    """
+
+    def __init__(self, names: Iterable[str], tags: Iterable[Tag] = ()):
+        """Build the index.
+
+        Args:
+            names: Every Git tag name in the repo, including ones that do not match the format.
+            tags: The tags among `names` that match the format, parsed.
+        """
+        self._names = list(names)
+        self._tags = sorted(tags)
+        self._versions = [tag.version for tag in self._tags]
+        self._name_set = frozenset(self._names) | {tag.name for tag in self._tags}
+
+    @property
+    def names(self) -> List[str]:
+        """Every tag name, in the order they were given."""
+        return self._names
+
+    def __contains__(self, tag: object) -> bool:
+        """Check whether a tag exists, by Tag or by name."""
+        if isinstance(tag, Tag):
+            tag = tag.name
+        return tag in self._name_set
+
+    def __iter__(self) -> Iterator[Tag]:
+        """Iterate over the parsed tags, smallest version first."""
+        return iter(self._tags)
+
+    def __len__(self) -> int:
+        """Number of tag names, including ones that do not match the format."""
+        return len(self._name_set)
+
+    def biggest(self) -> Optional[Tag]:
+        """Get the tag with the biggest version.
+
+        Returns:
+            The biggest tag (the first by name if several share the version),
+            or None if no tag matches the format.
+        """
+        if len(self._tags) == 0:
+            return None
+        return self._tags[bisect.bisect_left(self._versions, self._versions[-1])]
+
+    def floor(self, version: Union[Tag, Tuple[int, int, int]]) -> Optional[Tag]:
+        """Get the biggest tag whose version is at most `version`.
+
+        Args:
+            version: A Tag or a (major, minor, patch) tuple.
+
+        Returns:
+            The matching tag, or None if all tags are bigger.
+        """
+        if isinstance(version, Tag):
+            version = version.version
+        index = bisect.bisect_right(self._versions, version)
+        if index == 0:
+            return None
+        return self._tags[bisect.bisect_left(self._versions, self._versions[index - 1])]
+
+    def between(
+        self,
+        low: Union[Tag, Tuple[int, int, int]],
+        high: Union[Tag, Tuple[int, int, int]],
+    ) -> List[Tag]:
+        """Get the tags with `low < version <= high`, smallest first.
+
+        Args:
+            low: Exclusive lower bound, as a Tag or a (major, minor, patch) tuple.
+            high: Inclusive upper bound, as a Tag or a (major, minor, patch) tuple.
+
+        Returns:
+            Tags in the range.
+        """
+        if isinstance(low, Tag):
+            low = low.version
+        if isinstance(high, Tag):
+            high = high.version
+        start = bisect.bisect_right(self._versions, low)
+        stop = bisect.bisect_right(self._versions, high)
+        return self._tags[start:stop]
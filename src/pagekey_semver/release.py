@@ -1,11 +1,41 @@
 """Module for computing release logic. related to computing release."""
 
+# Only the package: `concurrent.futures` imports its process pool (and
+# multiprocessing) the first time `ProcessPoolExecutor` is used.
+import concurrent.futures
+import functools
 import re
-from typing import List, Optional
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 
 from pagekey_semver.config import SemverConfig
-from pagekey_semver.models import Commit, ReleaseType, Tag
+from pagekey_semver.models import (
+    ClassifiedCommits,
+    Commit,
+    Prefix,
+    ReleaseType,
+    Tag,
+    TagIndex,
+)
 
+if TYPE_CHECKING:
+    from pagekey_semver.git.manager import GitManager
+
+
+# Characters that are special in globs. Git does not allow them in tag names.
+GLOB_SPECIAL_CHARACTERS = "*?[\\"
+
+# Histories shorter than this many commits per job are not worth splitting up.
+MIN_SHARD_SIZE = 1000
 
 # This variable assigns a numeric priority to each ReleaseType,
 # which allows the higher numbers to take precedence over the
@@ -34,6 +64,85 @@ def release_greater(a: ReleaseType, b: ReleaseType) -> bool:
     return pri1 < pri2
 
 
+class PrefixMatcher:
+    """Match commit messages against the configured prefixes with dict lookups.
+
+    Built once from the config. A message matches a prefix when it starts with
+    "<label>: ", so instead of trying every prefix in turn, the matcher looks up
+    the text before each ": " near the start of the message.
+    """
+
+    def __init__(self, prefixes: List[Prefix]):
+        """Build the lookup table.
+
+        Args:
+            prefixes: Prefixes from the config. If a label appears more than once,
+                the biggest release type wins.
+        """
+        self._types: Dict[str, ReleaseType] = {}
+        for prefix in prefixes:
+            current = self._types.get(prefix.label)
+            if current is None or release_greater(current, prefix.type):
+                self._types[prefix.label] = prefix.type
+        # No label can match past this point in a message.
+        self._search_end = max((len(label) for label in self._types), default=0) + 2
+
+    def match(self, message: str) -> Optional[ReleaseType]:
+        """Find the release type triggered by a commit message.
+
+        Args:
+            message: The commit message (subject).
+
+        Returns:
+            The biggest ReleaseType among the prefixes the message starts with,
+            or None if it starts with none of them.
+        """
+        release_type = None
+        end = message.find(": ", 0, self._search_end)
+        while end != -1:
+            # Labels may themselves contain ": ", so check every candidate.
+            prefix_type = self._types.get(message[:end])
+            if prefix_type is not None and (
+                release_type is None or release_greater(release_type, prefix_type)
+            ):
+                release_type = prefix_type
+            end = message.find(": ", end + 1, self._search_end)
+        return release_type
+
+    def classify(self, commits: Iterable[Commit]) -> ClassifiedCommits:
+        """Classify commits in a single pass.
+
+        Args:
+            commits: Commits since the last release. Can be a list or a stream.
+
+        Returns:
+            The overall release type and the commits that matched a prefix.
+        """
+        release_type = ReleaseType.NO_RELEASE
+        matched = []
+        for commit in commits:
+            commit_type = self.match(commit.message)
+            if commit_type is None:
+                continue
+            matched.append(commit)
+            if release_greater(release_type, commit_type):
+                release_type = commit_type
+        return ClassifiedCommits(release_type=release_type, matched=matched)
+
+
+def _classify_shard(
+    manager_cls: Type["GitManager"], config: SemverConfig, hashes: List[str]
+) -> ClassifiedCommits:
+    """Read and classify one shard of a parallel scan, in a worker process."""
+    manager = manager_cls(config)
+    try:
+        return PrefixMatcher(config.prefixes).classify(
+            manager.get_commits_by_hash(hashes)
+        )
+    finally:
+        manager.close()
+
+
 class SemverRelease:
     """Class representing a release."""
 
@@ -44,25 +153,170 @@ class SemverRelease:
             config: The SemverConfig to dictate behavior.
         """
         self._config = config
+        self._matcher = PrefixMatcher(config.prefixes)
 
-    def compute_release_type(self, commits: List[Commit]) -> ReleaseType:
+    def compute_release_type(
+        self, commits: Union[Iterable[Commit], ClassifiedCommits]
+    ) -> ReleaseType:
         """Compute release type (major/minor/patch) based on commits.
 
+        Stops reading as soon as the biggest release type any configured prefix
+        can produce has been found, since later commits cannot change the result.
+        If `commits` is a generator, it is closed when done, which stops the
+        underlying `git log` process.
+
         Args:
-            commits: List of commits since last tag.
+            commits: Commits since last tag. Can be a list or a stream such as
+                `GitManager.iter_commits_since`, which is consumed in one pass,
+                or the result of `classify_commits`.
 
         Returns:
             ReleaseType that should be generated based on these commits.
         """
+        if isinstance(commits, ClassifiedCommits):
+            return commits.release_type
+        max_release_type = self.get_max_release_type()
         release_type = ReleaseType.NO_RELEASE
-        for commit in commits:
-            for prefix in self._config.prefixes:
-                if commit.message.startswith(f"{prefix.label}: "):
-                    # Check whether this is greater than the existing value
-                    if release_greater(release_type, prefix.type):
-                        release_type = prefix.type
+        try:
+            for commit in commits:
+                commit_type, _ = self.classify_commit(commit)
+                # Check whether this is greater than the existing value
+                if release_greater(release_type, commit_type):
+                    release_type = commit_type
+                if release_type == max_release_type:
+                    break
+        finally:
+            close = getattr(commits, "close", None)
+            if close is not None:
+                close()
         return release_type
 
+    def classify_commit(self, commit: Commit) -> Tuple[ReleaseType, bool]:
+        """Determine the release type triggered by a single commit.
+
+        Args:
+            commit: The commit to classify.
+
+        Returns:
+            Tuple of the ReleaseType and whether any configured prefix matched.
+        """
+        release_type = self._matcher.match(commit.message)
+        if release_type is None:
+            return ReleaseType.NO_RELEASE, False
+        return release_type, True
+
+    def classify_commits(self, commits: Iterable[Commit]) -> ClassifiedCommits:
+        """Classify every commit in a single pass.
+
+        The result can be passed to both `compute_release_type` and
+        `ChangelogWriter.update_changelog`, so the commits are only matched
+        against the prefixes once.
+
+        Args:
+            commits: Commits since last tag.
+
+        Returns:
+            The overall release type and the commits that matched a prefix, in order.
+        """
+        return self._matcher.classify(commits)
+
+    def classify_commits_parallel(
+        self,
+        manager: "GitManager",
+        since_ref: Optional[str],
+        jobs: int,
+        min_shard_size: int = MIN_SHARD_SIZE,
+    ) -> ClassifiedCommits:
+        """Read and classify the commits since `since_ref` using several processes.
+
+        `git rev-list` lists the commits in the same order as `git log`. The
+        list is split into one contiguous shard per job, and each worker reads
+        and classifies its shard. Shards are merged in order, so the result is
+        the same as `classify_commits(manager.get_commit_messages_since(since_ref))`.
+
+        Args:
+            manager: GitManager for the repository.
+            since_ref: Name of the last release tag, or None to scan all history.
+            jobs: Maximum number of worker processes.
+            min_shard_size: Minimum number of commits per shard. Short histories
+                are read in this process.
+
+        Returns:
+            The overall release type and the commits that matched a prefix, in order.
+        """
+        hashes = manager.get_commit_hashes_since(since_ref)
+        shard_count = min(jobs, len(hashes) // min_shard_size)
+        if shard_count <= 1:
+            return self.classify_commits(manager.get_commits_by_hash(hashes))
+        shard_size = -(-len(hashes) // shard_count)
+        shards = [
+            hashes[start : start + shard_size]
+            for start in range(0, len(hashes), shard_size)
+        ]
+        release_type = ReleaseType.NO_RELEASE
+        matched = []
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=len(shards)
+        ) as executor:
+            # `map` returns results in shard order.
+            for result in executor.map(
+                functools.partial(_classify_shard, type(manager), self._config),
+                shards,
+            ):
+                matched.extend(result.matched)
+                if release_greater(release_type, result.release_type):
+                    release_type = result.release_type
+        return ClassifiedCommits(release_type=release_type, matched=matched)
+
+    def split_into_releases(
+        self, tagged_commits: Iterable[Tuple[Commit, List[str]]]
+    ) -> Iterator[Tuple[Tag, List[Commit]]]:
+        """Split a stream of history into the commits of each release.
+
+        A release starts at a commit tagged with a tag matching `format` and
+        runs until the next (older) such commit. Commits newer than the latest
+        release tag have not been released yet and are skipped. Only one
+        release is held in memory at a time.
+
+        Args:
+            tagged_commits: Tuples of (commit, tag names), newest first,
+                such as `GitManager.iter_tagged_commits`. Generators are closed when done.
+
+        Yields:
+            Tuples of (release tag, commits in that release), newest release first.
+        """
+        release_tag = None
+        commits: List[Commit] = []
+        try:
+            for commit, tag_names in tagged_commits:
+                if len(tag_names) > 0:
+                    tag = self.get_biggest_tag(tag_names)
+                    if tag is not None:
+                        if release_tag is not None:
+                            yield release_tag, commits
+                        release_tag = tag
+                        commits = []
+                if release_tag is not None:
+                    commits.append(commit)
+            if release_tag is not None:
+                yield release_tag, commits
+        finally:
+            close = getattr(tagged_commits, "close", None)
+            if close is not None:
+                close()
+
+    def get_max_release_type(self) -> ReleaseType:
+        """Determine the biggest release type the configured prefixes can produce.
+
+        Returns:
+            The highest-priority ReleaseType among `prefixes` in the config.
+        """
+        max_release_type = ReleaseType.NO_RELEASE
+        for prefix in self._config.prefixes:
+            if release_greater(max_release_type, prefix.type):
+                max_release_type = prefix.type
+        return max_release_type
+
     def get_matching_tags(self, tags: List[str]) -> List[Tag]:
         """Parse git tags and return Tag objects.
 
@@ -95,50 +349,98 @@ class SemverRelease:
                 )
         return matches
 
-    def get_biggest_tag(self, tags: List[str]) -> Optional[Tag]:
+    def index_tags(self, tags: Iterable[str]) -> TagIndex:
+        """Parse git tags once into a TagIndex.
+
+        Args:
+            tags: Full list of Git tags for current repo.
+
+        Returns:
+            Index of all tag names, with the ones matching `format` parsed.
+        """
+        tags = list(tags)
+        return TagIndex(tags, self.get_matching_tags(tags))
+
+    def get_biggest_tag(self, tags: Union[List[str], TagIndex]) -> Optional[Tag]:
         """Among existing tags, determine which is newest.
 
         Args:
-            tags: Full list of Git tags.
+            tags: Full list of Git tags, or a TagIndex of them.
 
         Returns:
             Largest tag if at least one tag was provided.
             None if the `tags` arg was an empty list.
         """
-        tags = self.get_matching_tags(tags)
+        if not isinstance(tags, TagIndex):
+            tags = self.index_tags(tags)
+        return tags.biggest()
+
+    def get_tag_glob(self) -> Optional[str]:
+        """Derive a glob that matches every tag the configured `format` can produce.
+
+        For example, "v%M.%m.%p" becomes "v*.*.*".
+
+        Returns:
+            The glob, or None if tags matching it cannot be searched in version
+            order (placeholders missing, repeated, or out of major/minor/patch order).
+        """
+        format = self._config.format
+        positions = [format.find(placeholder) for placeholder in ("%M", "%m", "%p")]
+        if (
+            any(format.count(placeholder) != 1 for placeholder in ("%M", "%m", "%p"))
+            or positions != sorted(positions)
+            or any(char in format for char in GLOB_SPECIAL_CHARACTERS)
+        ):
+            return None
+        return format.replace("%M", "*").replace("%m", "*").replace("%p", "*")
+
+    def find_biggest_tag(self, tag_names: Iterable[str]) -> Optional[Tag]:
+        """Find the biggest tag in a stream of tag names sorted highest version first.
+
+        Reading stops at the first tag that matches `format`, plus any tags
+        right after it with the same version, so only a handful of names are
+        read from a stream such as `GitManager.iter_tags_by_version`. Among tags
+        with the same version, the first by name wins, as in `get_biggest_tag`.
+        Zero-padded numbers (e.g. "v1.010.0") are ordered the way Git orders them.
+
+        Args:
+            tag_names: Tag names in descending version order. Generators are closed when done.
+
+        Returns:
+            Largest matching tag, or None if no tag matches `format`.
+        """
         max_tag = None
-        for tag in tags:
-            if (
-                max_tag is None
-                or tag.major > max_tag.major
-                or (tag.major == max_tag.major and tag.minor > max_tag.minor)
-                or (
-                    tag.major == max_tag.major
-                    and tag.minor == max_tag.minor
-                    and tag.patch > max_tag.patch
-                )
-            ):
-                max_tag = tag
+        try:
+            for name in tag_names:
+                matches = self.get_matching_tags([name])
+                if len(matches) == 0:
+                    continue
+                tag = matches[0]
+                if max_tag is None:
+                    max_tag = tag
+                elif tag.version != max_tag.version:
+                    break
+                elif tag.name < max_tag.name:
+                    max_tag = tag
+        finally:
+            close = getattr(tag_names, "close", None)
+            if close is not None:
+                close()
         return max_tag
 
-    def compute_next_version(self, release_type: ReleaseType, tags: List[Tag]) -> Tag:
+    def compute_next_version(
+        self, release_type: ReleaseType, tags: Union[List[str], TagIndex]
+    ) -> Tag:
         """Given the release type and tags, determine new tag (if any).
 
         Args:
             release_type: ReleaseType for next version.
-            tags: List of Git tags in repo.
+            tags: List of Git tags in repo, or a TagIndex of them.
 
         Returns:
             Tag representing new version if new release needed.
             Biggest tag among existing tags if no need release needed.
         """
-        if len(tags) < 1:
-            name = (
-                self._config.format.replace("%M", "0")
-                .replace("%m", "1")
-                .replace("%p", "0")
-            )
-            return Tag(name, 0, 1, 0)
         biggest_tag = self.get_biggest_tag(tags)
         if biggest_tag is None:
             max_version = (0, 1, 0)
@@ -149,11 +451,7 @@ class SemverRelease:
         elif release_type == ReleaseType.PATCH:
             max_version = (biggest_tag.major, biggest_tag.minor, biggest_tag.patch + 1)
         else:
-            max_version = (
-                biggest_tag.major,
-                biggest_tag.minor,
-                biggest_tag.patch,
-            )  # NO_RELEASE
+            max_version = biggest_tag.version  # NO_RELEASE
 
         name = (
             self._config.format.replace("%M", str(max_version[0]))
@@ -0,0 +1,54 @@
+"""Module for replacing files atomically."""
+
+import contextlib
+import os
+import shutil
+import tempfile
+from typing import IO, Iterator
+
+
+@contextlib.contextmanager
+def atomic_write(path: str, mode: str = "w") -> Iterator[IO]:
+    """Write a file by replacing it in one step once writing succeeds.
+
+    The content is written to a temporary file in the same directory, flushed
+    to disk, and renamed over `path`. Readers see either the old file or the
+    new one, never a partial write. If the block raises, `path` is untouched.
+
+    Args:
+        path: The file to write.
+        mode: File mode for the temporary file, "w" or "wb".
+
+    Yields:
+        The open temporary file to write the new contents to.
+    """
+    dirs = os.path.dirname(path) or "."
+    temp_file = tempfile.NamedTemporaryFile(
+        mode=mode,
+        dir=dirs,
+        prefix=f".{os.path.basename(path)}.",
+        suffix=".tmp",
+        delete=False,
+    )
+    try:
+        with temp_file:
+            yield temp_file
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        _copy_permissions(path, temp_file.name)
+        os.replace(temp_file.name, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(temp_file.name)
+        raise
+
+
+def _copy_permissions(path: str, temp_path: str) -> None:
+    """Give the temp file the permissions `path` has, or would get if created."""
+    if os.path.exists(path):
+        shutil.copymode(path, temp_path)
+        return
+    # Temp files are private (0600); new files normally honor the umask instead.
+    umask = os.umask(0)
+    os.umask(umask)
+    os.chmod(temp_path, 0o666 & ~umask)
@@ -1,8 +1,11 @@
 """Module for running commands on the system."""
 
 import abc
+import os
 import subprocess
+import tempfile
 from dataclasses import dataclass
+from typing import Dict, Iterator, Optional
 
 
 @dataclass
@@ -31,26 +34,66 @@ class CommandRunner(abc.ABC):
     """Run commands on the system and return relevant info."""
 
     @abc.abstractmethod
-    def run(self, command: str, raise_on_command_fail: bool = True) -> CommandResult:
+    def run(
+        self,
+        command: str,
+        raise_on_command_fail: bool = True,
+        stdin: Optional[str] = None,
+        env: Optional[Dict[str, str]] = None,
+    ) -> CommandResult:
         """Run the command on the system.
 
         Args:
             command: The command to run.
             raise_on_command_fail: Whether to raise an error if the command is not successful.
+            stdin: Text to write to the command's standard input, if any.
+            env: Environment variables to set for the command, on top of the current environment.
 
         Raises:
             CommandFailedException when the command returns a nonzero exit code and raise_on_command_fail is True.
         """
 
+    def stream(
+        self,
+        command: str,
+        chunk_size: int = 65536,
+        raise_on_command_fail: bool = True,
+    ) -> Iterator[bytes]:
+        """Run the command on the system and yield its stdout in chunks.
+
+        The default implementation buffers the whole output using `run`.
+        Closing the returned generator early stops the command.
+
+        Args:
+            command: The command to run.
+            chunk_size: Maximum number of bytes per chunk.
+            raise_on_command_fail: Whether to raise an error if the command is not successful.
+
+        Raises:
+            CommandFailedException when the command returns a nonzero exit code and raise_on_command_fail is True.
+        """
+        result = self.run(command, raise_on_command_fail)
+        stdout = result.stdout.encode()
+        for start in range(0, len(stdout), chunk_size):
+            yield stdout[start : start + chunk_size]
+
 
 class SubprocessCommandRunner(CommandRunner):
     """Use the subprocess module to run commands."""
 
-    def run(self, command: str, raise_on_command_fail: bool = True) -> CommandResult:
+    def run(
+        self,
+        command: str,
+        raise_on_command_fail: bool = True,
+        stdin: Optional[str] = None,
+        env: Optional[Dict[str, str]] = None,
+    ) -> CommandResult:
         # Invoke the command on the system.
         subprocess_result = subprocess.run(
             command,
             shell=True,
+            input=None if stdin is None else stdin.encode(),
+            env=None if env is None else {**os.environ, **env},
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
         )
@@ -65,3 +108,41 @@ class SubprocessCommandRunner(CommandRunner):
             raise CommandRunnerException(command_result)
         # Return result.
         return command_result
+
+    def stream(
+        self,
+        command: str,
+        chunk_size: int = 65536,
+        raise_on_command_fail: bool = True,
+    ) -> Iterator[bytes]:
+        # Spool stderr to a file so a chatty command cannot block on a full pipe.
+        with tempfile.TemporaryFile() as stderr_file:
+            process = subprocess.Popen(
+                command,
+                shell=True,
+                stdout=subprocess.PIPE,
+                stderr=stderr_file,
+            )
+            finished = False
+            try:
+                while True:
+                    chunk = process.stdout.read1(chunk_size)
+                    if len(chunk) == 0:
+                        break
+                    yield chunk
+                finished = True
+            finally:
+                process.stdout.close()
+                if not finished:
+                    # The consumer stopped early - don't wait for the rest of the output.
+                    process.terminate()
+                process.wait()
+            if process.returncode != 0 and raise_on_command_fail:
+                stderr_file.seek(0)
+                raise CommandRunnerException(
+                    CommandResult(
+                        exit_code=process.returncode,
+                        stdout="",
+                        stderr=stderr_file.read().decode(),
+                    )
+                )
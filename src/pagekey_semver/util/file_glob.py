@@ -0,0 +1,104 @@
+"""Module for expanding glob patterns into file paths."""
+
+import fnmatch
+import os
+import re
+from typing import Iterator, List, Sequence, Tuple
+
+
+GLOB_CHARS_PATTERN = re.compile(r"[*?[]")
+
+
+def is_glob(pattern: str) -> bool:
+    """Check whether a path contains glob wildcards.
+
+    Args:
+        pattern: The path to check.
+
+    Returns:
+        True if the path contains `*`, `?` or `[`.
+    """
+    return GLOB_CHARS_PATTERN.search(pattern) is not None
+
+
+def expand_glob(pattern: str, exclude: Sequence[str] = ()) -> List[str]:
+    """Find the files matching a glob pattern.
+
+    Supports `*`, `?` and `[...]` within a path component, and `**` for any
+    number of directories. The pattern is matched one directory level at a
+    time, so only directories that can still match are listed: for
+    `packages/*/package.json`, only `packages/` is listed. Like `glob`,
+    wildcards do not match names starting with a dot unless the pattern
+    does, and `**` does not follow symlinks to directories.
+
+    Args:
+        pattern: The glob pattern, relative to the current directory or absolute.
+        exclude: Glob patterns of files and directories to skip, matched
+            against their name and their path. Excluded directories are not
+            listed at all.
+
+    Returns:
+        Paths of the matching files, sorted.
+    """
+    parts = [part for part in pattern.replace(os.sep, "/").split("/") if part != ""]
+    base = "/" if pattern.startswith(("/", os.sep)) else ""
+    return sorted(set(_match(base, parts, exclude)))
+
+
+def _match(base: str, parts: List[str], exclude: Sequence[str]) -> Iterator[str]:
+    """Yield the files under `base` that match the pattern components."""
+    part, rest = parts[0], parts[1:]
+    if part == "**":
+        if len(rest) > 0:
+            # `**` also matches no directories at all.
+            yield from _match(base, rest, exclude)
+        for path, entry in _list_dir(base, exclude):
+            if entry.name.startswith("."):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                yield from _match(path, parts, exclude)
+            elif len(rest) == 0:
+                yield path
+        return
+    if not is_glob(part):
+        # A literal name is checked directly, without listing its directory.
+        path = os.path.join(base, part)
+        if _is_excluded(path, exclude):
+            return
+        if len(rest) > 0 and os.path.isdir(path):
+            yield from _match(path, rest, exclude)
+        elif len(rest) == 0 and os.path.isfile(path):
+            yield path
+        return
+    for path, entry in _list_dir(base, exclude):
+        if entry.name.startswith(".") and not part.startswith("."):
+            continue
+        if not fnmatch.fnmatchcase(entry.name, part):
+            continue
+        if len(rest) > 0 and entry.is_dir():
+            yield from _match(path, rest, exclude)
+        elif len(rest) == 0 and entry.is_file():
+            yield path
+
+
+def _list_dir(base: str, exclude: Sequence[str]) -> Iterator[Tuple[str, os.DirEntry]]:
+    """Yield the path and entry of each directory entry that is not excluded."""
+    try:
+        with os.scandir(base or ".") as entries:
+            for entry in entries:
+                path = os.path.join(base, entry.name)
+                if not _is_excluded(path, exclude):
+                    yield path, entry
+    except OSError:
+        # Unreadable directories have no matches.
+        return
+
+
+def _is_excluded(path: str, exclude: Sequence[str]) -> bool:
+    """Check whether a path or its name matches one of the exclude patterns."""
+    name = os.path.basename(path)
+    normalized = os.path.normpath(path).replace(os.sep, "/")
+    return any(
+        fnmatch.fnmatchcase(name, pattern) or fnmatch.fnmatchcase(normalized, pattern)
+        for pattern in exclude
+    )
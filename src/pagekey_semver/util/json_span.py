@@ -0,0 +1,105 @@
+"""Module for locating values in JSON documents without parsing all of them."""
+
+import json
+import re
+from typing import Optional, Tuple
+
+
+WHITESPACE_PATTERN = re.compile(rb"[ \t\n\r]*")
+STRING_PATTERN = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+LITERAL_PATTERN = re.compile(
+    rb"-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?|true|false|null"
+)
+# Everything up to the next bracket, with strings skipped as a whole so that
+# brackets inside them are ignored.
+NON_BRACKET_PATTERN = re.compile(
+    rb'[^"\[\]{}]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"\[\]{}]*)*', re.DOTALL
+)
+
+
+def find_value_span(
+    data: bytes, path: str, sep: str = "."
+) -> Optional[Tuple[int, int]]:
+    """Find where the value at a nested key path is in a JSON document.
+
+    Only the objects along the path are read member by member; other values
+    are skipped by matching brackets, and scanning stops at the value. The
+    first occurrence of a duplicated key is used.
+
+    Args:
+        data: The JSON document, e.g. a memory-mapped file.
+        path: The path string specifying the keys, separated by the given separator.
+        sep: The separator used in the path string. Defaults to ".".
+
+    Returns:
+        The start and end offsets of the value, or None if a key on the path
+        is missing or is not an object.
+
+    Raises:
+        ValueError: If the document is not valid JSON up to the value.
+    """
+    pos = _skip_whitespace(data, 0)
+    for key in path.split(sep):
+        if data[pos : pos + 1] != b"{":
+            return None
+        pos = _find_member(data, pos, key)
+        if pos is None:
+            return None
+    return pos, _skip_value(data, pos)
+
+
+def _find_member(data: bytes, pos: int, key: str) -> Optional[int]:
+    """Find the value of `key` in the object starting at `pos`.
+
+    Returns:
+        The offset of the value, or None if the object has no such key.
+    """
+    pos = _skip_whitespace(data, pos + 1)
+    if data[pos : pos + 1] == b"}":
+        return None
+    while True:
+        match = STRING_PATTERN.match(data, pos)
+        if match is None:
+            raise ValueError(f"Expected an object key at offset {pos}.")
+        name = json.loads(match.group())
+        pos = _skip_whitespace(data, match.end())
+        if data[pos : pos + 1] != b":":
+            raise ValueError(f"Expected ':' at offset {pos}.")
+        pos = _skip_whitespace(data, pos + 1)
+        if name == key:
+            return pos
+        pos = _skip_whitespace(data, _skip_value(data, pos))
+        separator = data[pos : pos + 1]
+        if separator == b"}":
+            return None
+        if separator != b",":
+            raise ValueError(f"Expected ',' or '}}' at offset {pos}.")
+        pos = _skip_whitespace(data, pos + 1)
+
+
+def _skip_value(data: bytes, pos: int) -> int:
+    """Get the offset just past the value starting at `pos`."""
+    char = data[pos : pos + 1]
+    if char in (b"{", b"["):
+        depth = 0
+        while True:
+            bracket = data[pos : pos + 1]
+            if bracket in (b"{", b"["):
+                depth += 1
+            elif bracket in (b"}", b"]"):
+                depth -= 1
+                if depth == 0:
+                    return pos + 1
+            else:
+                raise ValueError(f"Unterminated value at offset {pos}.")
+            pos = NON_BRACKET_PATTERN.match(data, pos + 1).end()
+    pattern = STRING_PATTERN if char == b'"' else LITERAL_PATTERN
+    match = pattern.match(data, pos)
+    if match is None:
+        raise ValueError(f"Expected a value at offset {pos}.")
+    return match.end()
+
+
+def _skip_whitespace(data: bytes, pos: int) -> int:
+    """Get the offset of the first non-whitespace byte from `pos`."""
+    return WHITESPACE_PATTERN.match(data, pos).end()
@@ -0,0 +1,43 @@
+"""Module for deferring imports until they are used."""
+
+import importlib
+from typing import Any
+
+
+class LazyModule:
+    """Stand-in for a module that imports it the first time an attribute is used.
+
+    Lets modules keep a module-level name for a slow third-party library
+    (e.g. `yaml = lazy_import("yaml")`) without paying for the import on
+    every run of the CLI. The import system's own locking makes this safe
+    to use from several threads.
+    """
+
+    def __init__(self, name: str):
+        """Initialize the stand-in. Nothing is imported yet.
+
+        Args:
+            name: Import path of the module, e.g. "requests".
+        """
+        self._name = name
+
+    def __getattr__(self, attr: str) -> Any:
+        if attr.startswith("__"):
+            # Keep copy, pickle and mock introspection from importing the module.
+            raise AttributeError(attr)
+        return getattr(importlib.import_module(self._name), attr)
+
+    def __repr__(self) -> str:
+        return f"<lazy module {self._name!r}>"
+
+
+def lazy_import(name: str) -> Any:
+    """Get a module that is only imported once one of its attributes is used.
+
+    Args:
+        name: Import path of the module, e.g. "requests".
+
+    Returns:
+        A LazyModule standing in for the module.
+    """
+    return LazyModule(name)
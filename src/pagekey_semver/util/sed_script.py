@@ -0,0 +1,568 @@
+"""Module for running simple sed scripts without the sed executable."""
+
+import collections
+from dataclasses import dataclass
+import functools
+import re
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from pagekey_semver.util.atomic_file import atomic_write
+
+
+# Size of each read when copying the unchanged start of a file.
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class SedScriptException(Exception):
+    """Raised for scripts that use sed features not supported here."""
+
+
+# Bracket expression classes, e.g. [[:digit:]], as Python character set items.
+POSIX_CLASSES = {
+    "alnum": "a-zA-Z0-9",
+    "alpha": "a-zA-Z",
+    "blank": " \\t",
+    "cntrl": "\\x00-\\x1f\\x7f",
+    "digit": "0-9",
+    "graph": "!-~",
+    "lower": "a-z",
+    "print": " -~",
+    "punct": "!-/:-@\\[-`{-~",
+    "space": " \\t\\n\\r\\f\\v",
+    "upper": "A-Z",
+    "xdigit": "0-9A-Fa-f",
+}
+# Escape sequences in a basic regular expression and their Python equivalents.
+BRE_ESCAPES = {
+    "(": "(",
+    ")": ")",
+    "{": "{",
+    "}": "}",
+    "+": "+",
+    "?": "?",
+    "<": r"\b",
+    ">": r"\b",
+    "`": r"\A",
+    "'": r"\Z",
+    "b": r"\b",
+    "B": r"\B",
+    "w": r"\w",
+    "W": r"\W",
+    "s": r"\s",
+    "S": r"\S",
+    "n": "\n",
+    "t": "\t",
+}
+# Characters that are literal in a basic regular expression but not in Python.
+PYTHON_ONLY_SPECIAL = "+?(){}|"
+# Characters that are special in a basic regular expression.
+BRE_SPECIAL = ".*[]^$"
+
+
+@dataclass(frozen=True)
+class _LineAddress:
+    """Address matching one input line number."""
+
+    line: int
+
+
+@dataclass(frozen=True)
+class _LastLineAddress:
+    """Address `$`, matching the last input line."""
+
+
+@dataclass(frozen=True)
+class _RegexAddress:
+    """Address `/regex/`, matching lines the regex is found in."""
+
+    pattern: re.Pattern
+
+
+_Address = Union[_LineAddress, _LastLineAddress, _RegexAddress]
+
+
+@dataclass(frozen=True)
+class _Substitution:
+    """One `[address[,address]][!]s/regex/replacement/flags` command."""
+
+    start: Optional[_Address]
+    end: Optional[_Address]
+    negate: bool
+    pattern: re.Pattern
+    # Literal text, or the number of a group to insert (0 for the whole match).
+    replacement: Tuple[Union[str, int], ...]
+    occurrence: int
+    replace_all: bool
+
+    def substitute(self, text: str) -> str:
+        """Apply the substitution to one line."""
+
+        def expand(match: re.Match) -> str:
+            return "".join(
+                part if isinstance(part, str) else match.group(part) or ""
+                for part in self.replacement
+            )
+
+        if self.occurrence == 1 and not self.replace_all:
+            return self.pattern.sub(expand, text, count=1)
+        seen = 0
+        previous_end = -1
+
+        def expand_occurrence(match: re.Match) -> str:
+            nonlocal seen, previous_end
+            if match.start() == match.end() == previous_end:
+                # Unlike Python, sed skips an empty match right after a match.
+                return ""
+            previous_end = match.end()
+            seen += 1
+            if seen == self.occurrence or (seen > self.occurrence and self.replace_all):
+                return expand(match)
+            return match.group(0)
+
+        return self.pattern.sub(expand_occurrence, text)
+
+
+class SedScript:
+    """A compiled sed script made of substitutions, applied line by line.
+
+    Supports what version bumps need: `s` commands with the `g`, `<number>`
+    and `I` flags, basic (POSIX and GNU) regular expressions, and
+    line-number, `$` and `/regex/` addresses, ranges, and `!`. Commands are
+    separated by `;` or newlines. Anything else raises SedScriptException
+    while compiling.
+    """
+
+    def __init__(self, commands: List[_Substitution]):
+        """Initialize the script.
+
+        Args:
+            commands: Parsed commands, in order.
+        """
+        self._commands = commands
+
+    @staticmethod
+    def combine(scripts: Iterable["SedScript"]) -> "SedScript":
+        """Combine scripts into one that runs them all in a single pass.
+
+        Args:
+            scripts: Scripts to run, in order.
+
+        Returns:
+            A script with the commands of every script.
+        """
+        return SedScript(
+            [command for script in scripts for command in script._commands]
+        )
+
+    @property
+    def splits_lines(self) -> bool:
+        """Whether a replacement inserts a newline, adding lines to the output."""
+        return any(
+            isinstance(part, str) and "\n" in part
+            for command in self._commands
+            for part in command.replacement
+        )
+
+    def apply(self, lines: Iterable[str]) -> Iterator[str]:
+        """Run the script over lines like `sed` does.
+
+        Args:
+            lines: Input lines, each with its line ending.
+
+        Yields:
+            The output lines, with their line endings.
+        """
+        # Whether each command's address range is open.
+        in_range = [False] * len(self._commands)
+        iterator = iter(lines)
+        line = next(iterator, None)
+        line_number = 0
+        while line is not None:
+            # Read ahead to know whether this is the last line, for `$`.
+            next_line = next(iterator, None)
+            line_number += 1
+            ending = "\n" if line.endswith("\n") else ""
+            text = line[: len(line) - len(ending)]
+            for position, command in enumerate(self._commands):
+                selected, in_range[position] = self._select(
+                    command, in_range[position], line_number, text, next_line is None
+                )
+                if selected != command.negate:
+                    text = command.substitute(text)
+            yield text + ending
+            line = next_line
+
+    def apply_to_file(self, path: str) -> bool:
+        """Run the script over a file, replacing it atomically.
+
+        The file is streamed a line at a time, so memory use does not depend
+        on its size. Bytes that are not valid UTF-8 are kept as they are.
+        The file is only written from the first line the script changes, and
+        not at all if it changes none.
+
+        Args:
+            path: Path to the file to edit in place.
+
+        Returns:
+            Whether the file changed.
+        """
+        with open(path, "rb") as source:
+            # Input lines not yet paired with their output line.
+            pending = collections.deque()
+
+            def read_lines() -> Iterator[str]:
+                for line in source:
+                    pending.append(line)
+                    yield line.decode("utf-8", "surrogateescape")
+
+            output = self.apply(read_lines())
+            unchanged_size = 0
+            for line in output:
+                new_line = line.encode("utf-8", "surrogateescape")
+                old_line = pending.popleft()
+                if new_line != old_line:
+                    break
+                unchanged_size += len(old_line)
+            else:
+                return False
+            with atomic_write(path, "wb") as target:
+                with open(path, "rb") as prefix:
+                    while unchanged_size > 0:
+                        chunk = prefix.read(min(COPY_CHUNK_SIZE, unchanged_size))
+                        if len(chunk) == 0:
+                            break
+                        target.write(chunk)
+                        unchanged_size -= len(chunk)
+                target.write(new_line)
+                for line in output:
+                    pending.popleft()
+                    target.write(line.encode("utf-8", "surrogateescape"))
+        return True
+
+    def _select(
+        self,
+        command: _Substitution,
+        in_range: bool,
+        line_number: int,
+        text: str,
+        is_last: bool,
+    ) -> Tuple[bool, bool]:
+        """Check whether a command's address selects a line.
+
+        Returns:
+            Whether the line is selected, and whether the range stays open.
+        """
+        if command.start is None:
+            return True, False
+        if command.end is None:
+            return self._matches(command.start, line_number, text, is_last), False
+        if in_range:
+            # The end address is only checked after the line that opened the range.
+            return True, not self._matches(command.end, line_number, text, is_last)
+        if not self._matches(command.start, line_number, text, is_last):
+            return False, False
+        if isinstance(command.end, _LineAddress):
+            # A range ending at or before its first line selects only that line.
+            return True, command.end.line > line_number
+        if isinstance(command.end, _LastLineAddress):
+            return True, not is_last
+        return True, True
+
+    def _matches(
+        self, address: _Address, line_number: int, text: str, is_last: bool
+    ) -> bool:
+        """Check whether a single address matches a line."""
+        if isinstance(address, _LineAddress):
+            return address.line == line_number
+        if isinstance(address, _LastLineAddress):
+            return is_last
+        return address.pattern.search(text) is not None
+
+
+@functools.lru_cache(maxsize=None)
+def compile_script(script: str) -> SedScript:
+    """Compile a sed script once for any number of files.
+
+    Args:
+        script: The sed script, as passed to `sed -e`.
+
+    Returns:
+        The compiled script.
+
+    Raises:
+        SedScriptException: If the script uses unsupported features or is invalid.
+    """
+    return SedScript(_ScriptParser(script).parse())
+
+
+class _ScriptParser:
+    """Parser for the supported subset of sed scripts."""
+
+    def __init__(self, script: str):
+        """Initialize the parser.
+
+        Args:
+            script: The sed script to parse.
+        """
+        self._script = script
+        self._pos = 0
+
+    def parse(self) -> List[_Substitution]:
+        """Parse every command in the script."""
+        commands = []
+        while True:
+            self._skip(" \t\n;")
+            if self._pos >= len(self._script):
+                return commands
+            commands.append(self._parse_command())
+
+    def _parse_command(self) -> _Substitution:
+        """Parse one command, starting at its address."""
+        start = self._parse_address()
+        end = None
+        if start is not None and self._peek() == ",":
+            self._pos += 1
+            end = self._parse_address()
+            if end is None:
+                raise SedScriptException("Expected an address after ','.")
+        self._skip(" \t")
+        negate = self._peek() == "!"
+        if negate:
+            self._pos += 1
+            self._skip(" \t")
+        command = self._peek()
+        if command != "s":
+            raise SedScriptException(f"Unsupported sed command: {command!r}")
+        self._pos += 1
+        delimiter = self._peek()
+        if delimiter in ("", "\\", "\n"):
+            raise SedScriptException("Invalid delimiter for the s command.")
+        self._pos += 1
+        regex = self._read_part(delimiter)
+        replacement = self._read_part(delimiter, keep_escaped_delimiter=False)
+        occurrence, replace_all, flags = self._parse_flags()
+        pattern = _compile_bre(regex, flags)
+        parts = _parse_replacement(replacement)
+        for part in parts:
+            if isinstance(part, int) and part > pattern.groups:
+                raise SedScriptException(f"Invalid reference \\{part} in {regex!r}.")
+        return _Substitution(
+            start=start,
+            end=end,
+            negate=negate,
+            pattern=pattern,
+            replacement=tuple(parts),
+            occurrence=occurrence,
+            replace_all=replace_all,
+        )
+
+    def _parse_address(self) -> Optional[_Address]:
+        """Parse an address, if there is one at the current position."""
+        char = self._peek()
+        if char.isdigit():
+            digits_start = self._pos
+            while self._peek().isdigit():
+                self._pos += 1
+            line = int(self._script[digits_start : self._pos])
+            if line == 0 or self._peek() == "~":
+                raise SedScriptException("Unsupported line address.")
+            return _LineAddress(line)
+        if char == "$":
+            self._pos += 1
+            return _LastLineAddress()
+        if char in ("/", "\\"):
+            self._pos += 1
+            delimiter = "/"
+            if char == "\\":
+                delimiter = self._peek()
+                self._pos += 1
+            regex = self._read_part(delimiter)
+            flags = 0
+            if self._peek() == "I":
+                self._pos += 1
+                flags = re.IGNORECASE
+            return _RegexAddress(_compile_bre(regex, flags))
+        if char == "+":
+            raise SedScriptException("Unsupported address: '+'.")
+        return None
+
+    def _parse_flags(self) -> Tuple[int, bool, int]:
+        """Parse the flags of an s command: (occurrence, replace all, regex flags)."""
+        occurrence = 1
+        replace_all = False
+        flags = 0
+        while True:
+            char = self._peek()
+            if char == "g":
+                replace_all = True
+                self._pos += 1
+            elif char in ("i", "I"):
+                flags = re.IGNORECASE
+                self._pos += 1
+            elif char.isdigit():
+                digits_start = self._pos
+                while self._peek().isdigit():
+                    self._pos += 1
+                occurrence = int(self._script[digits_start : self._pos])
+                if occurrence == 0:
+                    raise SedScriptException("The s command's number flag cannot be 0.")
+            elif char in ("", " ", "\t", "\n", ";"):
+                return occurrence, replace_all, flags
+            else:
+                raise SedScriptException(f"Unsupported s command flag: {char!r}")
+
+    def _read_part(self, delimiter: str, keep_escaped_delimiter: bool = True) -> str:
+        """Read up to the next unescaped delimiter, and move past it."""
+        chars = []
+        while True:
+            char = self._peek()
+            if char == "":
+                raise SedScriptException(f"Unterminated command in {self._script!r}.")
+            self._pos += 1
+            if char == delimiter:
+                return "".join(chars)
+            if char == "\\":
+                escaped = self._peek()
+                self._pos += 1
+                if escaped == delimiter and (
+                    not keep_escaped_delimiter or delimiter not in BRE_SPECIAL
+                ):
+                    # `\<delimiter>` stands for the delimiter itself.
+                    chars.append(delimiter)
+                else:
+                    chars.append(char + escaped)
+            else:
+                chars.append(char)
+
+    def _peek(self) -> str:
+        """Get the current character, or "" at the end of the script."""
+        return self._script[self._pos : self._pos + 1]
+
+    def _skip(self, chars: str) -> None:
+        """Move past any of `chars`."""
+        while self._peek() != "" and self._peek() in chars:
+            self._pos += 1
+
+
+def _compile_bre(regex: str, flags: int) -> re.Pattern:
+    """Compile a POSIX basic regular expression (with GNU extensions)."""
+    if regex == "":
+        raise SedScriptException("Empty regular expressions are not supported.")
+    try:
+        return re.compile(_convert_bre(regex), flags | re.DOTALL)
+    except re.error as e:
+        raise SedScriptException(f"Invalid regular expression {regex!r}: {e}")
+
+
+def _convert_bre(regex: str) -> str:
+    """Translate a basic regular expression to Python syntax."""
+    converted = []
+    pos = 0
+    # `*` and `^` are only special at the start of an expression or group.
+    at_start = True
+    while pos < len(regex):
+        char = regex[pos]
+        pos += 1
+        starts_expression = False
+        if char == "\\":
+            if pos >= len(regex):
+                raise SedScriptException("Trailing backslash in regular expression.")
+            escaped = regex[pos]
+            pos += 1
+            if escaped.isdigit() and escaped != "0":
+                converted.append("\\" + escaped)
+            elif escaped == "|":
+                # sed takes the longest alternative that matches, Python the
+                # first one, so the results would differ.
+                raise SedScriptException("Alternation (\\|) is not supported.")
+            elif escaped in BRE_ESCAPES:
+                converted.append(BRE_ESCAPES[escaped])
+                starts_expression = escaped == "("
+            else:
+                converted.append(re.escape(escaped))
+        elif char == "[":
+            bracket, pos = _convert_bracket(regex, pos)
+            converted.append(bracket)
+        elif char == "*" and at_start:
+            converted.append(r"\*")
+            starts_expression = True
+        elif char == "^":
+            converted.append("^" if at_start else r"\^")
+            starts_expression = at_start
+        elif char == "$":
+            at_end = pos == len(regex) or regex[pos : pos + 2] == "\\)"
+            converted.append("$" if at_end else r"\$")
+        elif char in PYTHON_ONLY_SPECIAL:
+            converted.append("\\" + char)
+        else:
+            converted.append(char if char in ".*" else re.escape(char))
+        at_start = starts_expression
+    return "".join(converted)
+
+
+def _convert_bracket(regex: str, pos: int) -> Tuple[str, int]:
+    """Translate a bracket expression that starts just before `pos`."""
+    items = ["["]
+    if regex[pos : pos + 1] == "^":
+        items.append("^")
+        pos += 1
+    if regex[pos : pos + 1] == "]":
+        # A leading `]` is a literal, not the end of the expression.
+        items.append(r"\]")
+        pos += 1
+    while True:
+        if pos >= len(regex):
+            raise SedScriptException("Unterminated bracket expression.")
+        char = regex[pos]
+        if char == "]":
+            items.append("]")
+            return "".join(items), pos + 1
+        if regex.startswith("[:", pos):
+            end = regex.find(":]", pos + 2)
+            name = regex[pos + 2 : end]
+            if end < 0 or name not in POSIX_CLASSES:
+                raise SedScriptException(f"Unsupported character class in {regex!r}.")
+            items.append(POSIX_CLASSES[name])
+            pos = end + 2
+        elif regex.startswith("[.", pos) or regex.startswith("[=", pos):
+            raise SedScriptException(f"Unsupported bracket expression in {regex!r}.")
+        else:
+            # Backslashes are literal inside POSIX bracket expressions.
+            items.append("\\" + char if char in "\\[^&~|" else char)
+            pos += 1
+
+
+def _parse_replacement(replacement: str) -> List[Union[str, int]]:
+    """Split the replacement of an s command into literal text and group numbers."""
+    parts: List[Union[str, int]] = []
+    literal = []
+    pos = 0
+    while pos < len(replacement):
+        char = replacement[pos]
+        pos += 1
+        group = None
+        if char == "&":
+            group = 0
+        elif char == "\\" and pos < len(replacement):
+            escaped = replacement[pos]
+            pos += 1
+            if escaped.isdigit():
+                group = int(escaped)
+            elif escaped in "LUluE":
+                raise SedScriptException(f"Unsupported case conversion: \\{escaped}")
+            elif escaped == "n":
+                literal.append("\n")
+            elif escaped == "t":
+                literal.append("\t")
+            else:
+                literal.append(escaped)
+        else:
+            literal.append(char)
+        if group is not None:
+            if literal:
+                parts.append("".join(literal))
+                literal = []
+            parts.append(group)
+    if literal:
+        parts.append("".join(literal))
+    return parts
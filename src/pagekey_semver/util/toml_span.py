@@ -0,0 +1,137 @@
+"""Module for locating values in TOML documents without parsing all of them."""
+
+import json
+import re
+from typing import List, Optional, Tuple
+
+
+# Whitespace, newlines and comments between statements.
+BLANK_PATTERN = re.compile(r"(?:[ \t\r\n]+|#[^\n]*)*")
+# Whitespace and an optional comment up to the end of a line.
+LINE_END_PATTERN = re.compile(r"[ \t]*(?:#[^\n]*)?(?:\r?\n|$)")
+INLINE_WHITESPACE_PATTERN = re.compile(r"[ \t]*")
+BARE_KEY_PATTERN = re.compile(r"[A-Za-z0-9_-]+")
+BASIC_STRING_PATTERN = re.compile(r'"(?:[^"\\\n]|\\.)*"')
+LITERAL_STRING_PATTERN = re.compile(r"'[^'\n]*'")
+MULTILINE_BASIC_STRING_PATTERN = re.compile(
+    r'"""(?:[^"\\]|\\.|"(?!""))*"{3,5}', re.DOTALL
+)
+MULTILINE_LITERAL_STRING_PATTERN = re.compile(r"'''(?:[^']|'(?!''))*'{3,5}")
+# Numbers, booleans and dates: everything up to a comment or the end of the line.
+SCALAR_PATTERN = re.compile(r"[^\s#,\]}\"'][^\n#,\]}]*")
+# Tokens inside arrays and inline tables: strings and comments are skipped as a
+# whole, so brackets inside them are ignored.
+BRACKET_TOKEN_PATTERN = re.compile(
+    r'"""(?:[^"\\]|\\.|"(?!""))*"{3,5}'
+    r"|'''(?:[^']|'(?!''))*'{3,5}"
+    r'|"(?:[^"\\\n]|\\.)*"'
+    r"|'[^'\n]*'"
+    r"|#[^\n]*"
+    r"|([\[{])|([\]}])",
+    re.DOTALL,
+)
+
+
+def find_value_span(text: str, path: str, sep: str = ".") -> Optional[Tuple[int, int]]:
+    """Find where the value at a nested key path is in a TOML document.
+
+    Handles keys under `[table]` headers and dotted keys. Values inside
+    inline tables and arrays of tables are not found.
+
+    Args:
+        text: The TOML document.
+        path: The path string specifying the keys, separated by the given separator.
+        sep: The separator used in the path string. Defaults to ".".
+
+    Returns:
+        The start and end offsets of the value, or None if it was not found.
+
+    Raises:
+        ValueError: If the document could not be tokenized.
+    """
+    keys = path.split(sep)
+    # Keys of the current table, or None inside an array of tables.
+    table: Optional[List[str]] = []
+    pos = BLANK_PATTERN.match(text, 0).end()
+    while pos < len(text):
+        if text.startswith("[[", pos):
+            _, pos = _parse_key(text, pos + 2)
+            pos = _expect(text, pos, "]]")
+            table = None
+        elif text.startswith("[", pos):
+            table, pos = _parse_key(text, pos + 1)
+            pos = _expect(text, pos, "]")
+        else:
+            key, pos = _parse_key(text, pos)
+            pos = _expect(text, pos, "=")
+            start = INLINE_WHITESPACE_PATTERN.match(text, pos).end()
+            pos = _skip_value(text, start)
+            if table is not None and table + key == keys:
+                return start, pos
+        line_end = LINE_END_PATTERN.match(text, pos)
+        if line_end is None:
+            raise ValueError(f"Expected the end of the line at offset {pos}.")
+        pos = BLANK_PATTERN.match(text, line_end.end()).end()
+    return None
+
+
+def _parse_key(text: str, pos: int) -> Tuple[List[str], int]:
+    """Parse a (possibly dotted) key starting at `pos`."""
+    keys = []
+    while True:
+        pos = INLINE_WHITESPACE_PATTERN.match(text, pos).end()
+        char = text[pos : pos + 1]
+        if char == '"':
+            match = BASIC_STRING_PATTERN.match(text, pos)
+            if match is None:
+                raise ValueError(f"Unterminated key at offset {pos}.")
+            keys.append(json.loads(match.group()))
+        elif char == "'":
+            match = LITERAL_STRING_PATTERN.match(text, pos)
+            if match is None:
+                raise ValueError(f"Unterminated key at offset {pos}.")
+            keys.append(match.group()[1:-1])
+        else:
+            match = BARE_KEY_PATTERN.match(text, pos)
+            if match is None:
+                raise ValueError(f"Expected a key at offset {pos}.")
+            keys.append(match.group())
+        pos = INLINE_WHITESPACE_PATTERN.match(text, match.end()).end()
+        if text[pos : pos + 1] != ".":
+            return keys, pos
+        pos += 1
+
+
+def _expect(text: str, pos: int, token: str) -> int:
+    """Move past `token`, which must come next apart from spaces."""
+    pos = INLINE_WHITESPACE_PATTERN.match(text, pos).end()
+    if not text.startswith(token, pos):
+        raise ValueError(f"Expected {token!r} at offset {pos}.")
+    return pos + len(token)
+
+
+def _skip_value(text: str, pos: int) -> int:
+    """Get the offset just past the value starting at `pos`."""
+    if text[pos : pos + 1] in ("[", "{"):
+        depth = 0
+        for match in BRACKET_TOKEN_PATTERN.finditer(text, pos):
+            if match.lastindex == 1:
+                depth += 1
+            elif match.lastindex == 2:
+                depth -= 1
+                if depth == 0:
+                    return match.end()
+        raise ValueError(f"Unterminated value at offset {pos}.")
+    for pattern in (
+        MULTILINE_BASIC_STRING_PATTERN,
+        MULTILINE_LITERAL_STRING_PATTERN,
+        BASIC_STRING_PATTERN,
+        LITERAL_STRING_PATTERN,
+    ):
+        match = pattern.match(text, pos)
+        if match is not None:
+            return match.end()
+    match = SCALAR_PATTERN.match(text, pos)
+    if match is None:
+        raise ValueError(f"Expected a value at offset {pos}.")
+    return pos + len(match.group().rstrip())
@@ -0,0 +1,176 @@
+"""Module for locating values in YAML documents without parsing all of them."""
+
+import json
+import re
+from typing import List, Optional, Tuple
+
+
+# A block mapping entry: indentation, key, and the rest of the line.
+MAPPING_LINE_PATTERN = re.compile(
+    r"(?P<indent> *)"
+    r"(?P<key>\"(?:[^\"\\]|\\.)*\"|'(?:[^']|'')*'"
+    r"|[^\s'\"#\[\]{},&*!|>%@`?-](?:[^:#\n]|:(?=\S)|(?<=\S)#)*?"
+    r"|-[^\s:#](?:[^:#\n]|:(?=\S)|(?<=\S)#)*?)"
+    r"[ \t]*:(?=[ \t]|\r?$)"
+)
+# A block sequence entry.
+SEQUENCE_LINE_PATTERN = re.compile(r"(?P<indent> *)-(?:[ \t]|\r?$)")
+DOUBLE_QUOTED_PATTERN = re.compile(r'"(?:[^"\\]|\\.)*"')
+SINGLE_QUOTED_PATTERN = re.compile(r"'(?:[^']|'')*'")
+# Whitespace and an optional comment up to the end of the line.
+LINE_END_PATTERN = re.compile(r"[ \t]*(?:#.*)?\r?$")
+# Header of a literal (|) or folded (>) block scalar.
+BLOCK_SCALAR_PATTERN = re.compile(r"[|>][-+0-9]*[ \t]*(?:#.*)?\r?$")
+# Anchors and tags in front of a value.
+PROPERTIES_PATTERN = re.compile(r"(?:[&!]\S*(?:[ \t]+|(?=\r?$)))*")
+# Tokens of a flow collection: quoted strings are skipped as a whole, so
+# brackets inside them are ignored.
+FLOW_TOKEN_PATTERN = re.compile(r"\"(?:[^\"\\]|\\.)*\"|'(?:[^']|'')*'|([\[{])|([\]}])")
+
+
+def find_value_span(text: str, path: str, sep: str = ".") -> Optional[Tuple[int, int]]:
+    """Find where a scalar at a nested key path is in a YAML document.
+
+    Follows block mappings by indentation, one line at a time. Returns None
+    (so the caller can fall back to a full parse) for anything it does not
+    handle: values inside sequences or flow collections, multi-line values
+    other than block scalars, anchors, aliases, tags, and values after the
+    first document.
+
+    Args:
+        text: The YAML document.
+        path: The path string specifying the keys, separated by the given separator.
+        sep: The separator used in the path string. Defaults to ".".
+
+    Returns:
+        The start and end offsets of the scalar, including any quotes, or None.
+    """
+    keys = path.split(sep)
+    # (indentation, key) of the enclosing entries; None for sequence entries.
+    parents: List[Tuple[int, Optional[str]]] = []
+    # Lines indented more than this belong to a block scalar.
+    block_scalar_indent: Optional[int] = None
+    seen_content = False
+    line_start = 0
+    while line_start < len(text):
+        line_end = text.find("\n", line_start)
+        if line_end < 0:
+            line_end = len(text)
+        line = text[line_start:line_end]
+        offset = line_start
+        line_start = line_end + 1
+        stripped = line.strip()
+        indent = len(line) - len(line.lstrip(" "))
+        if block_scalar_indent is not None:
+            if stripped == "" or indent > block_scalar_indent:
+                continue
+            block_scalar_indent = None
+        if stripped == "" or stripped.startswith("#"):
+            continue
+        if line.startswith("%") and not seen_content:
+            continue
+        if line.startswith("---") or line.startswith("..."):
+            if seen_content or line.rstrip() not in ("---", "..."):
+                return None
+            continue
+        seen_content = True
+        match = MAPPING_LINE_PATTERN.match(line)
+        if match is None:
+            if SEQUENCE_LINE_PATTERN.match(line) is not None:
+                while len(parents) > 0 and parents[-1][0] >= indent:
+                    parents.pop()
+                parents.append((indent, None))
+            # Other lines continue a plain scalar.
+            continue
+        key = _decode_key(match.group("key"))
+        while len(parents) > 0 and parents[-1][0] >= indent:
+            parents.pop()
+        path_here = [parent_key for _, parent_key in parents] + [key]
+        value_start = (
+            match.end()
+            + len(line[match.end() :])
+            - len(line[match.end() :].lstrip(" \t"))
+        )
+        value = line[value_start:]
+        rest = value[PROPERTIES_PATTERN.match(value).end() :]
+        if LINE_END_PATTERN.fullmatch(rest) is not None:
+            # A nested mapping or sequence follows.
+            parents.append((indent, key))
+            continue
+        if BLOCK_SCALAR_PATTERN.fullmatch(rest) is not None:
+            if path_here == keys:
+                return None
+            block_scalar_indent = indent
+            continue
+        if path_here != keys:
+            if not _is_single_line(rest):
+                return None
+            continue
+        span = _scalar_span(value)
+        if span is None or _continues(text, line_start, indent):
+            return None
+        return offset + value_start + span[0], offset + value_start + span[1]
+    return None
+
+
+def _decode_key(key: str) -> Optional[str]:
+    """Get the text of a mapping key, or None if it cannot be decoded."""
+    if key.startswith('"'):
+        try:
+            return json.loads(key)
+        except ValueError:
+            return None
+    if key.startswith("'"):
+        return key[1:-1].replace("''", "'")
+    return key
+
+
+def _is_single_line(value: str) -> bool:
+    """Check whether a value other than a block scalar ends on its own line."""
+    if value[0] in "[{":
+        depth = 0
+        for match in FLOW_TOKEN_PATTERN.finditer(value):
+            if match.lastindex == 1:
+                depth += 1
+            elif match.lastindex == 2:
+                depth -= 1
+        return depth == 0
+    if value[0] in "\"'":
+        return _scalar_span(value) is not None
+    return True
+
+
+def _continues(text: str, pos: int, indent: int) -> bool:
+    """Check whether the next non-blank line from `pos` continues a plain scalar."""
+    while pos < len(text):
+        line_end = text.find("\n", pos)
+        if line_end < 0:
+            line_end = len(text)
+        line = text[pos:line_end]
+        pos = line_end + 1
+        if line.strip() == "":
+            continue
+        return len(line) - len(line.lstrip(" ")) > indent and not line.lstrip(
+            " "
+        ).startswith("#")
+    return False
+
+
+def _scalar_span(value: str) -> Optional[Tuple[int, int]]:
+    """Find a single-line scalar at the start of `value`.
+
+    Returns:
+        The start and end of the scalar within `value`, or None if the value
+        is not a single-line scalar.
+    """
+    if value[0] in "[{&*!":
+        return None
+    if value[0] in "\"'":
+        pattern = DOUBLE_QUOTED_PATTERN if value[0] == '"' else SINGLE_QUOTED_PATTERN
+        match = pattern.match(value)
+        if match is None or LINE_END_PATTERN.fullmatch(value, match.end()) is None:
+            return None
+        return 0, match.end()
+    comment = re.search(r"[ \t]#", value)
+    end = len(value) if comment is None else comment.start()
+    return 0, len(value[:end].rstrip(" \t\r"))
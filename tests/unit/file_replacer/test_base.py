@@ -0,0 +1,131 @@
+"""Module to test the file replacer base module."""
+
+import json
+import threading
+from unittest.mock import patch
+
+from pagekey_semver.models import Tag
+from pagekey_semver.file_replacer.base import (
+    ReplaceResult,
+    group_replacers,
+    has_values,
+    run_replacers,
+)
+from pagekey_semver.file_replacer.json import JsonFileReplacer
+from pagekey_semver.file_replacer.sed import SedFileReplacer
+from pagekey_semver.file_replacer.yaml import YamlFileReplacer
+
+
+class Test_group_replacers:
+    def test_with_replacers_for_same_file_groups_consecutive_types(self):
+        # Arrange.
+        chart_version = YamlFileReplacer(name="Chart.yaml", key="version", format="")
+        readme = SedFileReplacer(name="README.md", script="s/a/b/")
+        chart_app = YamlFileReplacer(name="./Chart.yaml", key="appVersion", format="")
+        chart_sed = SedFileReplacer(name="Chart.yaml", script="s/a/b/")
+        chart_tag = YamlFileReplacer(name="Chart.yaml", key="image.tag", format="")
+        package = JsonFileReplacer(name="package.json", key="version", format="")
+
+        # Act.
+        result = group_replacers(
+            [chart_version, readme, chart_app, chart_sed, chart_tag, package]
+        )
+
+        # Assert.
+        assert result == [
+            [chart_version, chart_app],
+            [chart_sed],
+            [chart_tag],
+            [readme],
+            [package],
+        ]
+
+
+class Test_has_values:
+    def test_with_values_set_returns_true(self):
+        # Act, Assert.
+        assert has_values({"a": {"b": "1.0.0"}}, [("a.b", "1.0.0")])
+
+    def test_with_different_or_missing_values_returns_false(self):
+        # Act, Assert.
+        assert not has_values({"a": {"b": "0.1.0"}}, [("a.b", "1.0.0")])
+        assert not has_values({"a": "x"}, [("a.b", "1.0.0")])
+        assert not has_values({}, [("a.b", "1.0.0")])
+
+
+class TestFileReplacer:
+    class Test_expand:
+        def test_with_plain_name_returns_self(self):
+            # Arrange.
+            replacer = JsonFileReplacer(name="missing.json", key="version", format="")
+
+            # Act, Assert.
+            assert replacer.expand() == [replacer]
+
+        def test_with_glob_returns_replacer_per_file(self, tmp_path, monkeypatch):
+            # Arrange.
+            for path in [
+                "a/package.json",
+                "b/package.json",
+                "b/node_modules/x/package.json",
+            ]:
+                (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+                (tmp_path / path).write_text("{}")
+            monkeypatch.chdir(tmp_path)
+            replacer = JsonFileReplacer(
+                name="**/package.json",
+                key="version",
+                format="%M.%m.%p",
+                mode="patch",
+                exclude=["node_modules"],
+            )
+
+            # Act.
+            result = replacer.expand()
+
+            # Assert.
+            assert [file_replacer.name for file_replacer in result] == [
+                "a/package.json",
+                "b/package.json",
+            ]
+            assert all(file_replacer.mode == "patch" for file_replacer in result)
+            assert replacer.name == "**/package.json"
+
+
+class Test_run_replacers:
+    def test_with_many_files_runs_them_on_threads_in_order(self, tmp_path):
+        # Arrange.
+        paths = [tmp_path / f"package{index}.json" for index in range(4)]
+        for path in paths:
+            path.write_text('{"version": "0.1.0"}')
+        paths[2].write_text('{"version": "1.2.3"}')
+        replacers = [
+            JsonFileReplacer(name=str(path), key="version", format="%M.%m.%p")
+            for path in paths
+        ]
+        threads = set()
+        perform_replace_many = JsonFileReplacer.perform_replace_many
+
+        def record_thread(group, tag):
+            threads.add(threading.get_ident())
+            return perform_replace_many(group, tag)
+
+        # Act.
+        with patch.object(
+            JsonFileReplacer, "perform_replace_many", side_effect=record_thread
+        ):
+            results = run_replacers(replacers, Tag("v1.2.3", 1, 2, 3), 2)
+
+        # Assert.
+        assert [result.name for result in results] == [str(path) for path in paths]
+        assert [result.changed for result in results] == [True, True, False, True]
+        assert all(isinstance(result, ReplaceResult) for result in results)
+        assert all(result.seconds >= 0 for result in results)
+        assert threading.get_ident() not in threads
+        assert all(
+            json.loads(path.read_text()) == {"version": "1.2.3"} for path in paths
+        )
+
+    def test_with_no_replacers_returns_empty_list(self):
+        # Act, Assert.
+        assert run_replacers([], Tag("v1.2.3", 1, 2, 3), 4) == []
@@ -1,6 +1,9 @@
 """Module to test JSON file replacer."""
 
+import json
 from unittest.mock import mock_open, patch
+
+import pytest
 from pagekey_semver.models import Tag
 from pagekey_semver.file_replacer.json import JsonFileReplacer
 
@@ -77,3 +80,116 @@ class TestJsonFileReplacer:
                 },
                 "other_key": "untouched",
             }
+
+        def test_with_patch_mode_only_changes_value(self, tmp_path):
+            # Arrange.
+            path = tmp_path / "package.json"
+            path.write_text(
+                '{\n  "name": "demo",\n  "project": {"version":   "0.1.0"},\n'
+                '  "deps": {"x": "^1.0.0"}\n}\n'
+            )
+            replacer = JsonFileReplacer(
+                name=str(path),
+                key="project.version",
+                format="v%M.%m.%p",
+                mode="patch",
+            )
+
+            # Act.
+            replacer.perform_replace(Tag("v4.0.0", 4, 0, 0))
+
+            # Assert.
+            assert path.read_text() == (
+                '{\n  "name": "demo",\n  "project": {"version":   "v4.0.0"},\n'
+                '  "deps": {"x": "^1.0.0"}\n}\n'
+            )
+
+        @pytest.mark.parametrize("contents", ['{"name": "demo"}', "[]", ""])
+        def test_with_patch_mode_and_no_value_rewrites_file(self, tmp_path, contents):
+            # Arrange.
+            path = tmp_path / "package.json"
+            path.write_text(contents)
+            replacer = JsonFileReplacer(
+                name=str(path), key="version", format="%M.%m.%p", mode="patch"
+            )
+
+            # Act.
+            with patch.object(
+                JsonFileReplacer, "_rewrite", autospec=True
+            ) as mock_rewrite:
+                replacer.perform_replace(Tag("v4.0.0", 4, 0, 0))
+
+            # Assert.
+            mock_rewrite.assert_called_with(replacer, [("version", "4.0.0")])
+            assert path.read_text() == contents
+
+        def test_with_patch_mode_and_missing_key_adds_key(self, tmp_path):
+            # Arrange.
+            path = tmp_path / "package.json"
+            path.write_text('{"name": "demo"}')
+            replacer = JsonFileReplacer(
+                name=str(path), key="version", format="%M.%m.%p", mode="patch"
+            )
+
+            # Act.
+            replacer.perform_replace(Tag("v4.0.0", 4, 0, 0))
+
+            # Assert.
+            assert json.loads(path.read_text()) == {"name": "demo", "version": "4.0.0"}
+
+
+class Test_perform_replace_many:
+    def test_with_patch_mode_replaces_every_key(self, tmp_path):
+        # Arrange.
+        path = tmp_path / "package.json"
+        path.write_text('{"version": "0.1.0", "meta": {"app": "v0.1.0"}}')
+        replacers = [
+            JsonFileReplacer(name=str(path), key=key, format=fmt, mode="patch")
+            for key, fmt in [("meta.app", "v%M.%m.%p"), ("version", "%M.%m.%p")]
+        ]
+
+        # Act.
+        JsonFileReplacer.perform_replace_many(replacers, Tag("v4.0.0", 4, 0, 0))
+
+        # Assert.
+        assert path.read_text() == '{"version": "4.0.0", "meta": {"app": "v4.0.0"}}'
+
+    def test_with_overlapping_keys_rewrites_file(self, tmp_path):
+        # Arrange.
+        path = tmp_path / "package.json"
+        path.write_text('{"meta": {"app": "v0.1.0"}}')
+        replacers = [
+            JsonFileReplacer(name=str(path), key=key, format="%M", mode="patch")
+            for key in ["meta.app", "meta"]
+        ]
+
+        # Act.
+        JsonFileReplacer.perform_replace_many(replacers, Tag("v4.0.0", 4, 0, 0))
+
+        # Assert.
+        assert path.read_text() == '{\n    "meta": "4"\n}'
+
+    def test_with_values_already_set_does_not_write_file(self, tmp_path):
+        # Arrange.
+        path = tmp_path / "package.json"
+        path.write_text('{"version": "4.0.0",  "name": "x"}')
+        replacers = [
+            JsonFileReplacer(
+                name=str(path), key="version", format="%M.%m.%p", mode=mode
+            )
+            for mode in ["patch", "rewrite"]
+        ]
+
+        # Act.
+        with patch("builtins.open", wraps=open) as mock_open_file:
+            results = [
+                replacer.perform_replace(Tag("v4.0.0", 4, 0, 0))
+                for replacer in replacers
+            ]
+
+        # Assert.
+        assert results == [False, False]
+        assert all(
+            call.args[1] in ("r", "rb") for call in mock_open_file.call_args_list
+        )
+        assert path.read_text() == '{"version": "4.0.0",  "name": "x"}'
@@ -1,10 +1,12 @@
 """Module to test SED file replacer."""
 
-from unittest.mock import MagicMock
+import shutil
+from unittest.mock import MagicMock, patch
 
 import pytest
 from pagekey_semver.models import Tag
 from pagekey_semver.file_replacer.sed import SedFileReplacer
+from pagekey_semver.util.atomic_file import atomic_write
 from pagekey_semver.util.command_runner import CommandResult, CommandRunnerException
 
 
@@ -25,6 +27,7 @@ class TestSedFileReplacer:
             replacer = SedFileReplacer(
                 name="file.md",
                 script="s/something/other/g",
+                engine="sed",
             )
 
             # Act, Assert.
@@ -50,7 +53,7 @@ class TestSedFileReplacer:
                 (
                     "s/^version='.*'/version=%M.%m.%p/g",
                     Tag("v2.0.0", 2, 0, 1),
-                    "sed -i 's/^version=\\'.*\\'/version=2.0.1/g' file.md",
+                    "sed -i 's/^version='\"'\"'.*'\"'\"'/version=2.0.1/g' file.md",
                 ),
             ],
         )
@@ -79,6 +82,7 @@ class TestSedFileReplacer:
             replacer = SedFileReplacer(
                 name="file.md",
                 script=input_script,
+                engine="sed",
             )
 
             # Act.
@@ -97,3 +101,87 @@ class TestSedFileReplacer:
             # Act, Assert.
             with pytest.raises(CommandRunnerException):
                 replacer.perform_replace(tag)
+
+        def test_with_supported_script_edits_file_without_sed(self, tmp_path):
+            # Arrange.
+            path = tmp_path / "my file.md"
+            path.write_text("# Project\nThis is version 0.0.0.\nversion 0.0.0\n")
+            runner = MagicMock()
+            replacer = SedFileReplacer(
+                name=str(path),
+                script="/^This/s/[0-9]*\\.[0-9]*\\.[0-9]*/%M.%m.%p/",
+            )
+
+            # Act.
+            replacer.perform_replace(Tag("v1.2.3", 1, 2, 3), runner)
+
+            # Assert.
+            assert path.read_text() == (
+                "# Project\nThis is version 1.2.3.\nversion 0.0.0\n"
+            )
+            runner.run.assert_not_called()
+
+        def test_with_unsupported_script_falls_back_to_sed(self):
+            # Arrange.
+            runner = MagicMock()
+            runner.run.return_value = CommandResult(exit_code=0, stdout="", stderr="")
+            replacer = SedFileReplacer(name="my file.md", script="/^x/d")
+
+            # Act.
+            replacer.perform_replace(Tag("v1.2.3", 1, 2, 3), runner)
+
+            # Assert.
+            runner.run.assert_called_with("sed -i '/^x/d' 'my file.md'")
+
+        @pytest.mark.skipif(shutil.which("sed") is None, reason="sed is not installed")
+        def test_with_alternation_uses_sed_longest_match(self, tmp_path):
+            # Arrange.
+            path = tmp_path / "README.md"
+            path.write_text("ab ab ab\n")
+            replacer = SedFileReplacer(name=str(path), script="s/a\\|ab/X/g")
+
+            # Act.
+            replacer.perform_replace(Tag("v1.2.3", 1, 2, 3))
+
+            # Assert.
+            # Python's `re` would take the first alternative: "Xb Xb Xb".
+            assert path.read_text() == "X X X\n"
+
+
+class Test_perform_replace_many:
+    def test_with_supported_scripts_edits_file_in_one_pass(self, tmp_path):
+        # Arrange.
+        path = tmp_path / "README.md"
+        path.write_text("version 0.0.0\nimage: demo:0.0.0\n")
+        replacers = [
+            SedFileReplacer(name=str(path), script="s/^version .*/version %M.%m.%p/"),
+            SedFileReplacer(name=str(path), script="s/demo:.*/demo:%M.%m.%p/"),
+        ]
+
+        # Act.
+        with patch(
+            "pagekey_semver.util.sed_script.atomic_write", wraps=atomic_write
+        ) as mock_atomic_write:
+            SedFileReplacer.perform_replace_many(replacers, Tag("v1.2.3", 1, 2, 3))
+
+        # Assert.
+        assert path.read_text() == "version 1.2.3\nimage: demo:1.2.3\n"
+        mock_atomic_write.assert_called_once()
+
+    def test_with_unsupported_script_runs_scripts_in_order(self, tmp_path):
+        # Arrange.
+        path = tmp_path / "README.md"
+        path.write_text("version 0.0.0\n")
+        runner = MagicMock()
+        runner.run.return_value = CommandResult(exit_code=0, stdout="", stderr="")
+        replacers = [
+            SedFileReplacer(name=str(path), script="s/0.0.0/%M.%m.%p/"),
+            SedFileReplacer(name=str(path), script="/^x/d"),
+        ]
+
+        # Act.
+        SedFileReplacer.perform_replace_many(replacers, Tag("v1.2.3", 1, 2, 3), runner)
+
+        # Assert.
+        assert path.read_text() == "version 1.2.3\n"
+        runner.run.assert_called_with(f"sed -i '/^x/d' {path}")
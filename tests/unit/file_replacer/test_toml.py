@@ -1,8 +1,12 @@
 """Module to test TOML file replacer."""
 
+import os
 from unittest.mock import mock_open, patch
+
+import pytest
+import toml
 from pagekey_semver.models import Tag
-from pagekey_semver.file_replacer.toml import TomlFileReplacer
+from pagekey_semver.file_replacer.toml import TomlFileReplacer, tomllib
 
 
 MODULE_UNDER_TEST = "pagekey_semver.file_replacer.toml"
@@ -10,6 +14,7 @@ MODULE_UNDER_TEST = "pagekey_semver.file_replacer.toml"
 
 class TestTomlFileReplacer:
     class Test_perform_replace:
+        @patch(f"{MODULE_UNDER_TEST}.tomllib", None)
         @patch(f"{MODULE_UNDER_TEST}.toml")
         @patch("builtins.open", new_callable=mock_open)
         def test_with_simple_tag_uses_format_to_replace(
@@ -40,6 +45,7 @@ class TestTomlFileReplacer:
                 "other_key": "untouched",
             }
 
+        @patch(f"{MODULE_UNDER_TEST}.tomllib", None)
         @patch(f"{MODULE_UNDER_TEST}.toml")
         @patch("builtins.open", new_callable=mock_open)
         def test_with_nested_tag_uses_format_to_replace(
@@ -77,3 +83,90 @@ class TestTomlFileReplacer:
                 },
                 "other_key": "untouched",
             }
+
+        @pytest.mark.skipif(tomllib is None, reason="tomllib needs Python 3.11")
+        def test_with_tomllib_parses_with_tomllib(self, tmp_path):
+            # Arrange.
+            path = tmp_path / "pyproject.toml"
+            path.write_text('[project]\nversion = "0.1.0"\n')
+            replacer = TomlFileReplacer(
+                name=str(path), key="project.version", format="%M.%m.%p"
+            )
+
+            # Act.
+            with patch(
+                f"{MODULE_UNDER_TEST}.tomllib.load", wraps=tomllib.load
+            ) as mock_load:
+                replacer.perform_replace(Tag("v4.0.0", 4, 0, 0))
+
+            # Assert.
+            mock_load.assert_called_once()
+            assert toml.loads(path.read_text()) == {"project": {"version": "4.0.0"}}
+
+        @pytest.mark.parametrize(
+            "contents, expected",
+            [
+                (
+                    '# Comment\n[tool.poetry]\nname = "x"  # Name\n'
+                    'version = "0.1.0"  # Version\n',
+                    '# Comment\n[tool.poetry]\nname = "x"  # Name\n'
+                    'version = "4.0.0"  # Version\n',
+                ),
+                (
+                    "[tool]\r\npoetry.version = '0.1.0'\r\n",
+                    "[tool]\r\npoetry.version = '4.0.0'\r\n",
+                ),
+            ],
+        )
+        def test_with_patch_mode_only_changes_value(self, tmp_path, contents, expected):
+            # Arrange.
+            path = tmp_path / "pyproject.toml"
+            path.write_bytes(contents.encode())
+            replacer = TomlFileReplacer(
+                name=str(path),
+                key="tool.poetry.version",
+                format="%M.%m.%p",
+                mode="patch",
+            )
+
+            # Act.
+            replacer.perform_replace(Tag("v4.0.0", 4, 0, 0))
+
+            # Assert.
+            assert path.read_bytes() == expected.encode()
+
+        def test_with_patch_mode_and_missing_key_rewrites_file(self, tmp_path):
+            # Arrange.
+            path = tmp_path / "pyproject.toml"
+            path.write_text('[tool.poetry]\nname = "x"\n')
+            replacer = TomlFileReplacer(
+                name=str(path),
+                key="tool.poetry.version",
+                format="%M.%m.%p",
+                mode="patch",
+            )
+
+            # Act.
+            replacer.perform_replace(Tag("v4.0.0", 4, 0, 0))
+
+            # Assert.
+            assert toml.loads(path.read_text()) == {
+                "tool": {"poetry": {"name": "x", "version": "4.0.0"}}
+            }
+
+        def test_with_value_already_set_does_not_write_file(self, tmp_path):
+            # Arrange.
+            path = tmp_path / "pyproject.toml"
+            path.write_text('[project]\nversion = "4.0.0"\n')
+            modified = path.stat().st_mtime_ns - 10**9
+            os.utime(path, ns=(modified, modified))
+            replacer = TomlFileReplacer(
+                name=str(path), key="project.version", format="%M.%m.%p"
+            )
+
+            # Act.
+            result = replacer.perform_replace(Tag("v4.0.0", 4, 0, 0))
+
+            # Assert.
+            assert result is False
+            assert path.stat().st_mtime_ns == modified
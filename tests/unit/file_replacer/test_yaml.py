@@ -1,7 +1,11 @@
 """Module to test YAML file replacer."""
 
 from unittest.mock import mock_open, patch
+
+import pytest
+import yaml
 from pagekey_semver.models import Tag
+from pagekey_semver.util.atomic_file import atomic_write
 from pagekey_semver.file_replacer.yaml import YamlFileReplacer
 
 
@@ -22,7 +26,7 @@ class TestYamlFileReplacer:
                 key="version",
                 format="%M.%m.%p",
             )
-            mock_yaml.safe_load.return_value = {
+            mock_yaml.load.return_value = {
                 "version": "to be replaced",
                 "other_key": "untouched",
             }
@@ -33,8 +37,13 @@ class TestYamlFileReplacer:
             # Assert.
             mock_builtins_open.assert_any_call("some_file.yaml", "r")
             mock_builtins_open.assert_any_call("some_file.yaml", "w")
-            mock_yaml.safe_load.assert_called_once()
+            mock_yaml.load.assert_called_once_with(
+                mock_builtins_open.return_value, Loader=mock_yaml.CSafeLoader
+            )
             mock_yaml.dump.assert_called_once()
+            assert mock_yaml.dump.call_args_list[0][1] == {
+                "Dumper": mock_yaml.CSafeDumper
+            }
             assert mock_yaml.dump.call_args_list[0][0][0] == {
                 "version": "4.0.0",
                 "other_key": "untouched",
@@ -52,7 +61,7 @@ class TestYamlFileReplacer:
                 key="project.metadata.version",
                 format="%M.%m.%p",
             )
-            mock_yaml.safe_load.return_value = {
+            mock_yaml.load.return_value = {
                 "project": {
                     "metadata": {
                         "version": "to be replaced",
@@ -67,8 +76,13 @@ class TestYamlFileReplacer:
             # Assert.
             mock_builtins_open.assert_any_call("some_file.yaml", "r")
             mock_builtins_open.assert_any_call("some_file.yaml", "w")
-            mock_yaml.safe_load.assert_called_once()
+            mock_yaml.load.assert_called_once_with(
+                mock_builtins_open.return_value, Loader=mock_yaml.CSafeLoader
+            )
             mock_yaml.dump.assert_called_once()
+            assert mock_yaml.dump.call_args_list[0][1] == {
+                "Dumper": mock_yaml.CSafeDumper
+            }
             assert mock_yaml.dump.call_args_list[0][0][0] == {
                 "project": {
                     "metadata": {
@@ -77,3 +91,131 @@ class TestYamlFileReplacer:
                 },
                 "other_key": "untouched",
             }
+
+        @pytest.mark.parametrize(
+            "old_value, new_value",
+            [
+                ("0.1.0", "4.0.0"),
+                ('"0.1.0"', '"4.0.0"'),
+                ("'0.1.0'", "'4.0.0'"),
+            ],
+        )
+        def test_with_patch_mode_only_changes_value(
+            self, tmp_path, old_value, new_value
+        ):
+            # Arrange.
+            path = tmp_path / "values.yaml"
+            template = (
+                "# Helm values\nimage:\n  repository: demo  # Repo\n"
+                "  tag: {}  # Tag\nargs: [--flag]\n"
+            )
+            path.write_text(template.format(old_value))
+            replacer = YamlFileReplacer(
+                name=str(path), key="image.tag", format="%M.%m.%p", mode="patch"
+            )
+
+            # Act.
+            replacer.perform_replace(Tag("v4.0.0", 4, 0, 0))
+
+            # Assert.
+            assert path.read_text() == template.format(new_value)
+
+        def test_with_patch_mode_and_ambiguous_value_quotes_value(self, tmp_path):
+            # Arrange.
+            path = tmp_path / "values.yaml"
+            path.write_text("version: 0.1\n")
+            replacer = YamlFileReplacer(
+                name=str(path), key="version", format="%M.%m", mode="patch"
+            )
+
+            # Act.
+            replacer.perform_replace(Tag("v4.0.0", 4, 0, 0))
+
+            # Assert.
+            assert yaml.safe_load(path.read_text()) == {"version": "4.0"}
+
+        def test_with_patch_mode_and_missing_key_rewrites_file(self, tmp_path):
+            # Arrange.
+            path = tmp_path / "values.yaml"
+            path.write_text("image:\n  repository: demo\n")
+            replacer = YamlFileReplacer(
+                name=str(path), key="image.tag", format="%M.%m.%p", mode="patch"
+            )
+
+            # Act.
+            replacer.perform_replace(Tag("v4.0.0", 4, 0, 0))
+
+            # Assert.
+            assert yaml.safe_load(path.read_text()) == {
+                "image": {"repository": "demo", "tag": "4.0.0"}
+            }
+
+
+class Test_perform_replace_many:
+    def test_with_patch_mode_replaces_every_key_in_one_write(self, tmp_path):
+        # Arrange.
+        path = tmp_path / "Chart.yaml"
+        path.write_text(
+            "version: 0.1.0  # Chart\nappVersion: '0.1.0'\nimage:\n  tag: v0.1.0\n"
+        )
+        replacers = [
+            YamlFileReplacer(name=str(path), key=key, format=fmt, mode="patch")
+            for key, fmt in [
+                ("version", "%M.%m.%p"),
+                ("appVersion", "%M.%m.%p"),
+                ("image.tag", "v%M.%m.%p"),
+            ]
+        ]
+
+        # Act.
+        with patch(
+            "pagekey_semver.file_replacer.base.atomic_write", wraps=atomic_write
+        ) as mock_atomic_write:
+            YamlFileReplacer.perform_replace_many(replacers, Tag("v4.0.0", 4, 0, 0))
+
+        # Assert.
+        assert path.read_text() == (
+            "version: 4.0.0  # Chart\nappVersion: '4.0.0'\nimage:\n  tag: v4.0.0\n"
+        )
+        mock_atomic_write.assert_called_once()
+
+    def test_with_rewrite_mode_parses_file_once(self, tmp_path):
+        # Arrange.
+        path = tmp_path / "Chart.yaml"
+        path.write_text("version: 0.1.0\nappVersion: 0.1.0\n")
+        replacers = [
+            YamlFileReplacer(name=str(path), key=key, format="%M.%m.%p")
+            for key in ["version", "appVersion"]
+        ]
+
+        # Act.
+        with patch(f"{MODULE_UNDER_TEST}.yaml.load", wraps=yaml.load) as mock_load:
+            YamlFileReplacer.perform_replace_many(replacers, Tag("v4.0.0", 4, 0, 0))
+
+        # Assert.
+        mock_load.assert_called_once()
+        assert yaml.safe_load(path.read_text()) == {
+            "version": "4.0.0",
+            "appVersion": "4.0.0",
+        }
+
+    def test_with_values_already_set_does_not_write_file(self, tmp_path):
+        # Arrange.
+        path = tmp_path / "Chart.yaml"
+        path.write_text("version: 4.0.0\nappVersion: '4.0.0'  # App\n")
+        replacers = [
+            YamlFileReplacer(name=str(path), key=key, format="%M.%m.%p", mode="patch")
+            for key in ["version", "appVersion"]
+        ]
+
+        # Act.
+        with patch(
+            "pagekey_semver.file_replacer.base.atomic_write", wraps=atomic_write
+        ) as mock_atomic_write:
+            result = YamlFileReplacer.perform_replace_many(
+                replacers, Tag("v4.0.0", 4, 0, 0)
+            )
+
+        # Assert.
+        assert result is False
+        mock_atomic_write.assert_not_called()
@@ -0,0 +1,283 @@
+"""Test Batch Git Querier module."""
+
+import os
+import subprocess
+
+import pytest
+
+from pagekey_semver.git.batch_querier import (
+    BatchGitQuerier,
+    BatchGitQuerierException,
+    parse_commit,
+)
+from pagekey_semver.git.querier import CommandGitQuerier
+from pagekey_semver.models import Prefix, ReleaseType
+from pagekey_semver.release import PrefixMatcher
+
+
+def git(*args, timestamp=None):
+    """Run a Git command in the current directory."""
+    env = dict(os.environ)
+    if timestamp is not None:
+        env["GIT_AUTHOR_DATE"] = f"@{timestamp} +0000"
+        env["GIT_COMMITTER_DATE"] = f"@{timestamp} +0000"
+    result = subprocess.run(
+        ["git", *args], check=True, stdout=subprocess.PIPE, env=env, text=True
+    )
+    return result.stdout.strip()
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    """Create a repo with a merge and a tag on the current directory."""
+    monkeypatch.chdir(tmp_path)
+    git("init", "-q", "-b", "main")
+    git("config", "user.name", "tester")
+    git("config", "user.email", "tester@example.com")
+    git("commit", "-q", "--allow-empty", "-m", "Initial commit", timestamp=170000000)
+    git("tag", "-a", "v0.1.0", "-m", "annotated")
+    git("checkout", "-q", "-b", "feature")
+    git(
+        "commit", "-q", "--allow-empty", "-m", "feat: Feature work", timestamp=170000100
+    )
+    git("checkout", "-q", "main")
+    git("commit", "-q", "--allow-empty", "-m", "fix: Main work", timestamp=170000200)
+    git("merge", "-q", "--no-ff", "feature", "-m", "Merge feature", timestamp=170000300)
+    git(
+        "commit",
+        "-q",
+        "--allow-empty",
+        "-m",
+        "major: Multi\nline subject\n\nBody text",
+        timestamp=170000400,
+    )
+    return tmp_path
+
+
+class TestBatchGitQuerier:
+    class Test_resolve_ref:
+        def test_with_existing_and_missing_refs_returns_oid_or_none(self, repo):
+            # Arrange.
+            querier = BatchGitQuerier()
+
+            # Act.
+            head = querier.resolve_ref("HEAD")
+            missing = querier.resolve_ref("does-not-exist")
+            querier.close()
+
+            # Assert.
+            assert head == git("rev-parse", "HEAD")
+            assert missing is None
+
+    class Test_get_commit_subject:
+        def test_with_annotated_tag_peels_to_commit(self, repo):
+            # Arrange.
+            querier = BatchGitQuerier()
+
+            # Act.
+            result = querier.get_commit_subject("v0.1.0")
+            querier.close()
+
+            # Assert.
+            assert result == "Initial commit"
+
+    class Test_get_commits:
+        def test_with_no_ref_matches_git_log(self, repo):
+            # Arrange.
+            querier = BatchGitQuerier()
+
+            # Act.
+            result = querier.get_commits()
+            querier.close()
+
+            # Assert.
+            assert result == CommandGitQuerier().get_commits()
+            assert result[0].message == "major: Multi line subject"
+
+        def test_with_ref_matches_git_log_range(self, repo):
+            # Arrange.
+            querier = BatchGitQuerier()
+
+            # Act.
+            result = querier.get_commits("v0.1.0")
+            querier.close()
+
+            # Assert.
+            assert result == CommandGitQuerier().get_commits("v0.1.0")
+            assert [commit.message for commit in result] == [
+                "major: Multi line subject",
+                "Merge feature",
+                "fix: Main work",
+                "feat: Feature work",
+            ]
+
+        def test_with_ref_on_merged_branch_matches_git_log_range(self, repo):
+            # Arrange.
+            git("tag", "v0.2.0", "feature")
+            for index in range(50):
+                git(
+                    "commit",
+                    "-q",
+                    "--allow-empty",
+                    "-m",
+                    f"fix: Later {index}",
+                    timestamp=170000500 + index,
+                )
+            querier = BatchGitQuerier()
+
+            # Act.
+            result = querier.get_commits("v0.2.0")
+            querier.close()
+
+            # Assert.
+            assert result == CommandGitQuerier().get_commits("v0.2.0")
+            assert len(result) == 53
+            assert "feat: Feature work" not in [commit.message for commit in result]
+
+        def test_with_prefixes_matches_git_grep_and_python_filter(self, repo):
+            # Arrange.
+            querier = BatchGitQuerier()
+            git(
+                "commit",
+                "-q",
+                "--allow-empty",
+                "-m",
+                "Revert things\n\nfix: in the body only",
+                timestamp=170000500,
+            )
+            prefixes = ["major", "fix"]
+
+            # Act.
+            result = querier.get_commits(prefixes=prefixes)
+            querier.close()
+
+            # Assert.
+            assert result == CommandGitQuerier().get_commits(prefixes=prefixes)
+            assert result == list(CommandGitQuerier().iter_commits(prefixes=prefixes))
+            assert [commit.message for commit in result] == [
+                "major: Multi line subject",
+                "fix: Main work",
+            ]
+
+        def test_with_prefixes_and_odd_whitespace_classifies_like_no_filter(self, repo):
+            # Arrange.
+            querier = CommandGitQuerier()
+            git("commit", "-q", "--allow-empty", "-m", "  fix:\ttabbed")
+            git("commit", "-q", "--allow-empty", "-m", "feat:\tTabbed feature")
+            git("commit", "-q", "--allow-empty", "-m", "big \t fix: Spaced label")
+            matcher = PrefixMatcher(
+                [
+                    Prefix(label="major", type=ReleaseType.MAJOR),
+                    Prefix(label="feat", type=ReleaseType.MINOR),
+                    Prefix(label="fix", type=ReleaseType.PATCH),
+                    Prefix(label="big fix", type=ReleaseType.PATCH),
+                ]
+            )
+            prefixes = ["major", "feat", "fix", "big fix"]
+
+            # Act.
+            filtered = matcher.classify(querier.get_commits(prefixes=prefixes))
+            streamed = matcher.classify(querier.iter_commits(prefixes=prefixes))
+            unfiltered = matcher.classify(querier.get_commits())
+
+            # Assert.
+            assert filtered == unfiltered
+            assert streamed == unfiltered
+            assert [commit.message for commit in filtered.matched] == [
+                "big fix: Spaced label",
+                "feat: Tabbed feature",
+                "fix: tabbed",
+                "major: Multi line subject",
+                "fix: Main work",
+                "feat: Feature work",
+            ]
+
+        def test_with_head_as_ref_returns_nothing(self, repo):
+            # Arrange.
+            querier = BatchGitQuerier()
+
+            # Act.
+            result = querier.get_commits("HEAD")
+            querier.close()
+
+            # Assert.
+            assert result == []
+
+        def test_with_unknown_ref_raises_error(self, repo):
+            # Arrange.
+            querier = BatchGitQuerier()
+
+            # Act, Assert.
+            with pytest.raises(BatchGitQuerierException):
+                querier.get_commits("does-not-exist")
+            querier.close()
+
+    class Test_get_commits_by_hash:
+        def test_with_hashes_matches_git_log(self, repo):
+            # Arrange.
+            querier = BatchGitQuerier()
+            hashes = querier.get_commit_hashes("v0.1.0")
+
+            # Act.
+            result = querier.get_commits_by_hash(hashes, prefixes=["major", "feat"])
+            querier.close()
+
+            # Assert.
+            assert result == CommandGitQuerier().get_commits_by_hash(
+                hashes, prefixes=["major", "feat"]
+            )
+            assert [commit.message for commit in result] == [
+                "major: Multi line subject",
+                "feat: Feature work",
+            ]
+
+
+def test_commit_readers_with_tab_in_subject_return_same_message(repo):
+    # Arrange.
+    git(
+        "commit",
+        "-q",
+        "--allow-empty",
+        "-m",
+        "fix:\tsomething  odd ",
+        timestamp=170000500,
+    )
+    command_querier = CommandGitQuerier()
+    batch_querier = BatchGitQuerier()
+    head = git("rev-parse", "HEAD")
+
+    # Act.
+    messages = [
+        command_querier.get_commits("v0.1.0")[0].message,
+        next(command_querier.iter_commits("v0.1.0")).message,
+        command_querier.get_commits_by_hash([head])[0].message,
+        next(command_querier.iter_tagged_commits())[0].message,
+        batch_querier.get_commits("v0.1.0")[0].message,
+        next(batch_querier.iter_commits("v0.1.0")).message,
+        batch_querier.get_commits_by_hash([head])[0].message,
+    ]
+    batch_querier.close()
+
+    # Assert.
+    assert messages == ["fix: something odd"] * 7
+
+
+def test_parse_commit_with_merge_returns_all_parents():
+    # Arrange.
+    contents = (
+        b"tree 4b825dc642cb6eb9a060e54bf8d69288fbee4904\n"
+        b"parent aaaa\n"
+        b"parent bbbb\n"
+        b"author A <a@example.com> 1000 +0000\n"
+        b"committer C <c@example.com> 2000 +0100\n"
+        b"\n"
+        b"Merge branch\n"
+    )
+
+    # Act.
+    result = parse_commit("cccc", contents)
+
+    # Assert.
+    assert result.parents == ["aaaa", "bbbb"]
+    assert result.timestamp == 2000
+    assert result.subject == "Merge branch"
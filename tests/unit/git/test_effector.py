@@ -1,6 +1,6 @@
 """Test Git Effector module."""
 
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 from pagekey_semver.git.effector import CommandGitEffector
 
 
@@ -41,6 +41,26 @@ class TestCommandGitEffector:
             # Assert.
             runner.run.assert_called_with('git commit -m "my message"')
 
+    class Test_create_commit_as:
+        def test_with_identity_passes_it_in_env(self):
+            # Arrange.
+            runner = MagicMock()
+            effector = CommandGitEffector(runner)
+
+            # Act.
+            effector.create_commit_as("v1.0.0", "Bot", "bot@example.com")
+
+            # Assert.
+            runner.run.assert_called_with(
+                'git commit -m "v1.0.0"',
+                env={
+                    "GIT_AUTHOR_NAME": "Bot",
+                    "GIT_AUTHOR_EMAIL": "bot@example.com",
+                    "GIT_COMMITTER_NAME": "Bot",
+                    "GIT_COMMITTER_EMAIL": "bot@example.com",
+                },
+            )
+
     class Test_create_tag:
         def test_with_tag_name_adds_tag(self):
             # Arrange.
@@ -64,3 +84,42 @@ class TestCommandGitEffector:
 
             # Assert.
             runner.run.assert_called_with("git push origin main")
+
+    class Test_push_atomic:
+        def test_with_no_header_pushes_refs_at_once(self):
+            # Arrange.
+            runner = MagicMock()
+            effector = CommandGitEffector(runner)
+
+            # Act.
+            effector.push_atomic("origin", ["HEAD", "refs/tags/v1.0.0"])
+
+            # Assert.
+            runner.run.assert_called_once_with(
+                "git push --atomic origin HEAD refs/tags/v1.0.0", env=None
+            )
+
+        @patch.dict("os.environ", {"GIT_CONFIG_COUNT": "1"})
+        def test_with_header_resets_url_headers_then_passes_it_in_env(self):
+            # Arrange.
+            runner = MagicMock()
+            effector = CommandGitEffector(runner)
+
+            # Act.
+            effector.push_atomic(
+                "https://example.com/repo.git",
+                ["HEAD", "refs/tags/v1.0.0"],
+                "Authorization: Basic abc",
+            )
+
+            # Assert.
+            runner.run.assert_called_once_with(
+                "git push --atomic https://example.com/repo.git HEAD refs/tags/v1.0.0",
+                env={
+                    "GIT_CONFIG_COUNT": "3",
+                    "GIT_CONFIG_KEY_1": "http.https://example.com/repo.git.extraHeader",
+                    "GIT_CONFIG_VALUE_1": "",
+                    "GIT_CONFIG_KEY_2": "http.https://example.com/repo.git.extraHeader",
+                    "GIT_CONFIG_VALUE_2": "Authorization: Basic abc",
+                },
+            )
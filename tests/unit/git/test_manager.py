@@ -1,5 +1,6 @@
 """Test Git Manager module."""
 
+import os
 from unittest.mock import MagicMock, call, patch
 
 import pytest
@@ -54,7 +55,7 @@ class TestGitManager:
             result = manager.get_git_tags()
 
             # Assert.
-            result == ["tag1", "tag2"]
+            assert result == ["tag1", "tag2"]
 
     class Test_get_commit_messages:
         def test_with_valid_hash_returns_list_of_messages(self):
@@ -69,6 +70,49 @@ class TestGitManager:
             # Assert.
             mock_git_querier.get_commits.assert_called_with("HEAD~2")
 
+        def test_with_filter_commits_passes_prefixes(self):
+            # Arrange.
+            config = DEFAULT_CONFIG.model_copy(deep=True)
+            config.git.filter_commits = True
+            mock_git_querier = MagicMock()
+            mock_git_effector = MagicMock()
+            manager = GitManager(config, mock_git_querier, mock_git_effector)
+
+            # Act.
+            manager.get_commit_messages_since("HEAD~2")
+
+            # Assert.
+            mock_git_querier.get_commits.assert_called_with(
+                "HEAD~2", prefixes=["major", "minor", "feat", "fix"]
+            )
+
+    class Test_iter_commits_since:
+        def test_with_valid_hash_streams_from_querier(self):
+            # Arrange.
+            mock_git_querier = MagicMock()
+            mock_git_effector = MagicMock()
+            manager = GitManager(DEFAULT_CONFIG, mock_git_querier, mock_git_effector)
+
+            # Act.
+            result = manager.iter_commits_since("HEAD~2")
+
+            # Assert.
+            mock_git_querier.iter_commits.assert_called_with("HEAD~2")
+            assert result == mock_git_querier.iter_commits.return_value
+
+    class Test_get_cache_dir:
+        def test_with_common_dir_returns_subdirectory(self):
+            # Arrange.
+            mock_git_querier = MagicMock()
+            mock_git_querier.get_git_common_dir.return_value = "/repo/.git"
+            manager = GitManager(DEFAULT_CONFIG, mock_git_querier, MagicMock())
+
+            # Act.
+            result = manager.get_cache_dir()
+
+            # Assert.
+            assert result == os.path.join("/repo/.git", "pagekey-semver")
+
     class Test_apply_tag:
         @patch("subprocess.run")
         def test_with_existing_tag_does_nothing(self, mock_run):
@@ -85,6 +129,19 @@ class TestGitManager:
             # Assert.
             mock_git_querier._effector.set_config_item.assert_not_called()
 
+        def test_with_existing_tag_object_in_names_does_nothing(self):
+            # Arrange.
+            existing_tags = ["v0.1.0", "v3.0.0", "v2.0.0"]
+            new_tag = Tag("v3.0.0", 3, 0, 0)
+            mock_git_effector = MagicMock()
+            manager = GitManager(DEFAULT_CONFIG, MagicMock(), mock_git_effector)
+
+            # Act.
+            manager.apply_tag(existing_tags, new_tag)
+
+            # Assert.
+            mock_git_effector.create_tag.assert_not_called()
+
         @patch("os.system")
         def test_with_new_tag_tags_and_pushes(self, mock_system):
             # Arrange.
@@ -149,6 +206,71 @@ class TestGitManager:
                 ]
             )
 
+        @patch.dict(os.environ, {"SEMVER_USER": "user", "SEMVER_TOKEN": "token"})
+        def test_with_env_strategy_does_not_change_git_config(self):
+            # Arrange.
+            new_tag = Tag("v4.0.0", 4, 0, 0)
+            config = DEFAULT_CONFIG.model_copy(deep=True)
+            config.git.apply_strategy = "env"
+            mock_git_querier = MagicMock()
+            mock_git_querier.get_config_item.return_value = (
+                "git@github.com:pagekey/semver.git"
+            )
+            mock_git_effector = MagicMock()
+            manager = GitManager(config, mock_git_querier, mock_git_effector)
+
+            # Act.
+            manager.apply_tag(["v3.0.0"], new_tag)
+
+            # Assert.
+            mock_git_querier.get_config_item.assert_called_once_with(
+                "remote.origin.url"
+            )
+            mock_git_effector.set_config_item.assert_not_called()
+            mock_git_effector.push.assert_not_called()
+            mock_git_effector.add_all.assert_called_once()
+            mock_git_effector.create_commit_as.assert_called_once_with(
+                "v4.0.0", config.git.name, config.git.email
+            )
+            mock_git_effector.create_tag.assert_called_once_with("v4.0.0")
+            mock_git_effector.push_atomic.assert_called_once_with(
+                "https://github.com/pagekey/semver.git",
+                ["HEAD", "refs/tags/v4.0.0"],
+                "Authorization: Basic dXNlcjp0b2tlbg==",
+            )
+
+    class Test_get_push_target:
+        @patch.dict(os.environ, {"SEMVER_USER": "", "SEMVER_TOKEN": ""})
+        def test_with_no_creds_pushes_to_origin(self):
+            # Arrange.
+            mock_git_querier = MagicMock()
+            manager = GitManager(DEFAULT_CONFIG, mock_git_querier, MagicMock())
+
+            # Act.
+            result = manager.get_push_target()
+
+            # Assert.
+            assert result == ("origin", None)
+            mock_git_querier.get_config_item.assert_not_called()
+
+        @patch.dict(os.environ, {"SEMVER_USER": "user", "SEMVER_TOKEN": "token"})
+        def test_with_creds_in_remote_replaces_them_with_header(self):
+            # Arrange.
+            mock_git_querier = MagicMock()
+            mock_git_querier.get_config_item.return_value = (
+                "https://me:me@github.com/pagekey/semver.git"
+            )
+            manager = GitManager(DEFAULT_CONFIG, mock_git_querier, MagicMock())
+
+            # Act.
+            result = manager.get_push_target()
+
+            # Assert.
+            assert result == (
+                "https://github.com/pagekey/semver.git",
+                "Authorization: Basic dXNlcjp0b2tlbg==",
+            )
+
     class Test_set_git_remote:
         @patch(f"{MODULE_UNDER_TEST}.os")
         def test_with_no_creds_changes_nothing(self, mock_os):
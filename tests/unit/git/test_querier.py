@@ -1,7 +1,7 @@
 """Test Git Querier module."""
 
 from unittest.mock import MagicMock
-from pagekey_semver.git.querier import CommandGitQuerier
+from pagekey_semver.git.querier import CommandGitQuerier, build_prefix_pattern
 from pagekey_semver.models import Commit
 from pagekey_semver.util.command_runner import CommandResult
 
@@ -86,3 +86,201 @@ class TestCommandGitQuerier:
                 Commit(hash="abcdef", message="fix: Some commit"),
                 Commit(hash="123456", message="Initial commit"),
             ]
+
+        def test_with_prefixes_filters_in_git_and_python(self):
+            # Arrange.
+            runner = MagicMock()
+            querier = CommandGitQuerier(runner)
+            runner.run.return_value = CommandResult(
+                exit_code=0,
+                # The second commit matched --grep on a body line only.
+                stdout="abcdef fix: Some commit\n123456 Revert something\n",
+                stderr="",
+            )
+
+            # Act.
+            result = querier.get_commits("v1.0.0", prefixes=["fix", "feat"])
+
+            # Assert.
+            runner.run.assert_called_with(
+                'git log --pretty="format:%H %s" --extended-regexp'
+                " --grep='^[[:space:]]*(fix|feat):([[:space:]]|$)' v1.0.0..HEAD"
+            )
+            assert result == [Commit(hash="abcdef", message="fix: Some commit")]
+
+    class Test_iter_commits:
+        def test_with_chunked_output_yields_each_commit(self):
+            # Arrange.
+            runner = MagicMock()
+            querier = CommandGitQuerier(runner)
+            runner.stream.return_value = (
+                chunk
+                for chunk in [
+                    b"abcdef fix: So",
+                    b"me  commit\x00123",
+                    b"456 Initial commit",
+                ]
+            )
+
+            # Act.
+            result = list(querier.iter_commits("v1.0.0"))
+
+            # Assert.
+            runner.stream.assert_called_with(
+                'git log -z --pretty="format:%H %s" v1.0.0..HEAD'
+            )
+            assert result == [
+                Commit(hash="abcdef", message="fix: Some commit"),
+                Commit(hash="123456", message="Initial commit"),
+            ]
+
+        def test_with_early_close_closes_stream(self):
+            # Arrange.
+            runner = MagicMock()
+            querier = CommandGitQuerier(runner)
+            chunks = MagicMock()
+            chunks.__iter__.return_value = iter([b"abcdef fix: One\x00123456 Two\x00"])
+            runner.stream.return_value = chunks
+
+            # Act.
+            commits = querier.iter_commits()
+            first = next(commits)
+            commits.close()
+
+            # Assert.
+            assert first == Commit(hash="abcdef", message="fix: One")
+            chunks.close.assert_called_once()
+
+    class Test_iter_tagged_commits:
+        def test_with_decorations_yields_tag_names(self):
+            # Arrange.
+            runner = MagicMock()
+            querier = CommandGitQuerier(runner)
+            runner.stream.return_value = (
+                chunk
+                for chunk in [
+                    b"abcdef\x1ftag: v1.1.0, tag: latest\x1ffeat:  Two\x00",
+                    b"123456\x1f\x1fInitial commit",
+                ]
+            )
+
+            # Act.
+            result = list(querier.iter_tagged_commits())
+
+            # Assert.
+            runner.stream.assert_called_with(
+                'git log -z --decorate-refs=refs/tags --pretty="format:%H%x1f%D%x1f%s"'
+            )
+            assert result == [
+                (Commit(hash="abcdef", message="feat: Two"), ["v1.1.0", "latest"]),
+                (Commit(hash="123456", message="Initial commit"), []),
+            ]
+
+    class Test_get_commits_by_hash:
+        def test_with_hashes_feeds_them_to_git_log(self):
+            # Arrange.
+            runner = MagicMock()
+            querier = CommandGitQuerier(runner)
+            runner.run.return_value = CommandResult(
+                exit_code=0,
+                stdout="123456 fix: Second\nabcdef Initial commit\n",
+                stderr="",
+            )
+
+            # Act.
+            result = querier.get_commits_by_hash(["123456", "abcdef"])
+
+            # Assert.
+            runner.run.assert_called_with(
+                'git log --no-walk=unsorted --stdin --pretty="format:%H %s"',
+                stdin="123456\nabcdef\n",
+            )
+            assert result == [
+                Commit(hash="123456", message="fix: Second"),
+                Commit(hash="abcdef", message="Initial commit"),
+            ]
+
+        def test_with_no_hashes_does_not_run_git(self):
+            # Arrange.
+            runner = MagicMock()
+            querier = CommandGitQuerier(runner)
+
+            # Act.
+            result = querier.get_commits_by_hash([])
+
+            # Assert.
+            runner.run.assert_not_called()
+            assert result == []
+
+    class Test_iter_tag_names_by_version:
+        def test_with_chunked_output_yields_each_name(self):
+            # Arrange.
+            runner = MagicMock()
+            querier = CommandGitQuerier(runner)
+            runner.stream.return_value = (
+                chunk for chunk in [b"v1.1", b"0.0\nv1.9.0\n", b"v1.0.0\n"]
+            )
+
+            # Act.
+            result = list(querier.iter_tag_names_by_version("v*.*.*"))
+
+            # Assert.
+            runner.stream.assert_called_with(
+                "git for-each-ref --sort=-v:refname"
+                " --format=\"%(refname:strip=2)\" 'refs/tags/v*.*.*'"
+            )
+            assert result == ["v1.10.0", "v1.9.0", "v1.0.0"]
+
+    class Test_resolve_commit:
+        def test_with_missing_ref_returns_none(self):
+            # Arrange.
+            runner = MagicMock()
+            querier = CommandGitQuerier(runner)
+            runner.run.return_value = CommandResult(exit_code=1, stdout="", stderr="")
+
+            # Act.
+            result = querier.resolve_commit("v9.9.9")
+
+            # Assert.
+            runner.run.assert_called_with(
+                "git rev-parse --verify --quiet v9.9.9^{commit}",
+                raise_on_command_fail=False,
+            )
+            assert result is None
+
+    class Test_is_ancestor:
+        def test_with_exit_codes_returns_whether_reachable(self):
+            # Arrange.
+            runner = MagicMock()
+            querier = CommandGitQuerier(runner)
+            runner.run.side_effect = [
+                CommandResult(exit_code=0, stdout="", stderr=""),
+                CommandResult(exit_code=1, stdout="", stderr=""),
+            ]
+
+            # Act.
+            first = querier.is_ancestor("abc", "def")
+            second = querier.is_ancestor("def", "abc")
+
+            # Assert.
+            runner.run.assert_called_with(
+                "git merge-base --is-ancestor def abc", raise_on_command_fail=False
+            )
+            assert first is True
+            assert second is False
+
+
+def test_build_prefix_pattern_escapes_regex_characters():
+    # Act.
+    result = build_prefix_pattern(["fix(ui)", "c++", "a.b"])
+
+    # Assert.
+    assert result == r"^[[:space:]]*(fix\(ui\)|c\+\+|a\.b):([[:space:]]|$)"
+
+
+def test_build_prefix_pattern_with_space_in_label_matches_any_whitespace():
+    # Act.
+    result = build_prefix_pattern(["big  fix"])
+
+    # Assert.
+    assert result == "^[[:space:]]*(big[[:space:]]+fix):([[:space:]]|$)"
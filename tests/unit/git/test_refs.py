@@ -0,0 +1,123 @@
+"""Test filesystem ref reader module."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from pagekey_semver.git.batch_querier import BatchGitQuerier
+from pagekey_semver.git.refs import FilesystemRefReader, RefReaderException
+from pagekey_semver.util.command_runner import CommandResult
+
+
+OID_A = "a" * 40
+OID_B = "b" * 40
+OID_C = "c" * 40
+
+
+def make_git_dir(path):
+    """Create a minimal .git directory layout with packed and loose tags."""
+    git_dir = path / ".git"
+    (git_dir / "refs" / "tags" / "nested").mkdir(parents=True)
+    (git_dir / "packed-refs").write_text(
+        "# pack-refs with: peeled fully-peeled sorted \n"
+        f"{OID_A} refs/heads/main\n"
+        f"{OID_A} refs/tags/v0.1.0\n"
+        f"{OID_B} refs/tags/v0.2.0\n"
+        f"^{OID_C}\n"
+    )
+    # Loose refs override packed refs.
+    (git_dir / "refs" / "tags" / "v0.2.0").write_text(f"{OID_C}\n")
+    (git_dir / "refs" / "tags" / "nested" / "v1.0.0").write_text(f"{OID_A}\n")
+    return git_dir
+
+
+class TestFilesystemRefReader:
+    class Test_get_tag_refs:
+        def test_with_packed_and_loose_refs_merges_them(self, tmp_path):
+            # Arrange.
+            make_git_dir(tmp_path)
+            reader = FilesystemRefReader(str(tmp_path))
+
+            # Act.
+            result = reader.get_tag_refs()
+
+            # Assert.
+            assert result == {
+                "v0.1.0": OID_A,
+                "v0.2.0": OID_C,
+                "nested/v1.0.0": OID_A,
+            }
+
+        def test_with_worktree_reads_common_dir(self, tmp_path):
+            # Arrange.
+            git_dir = make_git_dir(tmp_path / "main")
+            worktree_git_dir = git_dir / "worktrees" / "wt"
+            worktree_git_dir.mkdir(parents=True)
+            (worktree_git_dir / "commondir").write_text("../..\n")
+            worktree = tmp_path / "wt"
+            (worktree / "sub").mkdir(parents=True)
+            (worktree / ".git").write_text(f"gitdir: {worktree_git_dir}\n")
+            reader = FilesystemRefReader(str(worktree / "sub"))
+
+            # Act.
+            result = reader.get_tag_refs()
+
+            # Assert.
+            assert result["v0.1.0"] == OID_A
+            assert reader.find_git_dirs() == (str(worktree_git_dir), str(git_dir))
+
+        def test_with_reftable_raises_error(self, tmp_path):
+            # Arrange.
+            git_dir = make_git_dir(tmp_path)
+            (git_dir / "reftable").mkdir()
+            reader = FilesystemRefReader(str(tmp_path))
+
+            # Act, Assert.
+            with pytest.raises(RefReaderException):
+                reader.get_tag_refs()
+
+        def test_with_symbolic_tag_raises_error(self, tmp_path):
+            # Arrange.
+            git_dir = make_git_dir(tmp_path)
+            (git_dir / "refs" / "tags" / "latest").write_text("ref: refs/tags/v0.1.0\n")
+            reader = FilesystemRefReader(str(tmp_path))
+
+            # Act, Assert.
+            with pytest.raises(RefReaderException):
+                reader.get_tag_refs()
+
+
+class TestBatchGitQuerierTags:
+    def test_get_tag_names_with_filesystem_layout_returns_sorted_names(self, tmp_path):
+        # Arrange.
+        make_git_dir(tmp_path)
+        runner = MagicMock()
+        querier = BatchGitQuerier(runner, cwd=str(tmp_path))
+
+        # Act.
+        result = querier.get_tag_names()
+
+        # Assert.
+        runner.run.assert_not_called()
+        assert result == ["nested/v1.0.0", "v0.1.0", "v0.2.0"]
+
+    @patch.dict("os.environ", {"GIT_DIR": "/somewhere/else"})
+    def test_get_tag_refs_with_unusual_layout_falls_back_to_git(self, tmp_path):
+        # Arrange.
+        make_git_dir(tmp_path)
+        runner = MagicMock()
+        runner.run.return_value = CommandResult(
+            exit_code=0,
+            stdout=f"{OID_A} v9.0.0\n",
+            stderr="",
+        )
+        querier = BatchGitQuerier(runner, cwd=str(tmp_path))
+
+        # Act.
+        result = querier.get_tag_refs()
+
+        # Assert.
+        runner.run.assert_called_with(
+            'git for-each-ref --format="%(objectname) %(refname:strip=2)" refs/tags'
+        )
+        assert result == {"v9.0.0": OID_A}
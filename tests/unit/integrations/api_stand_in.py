@@ -0,0 +1,103 @@
+"""Local HTTP server standing in for the GitHub/GitLab APIs in tests."""
+
+import hashlib
+import http.server
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+
+@dataclass
+class RecordedRequest:
+    """A request received by the stand-in server."""
+
+    method: str
+    path: str
+    headers: Dict[str, str]
+    body_size: int
+    body_sha256: str
+    client_address: Tuple[str, int]
+
+
+@dataclass
+class StandInResponse:
+    """A response for the stand-in server to send."""
+
+    status: int = 200
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: Optional[dict] = None
+    # Seconds to wait after handling the request before answering.
+    delay: float = 0.0
+
+
+class StandInHandler(http.server.BaseHTTPRequestHandler):
+    """Answer each request with the next queued response, reading bodies in chunks."""
+
+    protocol_version = "HTTP/1.1"
+
+    def _handle(self):
+        digest = hashlib.sha256()
+        remaining = int(self.headers.get("Content-Length", 0))
+        size = remaining
+        while remaining > 0:
+            chunk = self.rfile.read(min(65536, remaining))
+            if len(chunk) == 0:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+        with self.server.lock:
+            self.server.requests.append(
+                RecordedRequest(
+                    method=self.command,
+                    path=self.path,
+                    headers=dict(self.headers),
+                    body_size=size,
+                    body_sha256=digest.hexdigest(),
+                    client_address=self.client_address,
+                )
+            )
+            response = self.server.responses.pop(0)
+        time.sleep(response.delay)
+        body = json.dumps(response.body or {}).replace("{url}", self.server.url)
+        if response.status == 304:
+            # Not Modified responses have no body.
+            body = ""
+        self.send_response(response.status)
+        for name, value in response.headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+    do_GET = do_POST = do_PUT = do_PATCH = _handle
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer(http.server.ThreadingHTTPServer):
+    """Stand-in API server on a free local port.
+
+    `{url}` in response bodies is replaced with the server's base URL.
+    """
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.lock = threading.Lock()
+        self.requests: List[RecordedRequest] = []
+        self.responses: List[StandInResponse] = []
+        self.url = f"http://127.0.0.1:{self.server_address[1]}"
+        self._thread = threading.Thread(
+            target=self.serve_forever, args=(0.05,), daemon=True
+        )
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,305 @@
+"""Test HTTP client module."""
+
+import hashlib
+import socket
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from pagekey_semver.integrations.http_client import (
+    EtagCache,
+    HttpClient,
+    HttpClientConfig,
+)
+from tests.unit.integrations.api_stand_in import StandInResponse, StandInServer
+
+
+MODULE_UNDER_TEST = "pagekey_semver.integrations.http_client"
+
+
+@pytest.fixture
+def server():
+    with StandInServer() as server:
+        yield server
+
+
+def get_url(server, path="/releases"):
+    return f"{server.url}{path}"
+
+
+class TestHttpClient:
+    class Test_request:
+        def test_with_retry_after_waits_and_reuses_connection(self, server):
+            # Arrange.
+            server.responses = [
+                StandInResponse(503, {"Retry-After": "2"}),
+                StandInResponse(201, {}),
+            ]
+            sleeps = []
+            client = HttpClient(sleep=sleeps.append)
+
+            # Act.
+            response = client.post(get_url(server), json={"tag_name": "v1.0.0"})
+
+            # Assert.
+            assert response.status_code == 201
+            assert sleeps == [2.0]
+            assert len(server.requests) == 2
+            # Both attempts used the same kept-alive connection.
+            assert (
+                server.requests[0].client_address == server.requests[1].client_address
+            )
+            client.close()
+
+        def test_with_exhausted_rate_limit_waits_until_reset(self, server):
+            # Arrange.
+            server.responses = [
+                StandInResponse(
+                    403, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "1005"}
+                ),
+                StandInResponse(201, {}),
+            ]
+            sleeps = []
+            client = HttpClient(sleep=sleeps.append)
+
+            # Act.
+            with patch(f"{MODULE_UNDER_TEST}.time.time", return_value=1000.0):
+                response = client.request("PUT", get_url(server))
+
+            # Assert.
+            assert response.status_code == 201
+            assert sleeps == [5.0]
+            client.close()
+
+        def test_with_client_error_returns_it_without_retrying(self, server):
+            # Arrange.
+            server.responses = [StandInResponse(422, {"X-RateLimit-Remaining": "10"})]
+            sleeps = []
+            client = HttpClient(sleep=sleeps.append)
+
+            # Act.
+            response = client.post(get_url(server))
+
+            # Assert.
+            assert response.status_code == 422
+            assert sleeps == []
+            client.close()
+
+        def test_with_server_errors_backs_off_then_returns_last_response(self, server):
+            # Arrange.
+            server.responses = [
+                StandInResponse(502, {}),
+                StandInResponse(500, {}),
+                StandInResponse(503, {}),
+            ]
+            sleeps = []
+            config = HttpClientConfig(max_retries=2, backoff_factor=0.5)
+            client = HttpClient(config, sleep=sleeps.append)
+
+            # Act.
+            response = client.request("PUT", get_url(server))
+
+            # Assert.
+            assert response.status_code == 503
+            assert sleeps == [0.5, 1.0]
+            client.close()
+
+        def test_with_server_error_on_post_returns_it_without_retrying(self, server):
+            # Arrange.
+            server.responses = [StandInResponse(502, {})]
+            sleeps = []
+            client = HttpClient(sleep=sleeps.append)
+
+            # Act.
+            response = client.post(get_url(server))
+
+            # Assert.
+            assert response.status_code == 502
+            assert sleeps == []
+            assert len(server.requests) == 1
+            client.close()
+
+        def test_with_read_timeout_on_handled_post_raises_without_retrying(
+            self, server
+        ):
+            # Arrange.
+            server.responses = [
+                # The release is created, but the answer comes too late.
+                StandInResponse(201, {}, delay=0.5),
+                StandInResponse(422, {}, {"errors": [{"code": "already_exists"}]}),
+            ]
+            sleeps = []
+            config = HttpClientConfig(read_timeout=0.1)
+            client = HttpClient(config, sleep=sleeps.append)
+
+            # Act.
+            with pytest.raises(requests.ReadTimeout):
+                client.post(get_url(server), json={"tag_name": "v1.0.0"})
+
+            # Assert.
+            assert sleeps == []
+            assert len(server.requests) == 1
+            client.close()
+
+        def test_with_read_timeout_on_get_retries(self, server):
+            # Arrange.
+            server.responses = [
+                StandInResponse(200, {}, delay=0.5),
+                StandInResponse(200, {}),
+            ]
+            sleeps = []
+            config = HttpClientConfig(read_timeout=0.1)
+            client = HttpClient(config, sleep=sleeps.append)
+
+            # Act.
+            response = client.request("GET", get_url(server))
+
+            # Assert.
+            assert response.status_code == 200
+            assert sleeps == [1.0]
+            assert len(server.requests) == 2
+            client.close()
+
+        def test_with_connection_error_retries_then_raises(self):
+            # Arrange.
+            with socket.socket() as unused:
+                unused.bind(("127.0.0.1", 0))
+                port = unused.getsockname()[1]
+            sleeps = []
+            config = HttpClientConfig(max_retries=2, max_backoff=1.5)
+            client = HttpClient(config, sleep=sleeps.append)
+
+            # Act.
+            with pytest.raises(requests.ConnectionError):
+                client.post(f"http://127.0.0.1:{port}/releases")
+
+            # Assert.
+            assert sleeps == [1.0, 1.5]
+            client.close()
+
+        def test_with_no_timeout_uses_configured_timeouts(self):
+            # Arrange.
+            config = HttpClientConfig(connect_timeout=3, read_timeout=7)
+            client = HttpClient(config)
+
+            # Act.
+            with patch.object(client._session, "request") as mock_request:
+                mock_request.return_value.status_code = 200
+                client.post("https://example.com", json={})
+
+            # Assert.
+            mock_request.assert_called_once_with(
+                "POST", "https://example.com", json={}, timeout=(3, 7)
+            )
+
+    class Test_upload:
+        def test_with_retry_sends_whole_file_each_time(self, server, tmp_path):
+            # Arrange.
+            path = tmp_path / "dist.tar.gz"
+            path.write_bytes(b"0123456789" * 100000)
+            server.responses = [
+                StandInResponse(503, {"Retry-After": "1"}),
+                StandInResponse(201, {}),
+            ]
+            sleeps = []
+            client = HttpClient(sleep=sleeps.append)
+
+            # Act.
+            response = client.upload(
+                "POST", get_url(server, "/assets?name=dist.tar.gz"), str(path)
+            )
+
+            # Assert.
+            assert response.status_code == 201
+            assert sleeps == [1.0]
+            expected_sha256 = hashlib.sha256(path.read_bytes()).hexdigest()
+            for request in server.requests:
+                assert request.headers["Content-Length"] == "1000000"
+                assert "Transfer-Encoding" not in request.headers
+                assert request.body_sha256 == expected_sha256
+            client.close()
+
+    class Test_get:
+        def test_with_etag_cache_answers_not_modified_from_cache(
+            self, server, tmp_path
+        ):
+            # Arrange.
+            server.responses = [
+                StandInResponse(200, {"ETag": '"abc"'}, {"id": 1}),
+                StandInResponse(304, {"ETag": '"abc"'}),
+            ]
+            cache = EtagCache.from_dir(str(tmp_path))
+            client = HttpClient(etag_cache=cache)
+            url = get_url(server, "/releases/tags/v1.0.0")
+            client.get(url)
+            cache.save()
+            client.close()
+            client = HttpClient(etag_cache=EtagCache.from_dir(str(tmp_path)))
+
+            # Act.
+            response = client.get(url, headers={"Authorization": "token x"})
+
+            # Assert.
+            assert response.status_code == 200
+            assert response.json() == {"id": 1}
+            assert "If-None-Match" not in server.requests[0].headers
+            assert server.requests[1].headers["If-None-Match"] == '"abc"'
+            assert server.requests[1].headers["Authorization"] == "token x"
+            client.close()
+
+        def test_with_no_cache_sends_plain_request(self, server):
+            # Arrange.
+            server.responses = [StandInResponse(404, {"ETag": '"abc"'})]
+            client = HttpClient()
+
+            # Act.
+            response = client.get(get_url(server))
+
+            # Assert.
+            assert response.status_code == 404
+            assert "If-None-Match" not in server.requests[0].headers
+            client.close()
+
+
+class TestEtagCache:
+    class Test_put:
+        def test_with_too_many_entries_evicts_oldest(self, tmp_path):
+            # Arrange.
+            cache = EtagCache(str(tmp_path / "etags.json"), max_entries=2)
+            cache.put("a", '"1"', "{}")
+            cache.put("b", '"2"', "{}")
+
+            # Act.
+            cache.put("a", '"3"', "{}")
+            cache.put("c", '"4"', "{}")
+
+            # Assert.
+            assert cache.get("a") == ('"3"', "{}")
+            assert cache.get("b") is None
+            assert cache.get("c") == ('"4"', "{}")
+
+    class Test_save:
+        def test_with_no_changes_does_not_write(self, tmp_path):
+            # Arrange.
+            path = tmp_path / "cache" / "etags.json"
+            cache = EtagCache(str(path))
+
+            # Act.
+            cache.save()
+
+            # Assert.
+            assert not path.exists()
+
+        def test_with_unreadable_file_starts_empty(self, tmp_path):
+            # Arrange.
+            path = tmp_path / "etags.json"
+            path.write_text("not json")
+
+            # Act.
+            cache = EtagCache(str(path))
+            cache.put("a", '"1"', "{}")
+            cache.save()
+
+            # Assert.
+            assert EtagCache(str(path)).get("a") == ('"1"', "{}")
@@ -1,22 +1,54 @@
 """Test GitHub integration module."""
 
-from unittest.mock import patch
+import hashlib
+import threading
+import tracemalloc
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from pagekey_semver.integrations.http_client import HttpClient
 from pagekey_semver.integrations.release_creator import (
     CreateReleaseConfig,
     GitHubReleaseCreator,
     GitLabReleaseCreator,
+    ReleaseCreator,
+    ReleaseCreatorException,
+    create_releases,
 )
 from pagekey_semver.models import Tag
+from tests.unit.integrations.api_stand_in import StandInResponse, StandInServer
 
 
 MODULE_UNDER_TEST = "pagekey_semver.integrations.release_creator"
 
 
+class TestReleaseCreator:
+    def test_without_create_release_cannot_be_instantiated(self):
+        # Arrange.
+        class PartialReleaseCreator(ReleaseCreator):
+            def upload_asset(self, release_config, tag, release, path):
+                return True
+
+        # Act and Assert.
+        with pytest.raises(TypeError, match="create_release"):
+            PartialReleaseCreator()
+
+    def test_without_upload_asset_cannot_be_instantiated(self):
+        # Arrange.
+        class PartialReleaseCreator(ReleaseCreator):
+            def create_release(self, release_config, tag):
+                return True
+
+        # Act and Assert.
+        with pytest.raises(TypeError, match="upload_asset"):
+            PartialReleaseCreator()
+
+
 class TestGitHubReleaseCreator:
     class Test_create_release:
         @patch(f"{MODULE_UNDER_TEST}.os")
-        @patch(f"{MODULE_UNDER_TEST}.requests")
-        def test_with_successful_request_makes_request(self, mock_requests, mock_os):
+        def test_with_successful_request_makes_request(self, mock_os):
             # Arrange.
             config = CreateReleaseConfig(
                 project="me/project",
@@ -25,7 +57,8 @@ class TestGitHubReleaseCreator:
                 body="Here is yet another release.",
             )
             tag = Tag("v1.0.0", 1, 0, 0)
-            creator = GitHubReleaseCreator()
+            mock_client = MagicMock()
+            creator = GitHubReleaseCreator(mock_client)
             mock_os.getenv.side_effect = ["my-github-token"]
 
             # Act.
@@ -33,7 +66,7 @@ class TestGitHubReleaseCreator:
 
             # Assert.
             mock_os.getenv.assert_called_with("GITHUB_TOKEN", "")
-            mock_requests.post.assert_called_with(
+            mock_client.post.assert_called_with(
                 "https://api.github.com/repos/me/project/releases",
                 json={
                     "tag_name": "v1.0.0",
@@ -48,12 +81,248 @@ class TestGitHubReleaseCreator:
                 },
             )
 
+        def test_with_api_url_posts_to_it(self):
+            # Arrange.
+            config = CreateReleaseConfig(
+                project="me/project",
+                token_variable="GITHUB_TOKEN",
+                title_format="v%M.%m.%p",
+                body="",
+                api_url="https://github.example.com/api/v3/",
+            )
+            mock_client = MagicMock()
+            creator = GitHubReleaseCreator(mock_client)
+
+            # Act.
+            creator.create_release(config, Tag("v1.0.0", 1, 0, 0))
+
+            # Assert.
+            assert mock_client.post.call_args.args == (
+                "https://github.example.com/api/v3/repos/me/project/releases",
+            )
+
+        def test_with_assets_streams_them_to_upload_url(self, tmp_path, monkeypatch):
+            # Arrange.
+            (tmp_path / "dist").mkdir()
+            wheel = tmp_path / "dist" / "demo-1.0.0-py3-none-any.whl"
+            wheel.write_bytes(b"w" * 8 * 1024 * 1024)
+            sbom = tmp_path / "dist" / "sbom.json"
+            sbom.write_text("{}")
+            monkeypatch.chdir(tmp_path)
+            monkeypatch.setenv("GITHUB_TOKEN", "my-github-token")
+            tag = Tag("v1.0.0", 1, 0, 0)
+            sleeps = []
+            with StandInServer() as server:
+                config = CreateReleaseConfig(
+                    project="me/project",
+                    token_variable="GITHUB_TOKEN",
+                    title_format="v%M.%m.%p",
+                    body="",
+                    api_url=server.url,
+                    assets=["dist/*.whl", "dist/*.json", "dist/*.missing"],
+                    asset_workers=1,
+                )
+                server.responses = [
+                    StandInResponse(
+                        201, body={"upload_url": "{url}/uploads/1/assets{?name,label}"}
+                    ),
+                    StandInResponse(503, {"Retry-After": "1"}),
+                    StandInResponse(201),
+                    StandInResponse(201),
+                ]
+                creator = GitHubReleaseCreator(HttpClient(sleep=sleeps.append))
+
+                # Act.
+                tracemalloc.start()
+                creator.create_release(config, tag)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+            # Assert.
+            assert [(request.method, request.path) for request in server.requests] == [
+                ("POST", "/repos/me/project/releases"),
+                ("POST", "/uploads/1/assets?name=demo-1.0.0-py3-none-any.whl"),
+                ("POST", "/uploads/1/assets?name=demo-1.0.0-py3-none-any.whl"),
+                ("POST", "/uploads/1/assets?name=sbom.json"),
+            ]
+            upload = server.requests[2]
+            assert upload.headers["Authorization"] == "token my-github-token"
+            assert upload.headers["Content-Type"] == "application/octet-stream"
+            assert upload.body_sha256 == hashlib.sha256(wheel.read_bytes()).hexdigest()
+            assert sleeps == [1.0]
+            # The 8 MiB file was never held in memory as a whole.
+            assert peak < 2 * 1024 * 1024
+
+        def test_with_failed_asset_uploads_others_then_raises(
+            self, tmp_path, monkeypatch
+        ):
+            # Arrange.
+            for name in ["a.txt", "b.txt"]:
+                (tmp_path / name).write_text(name)
+            monkeypatch.chdir(tmp_path)
+            with StandInServer() as server:
+                config = CreateReleaseConfig(
+                    project="me/project",
+                    token_variable="GITHUB_TOKEN",
+                    title_format="v%M.%m.%p",
+                    body="",
+                    api_url=server.url,
+                    assets=["*.txt"],
+                    asset_workers=1,
+                )
+                server.responses = [
+                    StandInResponse(201, body={"upload_url": "{url}/assets"}),
+                    StandInResponse(422),
+                    StandInResponse(201),
+                ]
+                creator = GitHubReleaseCreator(HttpClient())
+
+                # Act.
+                with pytest.raises(
+                    ReleaseCreatorException, match="1 of 2 assets: a.txt"
+                ):
+                    creator.create_release(config, Tag("v1.0.0", 1, 0, 0))
+
+            # Assert.
+            assert len(server.requests) == 3
+
+        def test_with_idempotent_and_same_release_only_looks_it_up(self, monkeypatch):
+            # Arrange.
+            monkeypatch.setenv("GITHUB_TOKEN", "my-github-token")
+            with StandInServer() as server:
+                config = CreateReleaseConfig(
+                    project="me/project",
+                    token_variable="GITHUB_TOKEN",
+                    title_format="v%M.%m.%p",
+                    body="Notes",
+                    api_url=server.url,
+                    idempotent=True,
+                )
+                server.responses = [
+                    StandInResponse(
+                        200,
+                        body={
+                            "id": 7,
+                            "name": "v1.0.0",
+                            "body": "Notes",
+                            "draft": False,
+                            "prerelease": False,
+                        },
+                    ),
+                ]
+                creator = GitHubReleaseCreator(HttpClient())
+
+                # Act.
+                creator.create_release(config, Tag("v1.0.0", 1, 0, 0))
+
+            # Assert.
+            assert [(request.method, request.path) for request in server.requests] == [
+                ("GET", "/repos/me/project/releases/tags/v1.0.0"),
+            ]
+
+        def test_with_idempotent_and_changed_release_patches_it(
+            self, tmp_path, monkeypatch
+        ):
+            # Arrange.
+            for name in ["a.txt", "b.txt"]:
+                (tmp_path / name).write_text(name)
+            monkeypatch.chdir(tmp_path)
+            with StandInServer() as server:
+                config = CreateReleaseConfig(
+                    project="me/project",
+                    token_variable="GITHUB_TOKEN",
+                    title_format="v%M.%m.%p",
+                    body="New notes",
+                    api_url=server.url,
+                    assets=["*.txt"],
+                    idempotent=True,
+                )
+                release = {
+                    "id": 7,
+                    "name": "v1.0.0",
+                    "body": "Old notes",
+                    "draft": False,
+                    "prerelease": False,
+                    "upload_url": "{url}/assets",
+                    "assets": [{"name": "a.txt", "size": 5}],
+                }
+                server.responses = [
+                    StandInResponse(200, body=release),
+                    StandInResponse(200, body={**release, "body": "New notes"}),
+                    StandInResponse(201),
+                ]
+                creator = GitHubReleaseCreator(HttpClient())
+
+                # Act.
+                with patch.object(
+                    creator._client, "request", wraps=creator._client.request
+                ) as mock_request:
+                    creator.create_release(config, Tag("v1.0.0", 1, 0, 0))
+
+            # Assert.
+            assert [(request.method, request.path) for request in server.requests] == [
+                ("GET", "/repos/me/project/releases/tags/v1.0.0"),
+                ("PATCH", "/repos/me/project/releases/7"),
+                ("POST", "/assets?name=b.txt"),
+            ]
+            assert mock_request.call_args_list[1].kwargs["json"] == {
+                "body": "New notes"
+            }
+
+        def test_with_idempotent_and_missing_release_creates_it(self):
+            # Arrange.
+            with StandInServer() as server:
+                config = CreateReleaseConfig(
+                    project="me/project",
+                    token_variable="GITHUB_TOKEN",
+                    title_format="v%M.%m.%p",
+                    body="",
+                    api_url=server.url,
+                    idempotent=True,
+                )
+                server.responses = [StandInResponse(404), StandInResponse(201)]
+                creator = GitHubReleaseCreator(HttpClient())
+
+                # Act.
+                creator.create_release(config, Tag("v1.0.0", 1, 0, 0))
+
+            # Assert.
+            assert [(request.method, request.path) for request in server.requests] == [
+                ("GET", "/repos/me/project/releases/tags/v1.0.0"),
+                ("POST", "/repos/me/project/releases"),
+            ]
+
+        def test_with_idempotent_and_failed_lookup_does_not_create(
+            self, capsys, monkeypatch
+        ):
+            # Arrange.
+            monkeypatch.setenv("GITHUB_TOKEN", "my-github-token")
+            with StandInServer() as server:
+                config = CreateReleaseConfig(
+                    project="me/project",
+                    token_variable="GITHUB_TOKEN",
+                    title_format="v%M.%m.%p",
+                    body="",
+                    api_url=server.url,
+                    idempotent=True,
+                )
+                server.responses = [StandInResponse(401, body={"message": "Bad"})]
+                creator = GitHubReleaseCreator(HttpClient())
+
+                # Act.
+                creator.create_release(config, Tag("v1.0.0", 1, 0, 0))
+
+            # Assert.
+            assert len(server.requests) == 1
+            assert capsys.readouterr().out == (
+                'GitHub lookup status: 401\nGitHub body: {"message": "Bad"}\n'
+            )
+
 
 class TestGitLabReleaseCreator:
     class Test_create_release:
         @patch(f"{MODULE_UNDER_TEST}.os")
-        @patch(f"{MODULE_UNDER_TEST}.requests")
-        def test_with_successful_request_makes_request(self, mock_requests, mock_os):
+        def test_with_successful_request_makes_request(self, mock_os):
             # Arrange.
             config = CreateReleaseConfig(
                 project="1234",
@@ -62,7 +331,8 @@ class TestGitLabReleaseCreator:
                 body="Here is yet another release.",
             )
             tag = Tag("v1.0.0", 1, 0, 0)
-            creator = GitLabReleaseCreator()
+            mock_client = MagicMock()
+            creator = GitLabReleaseCreator(mock_client)
             mock_os.getenv.side_effect = ["my-gitlab-token"]
 
             # Act.
@@ -70,7 +340,7 @@ class TestGitLabReleaseCreator:
 
             # Assert.
             mock_os.getenv.assert_called_with("GITLAB_TOKEN")
-            mock_requests.post.assert_called_with(
+            mock_client.post.assert_called_with(
                 "https://gitlab.com/api/v4/projects/1234/releases",
                 json={
                     "tag_name": "v1.0.0",
@@ -83,3 +353,104 @@ class TestGitLabReleaseCreator:
                     "Content-Type": "application/json",
                 },
             )
+
+        def test_with_assets_uploads_packages_and_links_them(
+            self, tmp_path, monkeypatch
+        ):
+            # Arrange.
+            (tmp_path / "app.tar.gz").write_bytes(b"archive")
+            monkeypatch.chdir(tmp_path)
+            monkeypatch.setenv("GITLAB_TOKEN", "my-gitlab-token")
+            with StandInServer() as server:
+                config = CreateReleaseConfig(
+                    project="1234",
+                    token_variable="GITLAB_TOKEN",
+                    title_format="v%M.%m.%p",
+                    body="",
+                    api_url=f"{server.url}/api/v4",
+                    assets=["*.tar.gz"],
+                )
+                server.responses = [
+                    StandInResponse(201),
+                    StandInResponse(201),
+                    StandInResponse(201),
+                ]
+                creator = GitLabReleaseCreator(HttpClient())
+
+                # Act.
+                creator.create_release(config, Tag("v1.0.0", 1, 0, 0))
+
+            # Assert.
+            assert [(request.method, request.path) for request in server.requests] == [
+                ("POST", "/api/v4/projects/1234/releases"),
+                (
+                    "PUT",
+                    "/api/v4/projects/1234/packages/generic/release-assets"
+                    "/v1.0.0/app.tar.gz",
+                ),
+                ("POST", "/api/v4/projects/1234/releases/v1.0.0/assets/links"),
+            ]
+            assert server.requests[1].body_size == len(b"archive")
+            assert server.requests[1].headers["PRIVATE-TOKEN"] == "my-gitlab-token"
+
+        def test_with_idempotent_and_changed_release_updates_it(self):
+            # Arrange.
+            with StandInServer() as server:
+                config = CreateReleaseConfig(
+                    project="1234",
+                    token_variable="GITLAB_TOKEN",
+                    title_format="v%M.%m.%p",
+                    body="New notes",
+                    api_url=f"{server.url}/api/v4",
+                    idempotent=True,
+                )
+                server.responses = [
+                    StandInResponse(
+                        200, body={"name": "v1.0.0", "description": "Old notes"}
+                    ),
+                    StandInResponse(200),
+                ]
+                creator = GitLabReleaseCreator(HttpClient())
+
+                # Act.
+                creator.create_release(config, Tag("v1.0.0", 1, 0, 0))
+
+            # Assert.
+            assert [(request.method, request.path) for request in server.requests] == [
+                ("GET", "/api/v4/projects/1234/releases/v1.0.0"),
+                ("PUT", "/api/v4/projects/1234/releases/v1.0.0"),
+            ]
+
+
+class Test_create_releases:
+    def test_with_two_creators_runs_them_concurrently(self):
+        # Arrange.
+        barrier = threading.Barrier(2, timeout=5)
+        creators = [MagicMock(), MagicMock()]
+        for creator in creators:
+            creator.create_release.side_effect = lambda config, tag: barrier.wait()
+        configs = [MagicMock(), MagicMock()]
+        tag = Tag("v1.0.0", 1, 0, 0)
+
+        # Act.
+        create_releases(list(zip(creators, configs)), tag)
+
+        # Assert.
+        creators[0].create_release.assert_called_once_with(configs[0], tag)
+        creators[1].create_release.assert_called_once_with(configs[1], tag)
+
+    def test_with_failing_creator_runs_others_then_raises(self):
+        # Arrange.
+        failing = MagicMock()
+        failing.create_release.side_effect = RuntimeError("API down")
+        working = MagicMock()
+
+        # Act.
+        with pytest.raises(RuntimeError, match="API down"):
+            create_releases(
+                [(failing, MagicMock()), (working, MagicMock())],
+                Tag("v1.0.0", 1, 0, 0),
+            )
+
+        # Assert.
+        working.create_release.assert_called_once()
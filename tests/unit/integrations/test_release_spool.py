@@ -0,0 +1,199 @@
+"""Test release spool module."""
+
+import json
+import sys
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from pagekey_semver.integrations.release_creator import CreateReleaseConfig
+from pagekey_semver.integrations.release_spool import (
+    ReleaseSpool,
+    publish_spooled_releases,
+)
+from pagekey_semver.models import Tag
+
+
+MODULE_UNDER_TEST = "pagekey_semver.integrations.release_spool"
+
+
+def make_config(body=""):
+    return CreateReleaseConfig(
+        project="me/project",
+        token_variable="GITHUB_TOKEN",
+        title_format="v%M.%m.%p",
+        body=body,
+    )
+
+
+class TestReleaseSpool:
+    class Test_get_pending:
+        def test_with_queued_releases_returns_them_in_order(self, tmp_path):
+            # Arrange.
+            spool = ReleaseSpool.from_dir(str(tmp_path / "cache"))
+            spool.queue("github", make_config("old"), Tag("v1.0.0", 1, 0, 0))
+            spool.queue("gitlab", make_config(), Tag("v1.0.0", 1, 0, 0))
+            spool.queue("github", make_config("new"), Tag("v1.0.0", 1, 0, 0))
+
+            # Act.
+            result = spool.get_pending()
+
+            # Assert.
+            assert [release.key for release in result] == [
+                ("github", "v1.0.0"),
+                ("gitlab", "v1.0.0"),
+            ]
+            assert result[0].tag == Tag("v1.0.0", 1, 0, 0)
+            assert result[0].config.body == "new"
+
+        def test_with_published_release_never_returns_it_again(self, tmp_path):
+            # Arrange.
+            spool = ReleaseSpool(str(tmp_path / "spool.jsonl"))
+            spool.queue("github", make_config(), Tag("v1.0.0", 1, 0, 0))
+            spool.mark_published(spool.get_pending())
+
+            # Act.
+            spool.queue("github", make_config(), Tag("v1.0.0", 1, 0, 0))
+
+            # Assert.
+            assert spool.get_pending() == []
+
+        def test_with_partial_last_line_skips_it_and_appends_after_it(self, tmp_path):
+            # Arrange.
+            path = tmp_path / "spool.jsonl"
+            spool = ReleaseSpool(str(path))
+            spool.queue("github", make_config(), Tag("v1.0.0", 1, 0, 0))
+            with open(path, "a") as file_handle:
+                file_handle.write('{"event": "queued", "creat')
+
+            # Act.
+            spool.queue("gitlab", make_config(), Tag("v1.0.0", 1, 0, 0))
+
+            # Assert.
+            assert [release.key for release in spool.get_pending()] == [
+                ("github", "v1.0.0"),
+                ("gitlab", "v1.0.0"),
+            ]
+            assert len(path.read_text().splitlines()) == 3
+
+    class Test_lock:
+        def test_without_fcntl_locks_with_msvcrt(self, tmp_path):
+            # Arrange.
+            spool = ReleaseSpool(str(tmp_path / "spool.jsonl"))
+            mock_msvcrt = MagicMock()
+            mock_msvcrt.locking.side_effect = [OSError("Busy"), None, None]
+
+            # Act.
+            with patch.dict(sys.modules, {"fcntl": None, "msvcrt": mock_msvcrt}):
+                with spool.lock():
+                    pass
+
+            # Assert.
+            assert [call.args[1:] for call in mock_msvcrt.locking.call_args_list] == [
+                (mock_msvcrt.LK_LOCK, 1),
+                (mock_msvcrt.LK_LOCK, 1),
+                (mock_msvcrt.LK_UNLCK, 1),
+            ]
+
+        def test_without_lock_module_raises_os_error(self, tmp_path):
+            # Arrange.
+            spool = ReleaseSpool(str(tmp_path / "spool.jsonl"))
+
+            # Act.
+            with patch.dict(sys.modules, {"fcntl": None, "msvcrt": None}):
+                with pytest.raises(OSError, match="fcntl or msvcrt"):
+                    with spool.lock():
+                        pass
+
+
+class Test_publish_spooled_releases:
+    def test_with_batches_records_each_batch_once_done(self, tmp_path):
+        # Arrange.
+        path = tmp_path / "spool.jsonl"
+        spool = ReleaseSpool(str(path))
+        for patch_number in range(3):
+            spool.queue(
+                "github",
+                make_config(),
+                Tag(f"v1.0.{patch_number}", 1, 0, patch_number),
+            )
+        spool.queue("gitlab", make_config(), Tag("v1.0.0", 1, 0, 0))
+        github = MagicMock()
+        github.create_release.side_effect = lambda config, tag: tag.patch != 1
+
+        # Act.
+        failed = publish_spooled_releases(spool, {"github": github}, 2, 2)
+
+        # Assert.
+        assert [release.key for release in failed] == [
+            ("github", "v1.0.1"),
+            ("gitlab", "v1.0.0"),
+        ]
+        assert [release.key for release in spool.get_pending()] == [
+            ("github", "v1.0.1"),
+            ("gitlab", "v1.0.0"),
+        ]
+        # One write of published events per batch.
+        events = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [event["event"] for event in events] == ["queued"] * 4 + [
+            "published"
+        ] * 2
+        assert [event.get("tag_name") for event in events[4:]] == [
+            "v1.0.0",
+            "v1.0.2",
+        ]
+        assert github.create_release.call_count == 3
+
+    def test_with_published_releases_does_not_publish_them_again(self, tmp_path):
+        # Arrange.
+        spool = ReleaseSpool(str(tmp_path / "spool.jsonl"))
+        spool.queue("github", make_config(), Tag("v1.0.0", 1, 0, 0))
+        github = MagicMock()
+        github.create_release.return_value = True
+        publish_spooled_releases(spool, {"github": github}, 10, 4)
+
+        # Act.
+        failed = publish_spooled_releases(spool, {"github": github}, 10, 4)
+
+        # Assert.
+        assert failed == []
+        github.create_release.assert_called_once()
+
+    def test_with_raising_creator_keeps_release_pending(self, tmp_path, capsys):
+        # Arrange.
+        spool = ReleaseSpool(str(tmp_path / "spool.jsonl"))
+        spool.queue("github", make_config(), Tag("v1.0.0", 1, 0, 0))
+        github = MagicMock()
+        github.create_release.side_effect = RuntimeError("API is down")
+
+        # Act.
+        failed = publish_spooled_releases(spool, {"github": github}, 10, 4)
+
+        # Assert.
+        assert len(failed) == 1
+        assert len(spool.get_pending()) == 1
+        assert "github release v1.0.0 failed: API is down" in capsys.readouterr().out
+
+    def test_with_two_publishers_publishes_each_release_once(self, tmp_path):
+        # Arrange.
+        path = str(tmp_path / "spool.jsonl")
+        ReleaseSpool(path).queue("github", make_config(), Tag("v1.0.0", 1, 0, 0))
+        github = MagicMock()
+        github.create_release.return_value = True
+        threads = [
+            threading.Thread(
+                target=publish_spooled_releases,
+                args=(ReleaseSpool(path), {"github": github}, 10, 4),
+            )
+            for _ in range(2)
+        ]
+
+        # Act.
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Assert.
+        github.create_release.assert_called_once()
@@ -0,0 +1,124 @@
+"""Test cache module."""
+
+import sqlite3
+
+from pagekey_semver.cache import ReleaseCache, hash_prefix_config
+from pagekey_semver.config import DEFAULT_CONFIG
+from pagekey_semver.models import Prefix, ReleaseType
+
+
+class TestReleaseCache:
+    class Test_get_classifications:
+        def test_with_saved_entry_returns_it_after_reopen(self, tmp_path):
+            # Arrange.
+            path = str(tmp_path / "cache" / "cache.sqlite3")
+            cache = ReleaseCache(path, DEFAULT_CONFIG)
+            cache.put_classifications(
+                [
+                    ("aaaa", ReleaseType.MINOR, True),
+                    ("cccc", ReleaseType.NO_RELEASE, False),
+                ]
+            )
+            cache.close()
+
+            # Act.
+            cache = ReleaseCache(path, DEFAULT_CONFIG)
+            result = cache.get_classifications(["aaaa", "bbbb", "cccc"])
+            cache.close()
+
+            # Assert.
+            assert result == {
+                "aaaa": (ReleaseType.MINOR, True),
+                "cccc": (ReleaseType.NO_RELEASE, False),
+            }
+
+        def test_with_more_hashes_than_batch_size_returns_all(self, tmp_path):
+            # Arrange.
+            cache = ReleaseCache(str(tmp_path / "cache.sqlite3"), DEFAULT_CONFIG)
+            hashes = [f"{number:040x}" for number in range(1200)]
+            cache.put_classifications(
+                [(commit_hash, ReleaseType.PATCH, True) for commit_hash in hashes]
+            )
+
+            # Act.
+            result = cache.get_classifications(hashes)
+            cache.close()
+
+            # Assert.
+            assert len(result) == 1200
+
+        def test_with_changed_prefixes_ignores_entry(self, tmp_path):
+            # Arrange.
+            path = str(tmp_path / "cache.sqlite3")
+            cache = ReleaseCache(path, DEFAULT_CONFIG)
+            cache.put_classifications([("aaaa", ReleaseType.MINOR, True)])
+            cache.close()
+            config = DEFAULT_CONFIG.model_copy(deep=True)
+            config.prefixes.append(Prefix(label="perf", type=ReleaseType.PATCH))
+
+            # Act.
+            cache = ReleaseCache(path, config)
+            result = cache.get_classifications(["aaaa"])
+            cache.close()
+
+            # Assert.
+            assert result == {}
+            assert hash_prefix_config(config) != hash_prefix_config(DEFAULT_CONFIG)
+
+    class Test_get_range_heads:
+        def test_with_several_ranges_returns_most_recent_first(self, tmp_path):
+            # Arrange.
+            cache = ReleaseCache(str(tmp_path / "cache.sqlite3"), DEFAULT_CONFIG)
+            cache.put_range("base", "head1", ReleaseType.PATCH)
+            cache.put_range("base", "head2", ReleaseType.MINOR)
+            cache.put_range("other", "head3", ReleaseType.MAJOR)
+            cache.get_range("base", "head1")
+
+            # Act.
+            result = cache.get_range_heads("base")
+            cache.close()
+
+            # Assert.
+            assert result == ["head1", "head2"]
+
+    class Test_close:
+        def test_with_too_many_entries_evicts_least_recently_used(self, tmp_path):
+            # Arrange.
+            path = str(tmp_path / "cache.sqlite3")
+            config = DEFAULT_CONFIG.model_copy(deep=True)
+            config.cache.max_entries = 2
+            cache = ReleaseCache(path, config)
+            cache.put_classifications([("aaaa", ReleaseType.PATCH, True)])
+            cache.put_classifications([("bbbb", ReleaseType.PATCH, True)])
+            cache.put_classifications([("cccc", ReleaseType.PATCH, True)])
+            cache.get_classifications(["aaaa"])
+
+            # Act.
+            cache.close()
+
+            # Assert.
+            cache = ReleaseCache(path, config)
+            assert set(cache.get_classifications(["aaaa", "bbbb", "cccc"])) == {
+                "aaaa",
+                "cccc",
+            }
+            cache.close()
+
+    def test_with_old_schema_version_discards_entries(self, tmp_path):
+        # Arrange.
+        path = str(tmp_path / "cache.sqlite3")
+        cache = ReleaseCache(path, DEFAULT_CONFIG)
+        cache.put_classifications([("aaaa", ReleaseType.PATCH, True)])
+        cache.close()
+        connection = sqlite3.connect(path)
+        connection.execute("PRAGMA user_version = 0")
+        connection.commit()
+        connection.close()
+
+        # Act.
+        cache = ReleaseCache(path, DEFAULT_CONFIG)
+        result = cache.get_classifications(["aaaa"])
+        cache.close()
+
+        # Assert.
+        assert result == {}
@@ -0,0 +1,125 @@
+"""Test changelog_index module."""
+
+import json
+import os
+
+from pagekey_semver.changelog_index import ChangelogIndex, ChangelogSection
+
+
+class TestChangelogIndex:
+    def test_load_without_index_returns_none(self, tmp_path):
+        # Arrange.
+        path = tmp_path / "CHANGELOG.md"
+        path.write_text("## v1.0.0\n")
+
+        # Act.
+        result = ChangelogIndex.load(str(path), str(tmp_path / "cache"))
+
+        # Assert.
+        assert result is None
+
+    def test_load_after_save_returns_sections(self, tmp_path):
+        # Arrange.
+        path = tmp_path / "CHANGELOG.md"
+        path.write_text("## v1.0.0\n")
+        ChangelogIndex(
+            str(path), [ChangelogSection("v1.0.0", 0, 10)], str(tmp_path / "cache")
+        ).save()
+
+        # Act.
+        result = ChangelogIndex.load(str(path), str(tmp_path / "cache"))
+
+        # Assert.
+        assert result.sections == [ChangelogSection("v1.0.0", 0, 10)]
+        assert result.find("v1.0.0") == ChangelogSection("v1.0.0", 0, 10)
+
+    def test_load_with_changed_changelog_returns_none(self, tmp_path):
+        # Arrange.
+        path = tmp_path / "CHANGELOG.md"
+        path.write_text("## v1.0.0\n")
+        ChangelogIndex(
+            str(path), [ChangelogSection("v1.0.0", 0, 10)], str(tmp_path / "cache")
+        ).save()
+        path.write_text("## v1.0.0\nEdited by hand.\n")
+
+        # Act.
+        result = ChangelogIndex.load(str(path), str(tmp_path / "cache"))
+
+        # Assert.
+        assert result is None
+
+    def test_load_with_same_size_edit_returns_none(self, tmp_path):
+        # Arrange.
+        path = tmp_path / "CHANGELOG.md"
+        path.write_text("## v1.0.0\n")
+        ChangelogIndex(
+            str(path), [ChangelogSection("v1.0.0", 0, 10)], str(tmp_path / "cache")
+        ).save()
+        stat = path.stat()
+        path.write_text("## v2.0.0\n")
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+        # Act.
+        result = ChangelogIndex.load(str(path), str(tmp_path / "cache"))
+
+        # Assert.
+        assert result is None
+
+    def test_load_without_index_dir_returns_none(self, tmp_path):
+        # Arrange.
+        path = tmp_path / "CHANGELOG.md"
+        path.write_text("## v1.0.0\n")
+        ChangelogIndex(str(path), [ChangelogSection("v1.0.0", 0, 10)]).save()
+
+        # Act.
+        result = ChangelogIndex.load(str(path))
+
+        # Assert.
+        assert result is None
+        assert os.listdir(tmp_path) == ["CHANGELOG.md"]
+
+    def test_load_with_other_format_returns_none(self, tmp_path):
+        # Arrange.
+        path = tmp_path / "CHANGELOG.md"
+        path.write_text("## v1.0.0\n")
+        index = ChangelogIndex(str(path), index_dir=str(tmp_path))
+        with open(index.path, "w") as index_file:
+            json.dump({"format": 0, "changelog_size": 10, "sections": []}, index_file)
+
+        # Act.
+        result = ChangelogIndex.load(str(path), str(tmp_path))
+
+        # Assert.
+        assert result is None
+
+    def test_prepend_shifts_existing_sections(self, tmp_path):
+        # Arrange.
+        index = ChangelogIndex(
+            str(tmp_path / "CHANGELOG.md"), [ChangelogSection("v1.0.0", 0, 10)]
+        )
+
+        # Act.
+        index.prepend("v1.1.0", 5)
+
+        # Assert.
+        assert index.sections == [
+            ChangelogSection("v1.1.0", 0, 5),
+            ChangelogSection("v1.0.0", 5, 10),
+        ]
+        assert index.find("v1.1.0").offset == 0
+
+    def test_read_section_returns_only_that_section(self, tmp_path):
+        # Arrange.
+        path = tmp_path / "CHANGELOG.md"
+        path.write_bytes(b"## v1.1.0\n\n## v1.0.0\n\n")
+        index = ChangelogIndex(
+            str(path),
+            [ChangelogSection("v1.1.0", 0, 11), ChangelogSection("v1.0.0", 11, 11)],
+        )
+
+        # Act.
+        result = index.read_section("v1.0.0")
+
+        # Assert.
+        assert result == "## v1.0.0\n\n"
+        assert index.read_section("v0.1.0") is None
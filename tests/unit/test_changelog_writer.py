@@ -1,10 +1,14 @@
 """Test changelog module."""
 
-from unittest.mock import call, mock_open, patch
+import os
+from unittest.mock import patch
+
+import pytest
+from pagekey_semver.changelog_index import ChangelogIndex, ChangelogSection
 from pagekey_semver.changelog_writer import ChangelogWriter, DefaultChangelogWriter
 from pagekey_semver.config import DEFAULT_CONFIG, DEFAULT_CONFIG_DICT
 from pagekey_semver.config import SemverConfig
-from pagekey_semver.models import Commit, Tag
+from pagekey_semver.models import ClassifiedCommits, Commit, Prefix, ReleaseType, Tag
 
 
 MODULE_UNDER_TEST = "pagekey_semver.changelog_writer"
@@ -23,16 +27,37 @@ class TestChangelogWriter:
         # Assert.
         mock_dynamic_import.assert_called_with(config.changelog_writer)
         imported_class.assert_called_with(config)
+        imported_class.return_value.set_index_dir.assert_called_with(None)
         assert result == imported_class.return_value
 
+    def test_from_config_with_writer_taking_only_config_sets_index_dir(self, tmp_path):
+        # Arrange.
+        class CustomChangelogWriter(ChangelogWriter):
+            def __init__(self, config):
+                super().__init__(config)
+                self.greeting = "Hello"
+
+            def write_changelog(self, changelog_file, version, commits):
+                changelog_file.write(f"{self.greeting} {version.name}\n")
+
+        config = SemverConfig(
+            **{**DEFAULT_CONFIG_DICT, "changelog_path": str(tmp_path / "CHANGELOG.md")}
+        )
+
+        # Act.
+        with patch(
+            f"{MODULE_UNDER_TEST}.dynamic_import", return_value=CustomChangelogWriter
+        ):
+            writer = ChangelogWriter.from_config(config, str(tmp_path / "cache"))
+        writer.update_changelog(Tag("v1.0.0", 1, 0, 0), [])
+
+        # Assert.
+        assert (tmp_path / "CHANGELOG.md").read_text() == "Hello v1.0.0\n"
+        assert len(os.listdir(tmp_path / "cache")) == 1
+
 
 class TestDefaultChangelogWriter:
-    @patch(f"{MODULE_UNDER_TEST}.os")
-    @patch(f"{MODULE_UNDER_TEST}.tempfile.NamedTemporaryFile", new_callable=mock_open)
-    @patch("builtins.open", new_callable=mock_open)
-    def test_update_changelog_with_commits_updates_changelog_file(
-        self, mock_open, mock_tempfile, mock_os
-    ):
+    def test_update_changelog_with_commits_updates_changelog_file(self, tmp_path):
         # Arrange.
         version = Tag("v1.0.0", 1, 0, 0)
         commits = [
@@ -43,23 +68,354 @@ class TestDefaultChangelogWriter:
             Commit(hash="aaaaa5", message="major: Wow this is a big deal"),
             Commit(hash="aaaaa6", message="some other commit"),
         ]
-        mock_file = mock_tempfile.return_value
-        config = SemverConfig(
-            **{**DEFAULT_CONFIG_DICT, "changelog_path": "docs/CHANGELOG.md"}
-        )
+        path = tmp_path / "docs" / "CHANGELOG.md"
+        config = SemverConfig(**{**DEFAULT_CONFIG_DICT, "changelog_path": str(path)})
         writer = DefaultChangelogWriter(config)
 
         # Act.
         writer.update_changelog(version, commits)
 
         # Assert.
-        mock_open.assert_called_with("docs/CHANGELOG.md", "w")
-        mock_file.write.assert_has_calls(
+        assert path.read_text() == (
+            f"## {version.name}\n\n"
+            "- fix: Do something somewhat important (aaaaa2)\n"
+            "- feat: Add something (aaaaa3)\n"
+            "- major: Wow this is a big deal (aaaaa5)\n"
+            "\n"
+        )
+
+    @patch(f"{MODULE_UNDER_TEST}.COPY_CHUNK_SIZE", 4)
+    def test_update_changelog_with_existing_file_prepends_section(self, tmp_path):
+        # Arrange.
+        path = tmp_path / "CHANGELOG.md"
+        path.write_text("## v1.0.0\n\n- fix: Old (aaaaa0)\n\n")
+        config = SemverConfig(**{**DEFAULT_CONFIG_DICT, "changelog_path": str(path)})
+        writer = DefaultChangelogWriter(config)
+        writer.set_index_dir(str(tmp_path / "cache"))
+
+        # Act.
+        writer.update_changelog(
+            Tag("v1.1.0", 1, 1, 0), [Commit(hash="aaaaa1", message="feat: New")]
+        )
+
+        # Assert.
+        assert path.read_text() == (
+            "## v1.1.0\n\n- feat: New (aaaaa1)\n\n## v1.0.0\n\n- fix: Old (aaaaa0)\n\n"
+        )
+        # The index is kept in the cache directory, not next to the changelog.
+        assert sorted(os.listdir(tmp_path)) == ["CHANGELOG.md", "cache"]
+        assert len(os.listdir(tmp_path / "cache")) == 1
+
+    def test_update_changelog_with_failing_writer_keeps_old_changelog(self, tmp_path):
+        # Arrange.
+        path = tmp_path / "CHANGELOG.md"
+        path.write_text("## v1.0.0\n")
+        config = SemverConfig(**{**DEFAULT_CONFIG_DICT, "changelog_path": str(path)})
+        writer = DefaultChangelogWriter(config)
+
+        # Act.
+        with patch.object(writer, "write_changelog", side_effect=OSError("disk full")):
+            with pytest.raises(OSError):
+                writer.update_changelog(Tag("v1.1.0", 1, 1, 0), [])
+
+        # Assert.
+        assert path.read_text() == "## v1.0.0\n"
+        assert os.listdir(tmp_path) == ["CHANGELOG.md"]
+
+    def test_filter_commits_with_duplicate_prefixes_keeps_each_commit_once(self):
+        # Arrange.
+        config = DEFAULT_CONFIG.model_copy(deep=True)
+        config.prefixes.append(Prefix(label="fix", type=ReleaseType.MINOR))
+        commits = [
+            Commit(hash="aaaaa1", message="fix: Once"),
+            Commit(hash="aaaaa2", message="random commit"),
+        ]
+        writer = DefaultChangelogWriter(config)
+
+        # Act.
+        result = writer._filter_commits(commits)
+
+        # Assert.
+        assert result == [commits[0]]
+
+    def test_filter_commits_with_classified_commits_returns_matched(self):
+        # Arrange.
+        matched = [Commit(hash="aaaaa1", message="fix: Once")]
+        classified = ClassifiedCommits(release_type=ReleaseType.PATCH, matched=matched)
+        writer = DefaultChangelogWriter(DEFAULT_CONFIG)
+
+        # Act.
+        result = writer._filter_commits(classified)
+
+        # Assert.
+        assert result is matched
+
+    def test_rebuild_changelog_with_releases_writes_every_section(self, tmp_path):
+        # Arrange.
+        path = tmp_path / "docs" / "CHANGELOG.md"
+        config = SemverConfig(**{**DEFAULT_CONFIG_DICT, "changelog_path": str(path)})
+        releases = iter(
+            [
+                (
+                    Tag("v1.1.0", 1, 1, 0),
+                    [
+                        Commit(hash="aaaaa1", message="v1.1.0"),
+                        Commit(hash="aaaaa2", message="feat: Add something"),
+                    ],
+                ),
+                (Tag("v1.0.0", 1, 0, 0), [Commit(hash="aaaaa3", message="fix: Bug")]),
+            ]
+        )
+        writer = DefaultChangelogWriter(config)
+
+        # Act.
+        writer.rebuild_changelog(releases)
+
+        # Assert.
+        assert path.read_text() == (
+            "## v1.1.0\n\n"
+            "- feat: Add something (aaaaa2)\n\n"
+            "## v1.0.0\n\n"
+            "- fix: Bug (aaaaa3)\n\n"
+        )
+        assert writer.get_section("v1.0.0") == "## v1.0.0\n\n- fix: Bug (aaaaa3)\n\n"
+
+    def test_get_section_after_updates_reads_section_from_index(self, tmp_path):
+        # Arrange.
+        path = tmp_path / "CHANGELOG.md"
+        config = SemverConfig(**{**DEFAULT_CONFIG_DICT, "changelog_path": str(path)})
+        writer = DefaultChangelogWriter(config)
+        writer.set_index_dir(str(tmp_path / "cache"))
+        writer.update_changelog(
+            Tag("v1.0.0", 1, 0, 0), [Commit(hash="aaaaa0", message="fix: Ünïcode")]
+        )
+        writer.update_changelog(
+            Tag("v1.1.0", 1, 1, 0), [Commit(hash="aaaaa1", message="feat: New")]
+        )
+
+        # Act.
+        with patch.object(writer, "find_sections") as mock_find_sections:
+            result = writer.get_section("v1.0.0")
+
+        # Assert.
+        assert result == "## v1.0.0\n\n- fix: Ünïcode (aaaaa0)\n\n"
+        mock_find_sections.assert_not_called()
+        assert writer.get_section("v1.1.0") == "## v1.1.0\n\n- feat: New (aaaaa1)\n\n"
+        assert writer.get_section("v2.0.0") is None
+
+    def test_get_section_with_stale_index_scans_changelog(self, tmp_path):
+        # Arrange.
+        path = tmp_path / "CHANGELOG.md"
+        config = SemverConfig(**{**DEFAULT_CONFIG_DICT, "changelog_path": str(path)})
+        writer = DefaultChangelogWriter(config)
+        writer.set_index_dir(str(tmp_path / "cache"))
+        writer.update_changelog(Tag("v1.0.0", 1, 0, 0), [])
+        path.write_text("# Changelog\n\n## v1.1.0\n\n- feat: Hand\n\n## v1.0.0\n\n")
+
+        # Act.
+        result = writer.get_section("v1.1.0")
+
+        # Assert.
+        assert result == "## v1.1.0\n\n- feat: Hand\n\n"
+        assert writer.get_section("v1.0.0") == "## v1.0.0\n\n"
+
+    def test_get_section_without_changelog_returns_none(self, tmp_path):
+        # Arrange.
+        path = tmp_path / "CHANGELOG.md"
+        config = SemverConfig(**{**DEFAULT_CONFIG_DICT, "changelog_path": str(path)})
+        writer = DefaultChangelogWriter(config)
+
+        # Act.
+        result = writer.get_section("v1.0.0")
+
+        # Assert.
+        assert result is None
+
+
+class TestChangelogSharding:
+    @pytest.fixture
+    def sharded_config(self, tmp_path):
+        return SemverConfig(
+            **{
+                **DEFAULT_CONFIG_DICT,
+                "changelog_path": str(tmp_path / "CHANGELOG.md"),
+                "changelog_shard_by_major": True,
+            }
+        )
+
+    def test_update_changelog_with_new_major_moves_old_major_to_shard(
+        self, tmp_path, sharded_config
+    ):
+        # Arrange.
+        writer = DefaultChangelogWriter(sharded_config)
+        writer.update_changelog(Tag("v1.0.0", 1, 0, 0), [])
+        writer.update_changelog(
+            Tag("v1.1.0", 1, 1, 0),
+            [Commit(hash="aaaaa1", message="feat: Old")],
+            Tag("v1.0.0", 1, 0, 0),
+        )
+
+        # Act.
+        writer.update_changelog(
+            Tag("v2.0.0", 2, 0, 0),
+            [Commit(hash="aaaaa2", message="major: New")],
+            Tag("v1.1.0", 1, 1, 0),
+        )
+
+        # Assert.
+        assert (tmp_path / "CHANGELOG.md").read_text() == (
+            "## v2.0.0\n\n- major: New (aaaaa2)\n\n"
+        )
+        assert (tmp_path / "CHANGELOG-v1.md").read_text() == (
+            "## v1.1.0\n\n- feat: Old (aaaaa1)\n\n## v1.0.0\n\n\n"
+        )
+        assert writer.get_section("v1.0.0") == "## v1.0.0\n\n\n"
+        assert writer.get_section("v2.0.0") == "## v2.0.0\n\n- major: New (aaaaa2)\n\n"
+
+    def test_update_changelog_within_major_does_not_rotate(
+        self, tmp_path, sharded_config
+    ):
+        # Arrange.
+        writer = DefaultChangelogWriter(sharded_config)
+        writer.update_changelog(Tag("v1.0.0", 1, 0, 0), [])
+
+        # Act.
+        writer.update_changelog(Tag("v1.0.1", 1, 0, 1), [], Tag("v1.0.0", 1, 0, 0))
+
+        # Assert.
+        assert (
+            tmp_path / "CHANGELOG.md"
+        ).read_text() == "## v1.0.1\n\n\n## v1.0.0\n\n\n"
+        assert not (tmp_path / "CHANGELOG-v1.md").exists()
+
+    def test_update_changelog_with_existing_shard_keeps_both(
+        self, tmp_path, sharded_config
+    ):
+        # Arrange.
+        (tmp_path / "CHANGELOG-v1.md").write_text("## v1.0.0\n\n\n")
+        (tmp_path / "CHANGELOG.md").write_text("## v1.1.0\n\n\n")
+        writer = DefaultChangelogWriter(sharded_config)
+
+        # Act.
+        writer.update_changelog(Tag("v2.0.0", 2, 0, 0), [], Tag("v1.1.0", 1, 1, 0))
+
+        # Assert.
+        assert (tmp_path / "CHANGELOG.md").read_text() == "## v2.0.0\n\n\n"
+        assert (tmp_path / "CHANGELOG-v1.md").read_text() == (
+            "## v1.1.0\n\n\n## v1.0.0\n\n\n"
+        )
+        assert writer.get_section("v1.0.0") == "## v1.0.0\n\n\n"
+
+    def test_update_changelog_with_custom_writer_and_no_index_rotates(
+        self, tmp_path, sharded_config
+    ):
+        # Arrange.
+        class CustomChangelogWriter(ChangelogWriter):
+            def write_changelog(self, changelog_file, version, commits):
+                changelog_file.write(f"Hello {version.name}\n")
+
+        writer = CustomChangelogWriter(sharded_config)
+        (tmp_path / "CHANGELOG.md").write_text("Hello v1.1.0\nHello v1.0.0\n")
+
+        # Act.
+        writer.update_changelog(Tag("v2.0.0", 2, 0, 0), [], Tag("v1.1.0", 1, 1, 0))
+
+        # Assert.
+        assert (tmp_path / "CHANGELOG.md").read_text() == "Hello v2.0.0\n"
+        assert (tmp_path / "CHANGELOG-v1.md").read_text() == (
+            "Hello v1.1.0\nHello v1.0.0\n"
+        )
+
+    def test_update_changelog_with_custom_writer_and_existing_shard_drops_stale_index(
+        self, tmp_path, sharded_config
+    ):
+        # Arrange.
+        class CustomChangelogWriter(ChangelogWriter):
+            def write_changelog(self, changelog_file, version, commits):
+                changelog_file.write(f"Hello {version.name}\n")
+
+        writer = CustomChangelogWriter(sharded_config)
+        index_dir = str(tmp_path / "cache")
+        writer.set_index_dir(index_dir)
+        shard_path = str(tmp_path / "CHANGELOG-v1.md")
+        (tmp_path / "CHANGELOG-v1.md").write_text("Hello v1.0.0\n")
+        ChangelogIndex(
+            shard_path,
+            [ChangelogSection("v1.0.0", 0, len("Hello v1.0.0\n"))],
+            index_dir,
+        ).save()
+        (tmp_path / "CHANGELOG.md").write_text("Hello v1.1.0\n")
+
+        # Act.
+        writer.update_changelog(Tag("v2.0.0", 2, 0, 0), [], Tag("v1.1.0", 1, 1, 0))
+
+        # Assert.
+        assert (tmp_path / "CHANGELOG-v1.md").read_text() == (
+            "Hello v1.1.0\nHello v1.0.0\n"
+        )
+        assert ChangelogIndex.load(shard_path, index_dir) is None
+
+    def test_update_changelog_without_previous_version_does_not_rotate(
+        self, tmp_path, sharded_config
+    ):
+        # Arrange.
+        writer = DefaultChangelogWriter(sharded_config)
+        writer.update_changelog(Tag("v1.0.0", 1, 0, 0), [])
+
+        # Act.
+        writer.update_changelog(Tag("v2.0.0", 2, 0, 0), [])
+
+        # Assert.
+        assert not (tmp_path / "CHANGELOG-v1.md").exists()
+
+    def test_rebuild_changelog_writes_one_shard_per_older_major(
+        self, tmp_path, sharded_config
+    ):
+        # Arrange.
+        releases = iter(
             [
-                call(f"## {version.name}\n\n"),
-                call("- fix: Do something somewhat important (aaaaa2)\n"),
-                call("- feat: Add something (aaaaa3)\n"),
-                call("- major: Wow this is a big deal (aaaaa5)\n"),
-                call("\n"),
+                (Tag("v2.0.0", 2, 0, 0), []),
+                (Tag("v1.1.0", 1, 1, 0), []),
+                (Tag("v1.0.0", 1, 0, 0), []),
+                (Tag("v0.1.0", 0, 1, 0), []),
             ]
         )
+        writer = DefaultChangelogWriter(sharded_config)
+
+        # Act.
+        writer.rebuild_changelog(releases)
+
+        # Assert.
+        assert (tmp_path / "CHANGELOG.md").read_text() == "## v2.0.0\n\n\n"
+        assert (tmp_path / "CHANGELOG-v1.md").read_text() == (
+            "## v1.1.0\n\n\n## v1.0.0\n\n\n"
+        )
+        assert (tmp_path / "CHANGELOG-v0.md").read_text() == "## v0.1.0\n\n\n"
+        assert writer.get_section("v1.1.0") == "## v1.1.0\n\n\n"
+
+    def test_rebuild_changelog_with_interleaved_majors_keeps_every_release(
+        self, tmp_path, sharded_config
+    ):
+        # Arrange.
+        releases = iter(
+            [
+                (Tag("v2.1.0", 2, 1, 0), []),
+                (Tag("v1.0.1", 1, 0, 1), []),
+                (Tag("v2.0.0", 2, 0, 0), []),
+                (Tag("v1.0.0", 1, 0, 0), []),
+            ]
+        )
+        writer = DefaultChangelogWriter(sharded_config)
+
+        # Act.
+        writer.rebuild_changelog(releases)
+
+        # Assert.
+        assert (tmp_path / "CHANGELOG.md").read_text() == (
+            "## v2.1.0\n\n\n## v2.0.0\n\n\n"
+        )
+        assert (tmp_path / "CHANGELOG-v1.md").read_text() == (
+            "## v1.0.1\n\n\n## v1.0.0\n\n\n"
+        )
+        assert writer.get_section("v2.0.0") == "## v2.0.0\n\n\n"
+        assert writer.get_section("v1.0.0") == "## v1.0.0\n\n\n"
@@ -1,39 +1,60 @@
 """Test CLI module."""
 
+import os
 from pathlib import Path
 from unittest.mock import MagicMock, patch
-from pagekey_semver.cli import cli_entrypoint
-from pagekey_semver.models import ReleaseType, Tag
+
+import pytest
+from pagekey_semver.cache import ReleaseCache
+from pagekey_semver.cli import (
+    classify_cached_commits,
+    cli_entrypoint,
+    compute_cached_release_type,
+    replace_files,
+)
+from pagekey_semver.config import DEFAULT_CONFIG
+from pagekey_semver.file_replacer.json import JsonFileReplacer
+from pagekey_semver.models import Commit, ReleaseType, Tag
+from pagekey_semver.release import SemverRelease
 
 
 MODULE_UNDER_TEST = "pagekey_semver.cli"
 
 
-@patch(f"{MODULE_UNDER_TEST}.GitHubReleaseCreator")
-@patch(f"{MODULE_UNDER_TEST}.GitLabReleaseCreator")
-@patch(f"{MODULE_UNDER_TEST}.ChangelogWriter")
-@patch(f"{MODULE_UNDER_TEST}.GitManager")
-@patch(f"{MODULE_UNDER_TEST}.SemverRelease")
-@patch(f"{MODULE_UNDER_TEST}.load_config")
+@patch(f"{MODULE_UNDER_TEST}.classify_cached_commits")
+@patch("pagekey_semver.cache.ReleaseCache")
+@patch("pagekey_semver.changelog_writer.ChangelogWriter")
+@patch("pagekey_semver.git.manager.GitManager")
+@patch("pagekey_semver.release.SemverRelease")
+@patch("pagekey_semver.config.load_config")
 def test_cli_entrypoint_with_no_args_calls_all_functions(
     mock_load_config,
     mock_release_cls,
     mock_git_manager_cls,
     mock_changelog_writer_cls,
-    mock_gitlab_release_cls,
-    mock_github_release_cls,
+    mock_cache_cls,
+    mock_classify_cached_commits,
 ):
     # Arrange.
+    mock_github_release_cls = MagicMock()
+    mock_gitlab_release_cls = MagicMock()
     replacer1 = MagicMock()
+    replacer1.name = "file1.json"
+    replacer1.expand.return_value = [replacer1]
     replacer2 = MagicMock()
+    replacer2.name = "file2.json"
+    replacer2.expand.return_value = [replacer2]
     config = mock_load_config.return_value
     config.file_replacers = [replacer1, replacer2]
+    config.file_replacer_workers = 2
     tags = ["v1.0.0", "v3.0.0", "v2.0.0"]
     mock_git_manager = mock_git_manager_cls.return_value
     mock_git_manager.get_git_tags.return_value = tags
     biggest_tag = Tag("v3.0.0", 3, 0, 0)
     mock_release = mock_release_cls.return_value
-    mock_release.get_biggest_tag.return_value = biggest_tag
+    tag_index = mock_release.index_tags.return_value
+    tag_index.names = tags
+    tag_index.biggest.return_value = biggest_tag
     commits = ["fix: Message 1", "feat: Message 2"]
     mock_git_manager.get_commit_messages_since.return_value = commits
     release_type = ReleaseType.MINOR
@@ -41,32 +62,60 @@ def test_cli_entrypoint_with_no_args_calls_all_functions(
     next_version = Tag("v3.1.0", 3, 1, 0)
     mock_release.compute_next_version.return_value = next_version
     mock_changelog_writer = mock_changelog_writer_cls.from_config.return_value
+    config.integrations.spool.enabled = False
 
     # Act.
-    cli_entrypoint(["apply"])
+    with patch.dict(
+        "pagekey_semver.integrations.release_creator.RELEASE_CREATORS",
+        github=mock_github_release_cls,
+        gitlab=mock_gitlab_release_cls,
+    ):
+        cli_entrypoint(["apply"])
 
     # Assert.
     mock_git_manager_cls.assert_called_with(config)
-    mock_changelog_writer_cls.from_config.assert_called_with(config)
+    mock_changelog_writer_cls.from_config.assert_called_with(
+        config,
+        os.path.join(mock_git_manager.get_cache_dir.return_value, "changelog-index"),
+    )
     mock_release_cls.assert_called_with(config)
     mock_load_config.assert_called_with(Path(".semver"))
     mock_git_manager.get_git_tags.assert_called_once()
-    mock_release.get_biggest_tag.assert_called_with(tags)
+    mock_release.index_tags.assert_called_with(tags)
     mock_git_manager.get_commit_messages_since.assert_called_with("v3.0.0")
-    mock_release.compute_release_type.assert_called_with(commits)
-    mock_release.compute_next_version.assert_called_with(release_type, tags)
-    mock_changelog_writer.update_changelog.assert_called_with(next_version, commits)
-    mock_git_manager.apply_tag.assert_called_with(tags, next_version)
-    replacer1.perform_replace.assert_called_with(next_version)
-    replacer2.perform_replace.assert_called_with(next_version)
+    mock_cache = mock_cache_cls.from_dir.return_value
+    mock_cache_cls.from_dir.assert_called_with(
+        mock_git_manager.get_cache_dir.return_value, config
+    )
+    mock_classify_cached_commits.assert_called_with(mock_release, commits, mock_cache)
+    classified = mock_classify_cached_commits.return_value
+    mock_release.compute_release_type.assert_called_with(classified)
+    mock_cache.close.assert_called_once()
+    mock_release.compute_next_version.assert_called_with(release_type, tag_index)
+    mock_changelog_writer.update_changelog.assert_called_with(
+        next_version, classified, biggest_tag
+    )
+    mock_git_manager.apply_tag.assert_called_with(tag_index, next_version)
+    replacer1.perform_replace_many.assert_called_with([replacer1], next_version)
+    replacer2.perform_replace_many.assert_called_with([replacer2], next_version)
     mock_gitlab_release_cls.assert_called()
     mock_github_release_cls.assert_called()
 
 
-@patch(f"{MODULE_UNDER_TEST}.ChangelogWriter")
-@patch(f"{MODULE_UNDER_TEST}.GitManager")
-@patch(f"{MODULE_UNDER_TEST}.SemverRelease")
-@patch(f"{MODULE_UNDER_TEST}.load_config")
+@patch("pagekey_semver.config.load_config")
+def test_cli_entrypoint_with_no_command_prints_usage(mock_load_config, capsys):
+    # Act.
+    cli_entrypoint([])
+
+    # Assert.
+    assert capsys.readouterr().out.startswith("usage:")
+    mock_load_config.assert_not_called()
+
+
+@patch("pagekey_semver.changelog_writer.ChangelogWriter")
+@patch("pagekey_semver.git.manager.GitManager")
+@patch("pagekey_semver.release.SemverRelease")
+@patch("pagekey_semver.config.load_config")
 def test_cli_entrypoint_with_dry_run_does_not_push(
     mock_load_config,
     mock_release_cls,
@@ -78,14 +127,14 @@ def test_cli_entrypoint_with_dry_run_does_not_push(
     replacer2 = MagicMock()
     config = mock_load_config.return_value
     config.file_replacers = [replacer1, replacer2]
-    tags = ["v1.0.0", "v3.0.0", "v2.0.0"]
+    config.cache.enabled = False
     mock_git_manager = mock_git_manager_cls.return_value
-    mock_git_manager.get_git_tags.return_value = tags
     biggest_tag = Tag("v3.0.0", 3, 0, 0)
     mock_release = mock_release_cls.return_value
-    mock_release.get_biggest_tag.return_value = biggest_tag
-    commits = ["fix: Message 1", "feat: Message 2"]
-    mock_git_manager.get_commit_messages_since.return_value = commits
+    mock_release.get_tag_glob.return_value = "v*.*.*"
+    mock_release.find_biggest_tag.return_value = biggest_tag
+    commits = iter(["fix: Message 1", "feat: Message 2"])
+    mock_git_manager.iter_commits_since.return_value = commits
     release_type = ReleaseType.MINOR
     mock_release.compute_release_type.return_value = release_type
     next_version = Tag("v3.1.0", 3, 1, 0)
@@ -97,15 +146,464 @@ def test_cli_entrypoint_with_dry_run_does_not_push(
 
     # Assert.
     mock_git_manager_cls.assert_called_with(config)
-    mock_changelog_writer_cls.from_config.assert_called_with(config)
+    mock_changelog_writer_cls.from_config.assert_called_with(config, None)
     mock_release_cls.assert_called_with(config)
     mock_load_config.assert_called_with(Path(".semver"))
-    mock_git_manager.get_git_tags.assert_called_once()
-    mock_release.get_biggest_tag.assert_called_with(tags)
-    mock_git_manager.get_commit_messages_since.assert_called_with("v3.0.0")
+    mock_git_manager.get_git_tags.assert_not_called()
+    mock_git_manager.iter_tags_by_version.assert_called_with("v*.*.*")
+    mock_release.find_biggest_tag.assert_called_with(
+        mock_git_manager.iter_tags_by_version.return_value
+    )
+    mock_git_manager.iter_commits_since.assert_called_with("v3.0.0")
+    mock_git_manager.get_commit_messages_since.assert_not_called()
     mock_release.compute_release_type.assert_called_with(commits)
-    mock_release.compute_next_version.assert_called_with(release_type, tags)
+    next_version_args = mock_release.compute_next_version.call_args.args
+    assert next_version_args[0] == release_type
+    assert next_version_args[1].biggest() == biggest_tag
     mock_changelog_writer.update_changelog.assert_not_called()
     mock_git_manager.apply_tag.assert_not_called()
-    replacer1.perform_replace.assert_not_called()
-    replacer2.perform_replace.assert_not_called()
+    replacer1.perform_replace_many.assert_not_called()
+    replacer2.perform_replace_many.assert_not_called()
+
+
+@patch(f"{MODULE_UNDER_TEST}.compute_cached_release_type")
+@patch("pagekey_semver.cache.ReleaseCache")
+@patch("pagekey_semver.changelog_writer.ChangelogWriter")
+@patch("pagekey_semver.git.manager.GitManager")
+@patch("pagekey_semver.release.SemverRelease")
+@patch("pagekey_semver.config.load_config")
+def test_cli_entrypoint_with_dry_run_and_cache_uses_cached_release_type(
+    mock_load_config,
+    mock_release_cls,
+    mock_git_manager_cls,
+    mock_changelog_writer_cls,
+    mock_cache_cls,
+    mock_compute_cached_release_type,
+):
+    # Arrange.
+    config = mock_load_config.return_value
+    config.cache.enabled = True
+    mock_git_manager = mock_git_manager_cls.return_value
+    mock_git_manager.get_git_tags.return_value = ["v3.0.0"]
+    mock_release = mock_release_cls.return_value
+    mock_release.find_biggest_tag.return_value = Tag("v3.0.0", 3, 0, 0)
+    mock_release.compute_next_version.return_value = Tag("v3.0.1", 3, 0, 1)
+    mock_cache = mock_cache_cls.from_dir.return_value
+
+    # Act.
+    cli_entrypoint(["plan"])
+
+    # Assert.
+    mock_compute_cached_release_type.assert_called_with(
+        mock_release, mock_git_manager, "v3.0.0", mock_cache
+    )
+    mock_release.compute_release_type.assert_not_called()
+    mock_cache.close.assert_called_once()
+
+
+@patch("pagekey_semver.cache.ReleaseCache")
+@patch("pagekey_semver.changelog_writer.ChangelogWriter")
+@patch("pagekey_semver.git.manager.GitManager")
+@patch("pagekey_semver.release.SemverRelease")
+@patch("pagekey_semver.config.load_config")
+def test_cli_entrypoint_with_no_cache_does_not_open_cache(
+    mock_load_config,
+    mock_release_cls,
+    mock_git_manager_cls,
+    mock_changelog_writer_cls,
+    mock_cache_cls,
+):
+    # Arrange.
+    config = mock_load_config.return_value
+    config.cache.enabled = True
+    mock_git_manager = mock_git_manager_cls.return_value
+    mock_git_manager.get_git_tags.return_value = ["v3.0.0"]
+    mock_release = mock_release_cls.return_value
+    mock_release.find_biggest_tag.return_value = Tag("v3.0.0", 3, 0, 0)
+    mock_release.compute_next_version.return_value = Tag("v3.0.1", 3, 0, 1)
+
+    # Act.
+    cli_entrypoint(["plan", "--no-cache"])
+
+    # Assert.
+    mock_cache_cls.from_dir.assert_not_called()
+    mock_release.compute_release_type.assert_called_with(
+        mock_git_manager.iter_commits_since.return_value
+    )
+
+
+@patch("pagekey_semver.changelog_writer.ChangelogWriter")
+@patch("pagekey_semver.git.manager.GitManager")
+@patch("pagekey_semver.release.SemverRelease")
+@patch("pagekey_semver.config.load_config")
+def test_cli_entrypoint_with_dry_run_and_unsortable_format_lists_all_tags(
+    mock_load_config,
+    mock_release_cls,
+    mock_git_manager_cls,
+    mock_changelog_writer_cls,
+):
+    # Arrange.
+    config = mock_load_config.return_value
+    config.cache.enabled = False
+    tags = ["1.0.0", "3.0.0"]
+    mock_git_manager = mock_git_manager_cls.return_value
+    mock_git_manager.get_git_tags.return_value = tags
+    mock_release = mock_release_cls.return_value
+    mock_release.get_tag_glob.return_value = None
+    tag_index = mock_release.index_tags.return_value
+    tag_index.names = tags
+    tag_index.biggest.return_value = Tag("3.0.0", 3, 0, 0)
+    mock_release.compute_next_version.return_value = Tag("3.0.1", 3, 0, 1)
+
+    # Act.
+    cli_entrypoint(["plan"])
+
+    # Assert.
+    mock_git_manager.iter_tags_by_version.assert_not_called()
+    mock_release.index_tags.assert_called_with(tags)
+    mock_release.compute_next_version.assert_called_with(
+        mock_release.compute_release_type.return_value, tag_index
+    )
+
+
+@patch("pagekey_semver.cache.ReleaseCache")
+@patch("pagekey_semver.changelog_writer.ChangelogWriter")
+@patch("pagekey_semver.git.manager.GitManager")
+@patch("pagekey_semver.release.SemverRelease")
+@patch("pagekey_semver.config.load_config")
+def test_cli_entrypoint_with_jobs_scans_history_in_parallel(
+    mock_load_config,
+    mock_release_cls,
+    mock_git_manager_cls,
+    mock_changelog_writer_cls,
+    mock_cache_cls,
+):
+    # Arrange.
+    mock_github_release_cls = MagicMock()
+    mock_gitlab_release_cls = MagicMock()
+    config = mock_load_config.return_value
+    config.file_replacers = []
+    mock_git_manager = mock_git_manager_cls.return_value
+    mock_release = mock_release_cls.return_value
+    tag_index = mock_release.index_tags.return_value
+    tag_index.names = []
+    tag_index.biggest.return_value = None
+    mock_release.compute_next_version.return_value = Tag("v0.1.0", 0, 1, 0)
+    mock_changelog_writer = mock_changelog_writer_cls.from_config.return_value
+    config.integrations.spool.enabled = False
+
+    # Act.
+    with patch.dict(
+        "pagekey_semver.integrations.release_creator.RELEASE_CREATORS",
+        github=mock_github_release_cls,
+        gitlab=mock_gitlab_release_cls,
+    ):
+        cli_entrypoint(["apply", "--jobs", "4"])
+
+    # Assert.
+    mock_release.classify_commits_parallel.assert_called_with(mock_git_manager, None, 4)
+    classified = mock_release.classify_commits_parallel.return_value
+    mock_git_manager.get_commit_messages_since.assert_not_called()
+    mock_release.compute_release_type.assert_called_with(classified)
+    mock_changelog_writer.update_changelog.assert_called_with(
+        Tag("v0.1.0", 0, 1, 0), classified, None
+    )
+
+
+@patch("pagekey_semver.changelog_writer.ChangelogWriter")
+@patch("pagekey_semver.git.manager.GitManager")
+@patch("pagekey_semver.release.SemverRelease")
+@patch("pagekey_semver.config.load_config")
+def test_cli_entrypoint_with_changelog_rebuild_rewrites_changelog(
+    mock_load_config,
+    mock_release_cls,
+    mock_git_manager_cls,
+    mock_changelog_writer_cls,
+):
+    # Arrange.
+    mock_git_manager = mock_git_manager_cls.return_value
+    mock_release = mock_release_cls.return_value
+    mock_changelog_writer = mock_changelog_writer_cls.from_config.return_value
+
+    # Act.
+    cli_entrypoint(["changelog", "--rebuild"])
+
+    # Assert.
+    mock_release.split_into_releases.assert_called_with(
+        mock_git_manager.iter_tagged_commits.return_value
+    )
+    mock_changelog_writer.rebuild_changelog.assert_called_with(
+        mock_release.split_into_releases.return_value
+    )
+    mock_git_manager.get_git_tags.assert_not_called()
+
+
+@patch("pagekey_semver.changelog_writer.ChangelogWriter")
+@patch("pagekey_semver.git.manager.GitManager")
+@patch("pagekey_semver.config.load_config")
+def test_cli_entrypoint_with_changelog_show_prints_section(
+    mock_load_config, mock_git_manager_cls, mock_changelog_writer_cls, capsys
+):
+    # Arrange.
+    config = mock_load_config.return_value
+    config.cache.enabled = False
+    mock_changelog_writer = mock_changelog_writer_cls.from_config.return_value
+    mock_changelog_writer.get_section.return_value = "## v1.0.0\n\n- fix: Bug\n"
+
+    # Act.
+    cli_entrypoint(["changelog", "--show", "v1.0.0"])
+
+    # Assert.
+    mock_changelog_writer_cls.from_config.assert_called_with(config, None)
+    mock_changelog_writer.get_section.assert_called_with("v1.0.0")
+    assert capsys.readouterr().out == "## v1.0.0\n\n- fix: Bug\n"
+
+
+@patch("pagekey_semver.changelog_writer.ChangelogWriter")
+@patch("pagekey_semver.git.manager.GitManager")
+@patch("pagekey_semver.config.load_config")
+def test_cli_entrypoint_with_changelog_show_unknown_version_exits(
+    mock_load_config, mock_git_manager_cls, mock_changelog_writer_cls
+):
+    # Arrange.
+    mock_changelog_writer = mock_changelog_writer_cls.from_config.return_value
+    mock_changelog_writer.get_section.return_value = None
+
+    # Act.
+    with pytest.raises(SystemExit) as exc_info:
+        cli_entrypoint(["changelog", "--show", "v9.0.0"])
+
+    # Assert.
+    assert exc_info.value.code == 1
+
+
+@patch("pagekey_semver.integrations.release_spool.ReleaseSpool")
+@patch("pagekey_semver.changelog_writer.ChangelogWriter")
+@patch("pagekey_semver.git.manager.GitManager")
+@patch("pagekey_semver.release.SemverRelease")
+@patch("pagekey_semver.config.load_config")
+def test_cli_entrypoint_with_spool_queues_releases_instead_of_creating_them(
+    mock_load_config,
+    mock_release_cls,
+    mock_git_manager_cls,
+    mock_changelog_writer_cls,
+    mock_spool_cls,
+):
+    # Arrange.
+    config = mock_load_config.return_value
+    config.file_replacers = []
+    config.cache.enabled = False
+    config.integrations.spool.enabled = True
+    config.integrations.spool.path = None
+    config.integrations.gitlab.create_release = None
+    mock_release = mock_release_cls.return_value
+    mock_release.index_tags.return_value.biggest.return_value = None
+    next_version = Tag("v0.1.0", 0, 1, 0)
+    mock_release.compute_next_version.return_value = next_version
+    mock_github_release_cls = MagicMock()
+
+    # Act.
+    with patch.dict(
+        "pagekey_semver.integrations.release_creator.RELEASE_CREATORS",
+        github=mock_github_release_cls,
+    ):
+        cli_entrypoint(["apply"])
+
+    # Assert.
+    mock_spool_cls.from_dir.assert_called_with(
+        mock_git_manager_cls.return_value.get_cache_dir.return_value
+    )
+    mock_spool_cls.from_dir.return_value.queue.assert_called_once_with(
+        "github", config.integrations.github.create_release, next_version
+    )
+    mock_github_release_cls.assert_not_called()
+
+
+@patch("pagekey_semver.integrations.release_spool.publish_spooled_releases")
+@patch("pagekey_semver.integrations.release_spool.ReleaseSpool")
+@patch("pagekey_semver.git.manager.GitManager")
+@patch("pagekey_semver.config.load_config")
+def test_cli_entrypoint_with_publish_and_failed_release_exits(
+    mock_load_config,
+    mock_git_manager_cls,
+    mock_spool_cls,
+    mock_publish,
+    capsys,
+):
+    # Arrange.
+    config = mock_load_config.return_value
+    config.cache.enabled = False
+    config.integrations.spool.path = "spool.jsonl"
+    config.integrations.spool.batch_size = 5
+    config.integrations.spool.max_workers = 2
+    failed = MagicMock(creator="gitlab", tag=Tag("v1.0.0", 1, 0, 0))
+    mock_publish.return_value = [failed]
+
+    # Act.
+    with pytest.raises(SystemExit) as exc_info:
+        cli_entrypoint(["publish"])
+
+    # Assert.
+    assert exc_info.value.code == 1
+    mock_spool_cls.assert_called_with("spool.jsonl")
+    spool, creators, batch_size, max_workers = mock_publish.call_args.args
+    assert spool == mock_spool_cls.return_value
+    assert sorted(creators) == ["github", "gitlab"]
+    assert (batch_size, max_workers) == (5, 2)
+    assert capsys.readouterr().out.endswith(
+        "Could not publish 1 release(s), left in the spool: gitlab v1.0.0\n"
+    )
+
+
+def test_replace_files_prints_result_per_file(tmp_path, monkeypatch, capsys):
+    # Arrange.
+    for name in ["a", "b"]:
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "package.json").write_text('{"version": "0.1.0"}')
+    (tmp_path / "b" / "package.json").write_text('{"version": "3.1.0"}')
+    monkeypatch.chdir(tmp_path)
+    replacers = [
+        JsonFileReplacer(name="*/package.json", key="version", format="%M.%m.%p"),
+        JsonFileReplacer(name="*/Cargo.toml", key="version", format="%M.%m.%p"),
+    ]
+
+    # Act.
+    replace_files(replacers, Tag("v3.1.0", 3, 1, 0), 4)
+
+    # Assert.
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0] == "  */Cargo.toml: no matching files"
+    assert lines[1].startswith("  a/package.json: changed (")
+    assert lines[2].startswith("  b/package.json: unchanged (")
+    assert lines[2].endswith(" ms)")
+
+
+class Test_classify_cached_commits:
+    def test_with_cache_saves_each_classification(self, tmp_path):
+        # Arrange.
+        commits = [
+            Commit(hash="aaaaa1", message="fix: One"),
+            Commit(hash="aaaaa2", message="chore: Two"),
+        ]
+        cache = ReleaseCache(str(tmp_path / "cache.sqlite3"), DEFAULT_CONFIG)
+        release = SemverRelease(DEFAULT_CONFIG)
+
+        # Act.
+        result = classify_cached_commits(release, commits, cache)
+
+        # Assert.
+        assert result.release_type == ReleaseType.PATCH
+        assert result.matched == [commits[0]]
+        assert cache.get_classifications(["aaaaa1", "aaaaa2"]) == {
+            "aaaaa1": (ReleaseType.PATCH, True),
+            "aaaaa2": (ReleaseType.NO_RELEASE, False),
+        }
+        cache.close()
+
+    @patch(f"{MODULE_UNDER_TEST}.CACHE_BATCH_SIZE", 2)
+    def test_with_batches_queries_cache_once_per_batch(self):
+        # Arrange.
+        commits = [
+            Commit(hash=f"aaaaa{index}", message=f"fix: {index}") for index in range(5)
+        ]
+        cache = MagicMock()
+        cache.get_classifications.return_value = {"aaaaa1": (ReleaseType.MINOR, True)}
+        release = SemverRelease(DEFAULT_CONFIG)
+
+        # Act.
+        result = classify_cached_commits(release, iter(commits), cache)
+
+        # Assert.
+        assert [call.args for call in cache.get_classifications.call_args_list] == [
+            (["aaaaa0", "aaaaa1"],),
+            (["aaaaa2", "aaaaa3"],),
+            (["aaaaa4"],),
+        ]
+        assert cache.put_classifications.call_args_list[0].args == (
+            [("aaaaa0", ReleaseType.PATCH, True)],
+        )
+        assert result.release_type == ReleaseType.MINOR
+        assert result.matched == commits
+
+    @patch(f"{MODULE_UNDER_TEST}.CACHE_BATCH_SIZE", 2)
+    def test_with_stop_at_max_stops_after_batch_with_max_type(self):
+        # Arrange.
+        commits = [
+            Commit(hash="aaaaa1", message="fix: One"),
+            Commit(hash="aaaaa2", message="major: Two"),
+            Commit(hash="aaaaa3", message="fix: Three"),
+        ]
+        cache = MagicMock()
+        cache.get_classifications.return_value = {}
+        release = SemverRelease(DEFAULT_CONFIG)
+
+        # Act.
+        result = classify_cached_commits(
+            release, iter(commits), cache, stop_at_max=True
+        )
+
+        # Assert.
+        assert result.release_type == ReleaseType.MAJOR
+        cache.get_classifications.assert_called_once_with(["aaaaa1", "aaaaa2"])
+
+
+class Test_compute_cached_release_type:
+    def test_with_cached_range_reads_no_commits(self, tmp_path):
+        # Arrange.
+        cache = ReleaseCache(str(tmp_path / "cache.sqlite3"), DEFAULT_CONFIG)
+        cache.put_range("base", "head", ReleaseType.MINOR)
+        manager = MagicMock()
+        manager.resolve_commit.side_effect = {"HEAD": "head", "v1.0.0": "base"}.get
+        release = SemverRelease(DEFAULT_CONFIG)
+
+        # Act.
+        result = compute_cached_release_type(release, manager, "v1.0.0", cache)
+        cache.close()
+
+        # Assert.
+        assert result == ReleaseType.MINOR
+        manager.iter_commits_since.assert_not_called()
+
+    def test_with_cached_ancestor_reads_only_new_commits(self, tmp_path):
+        # Arrange.
+        cache = ReleaseCache(str(tmp_path / "cache.sqlite3"), DEFAULT_CONFIG)
+        cache.put_range("base", "old_head", ReleaseType.PATCH)
+        manager = MagicMock()
+        manager.resolve_commit.side_effect = {"HEAD": "head", "v1.0.0": "base"}.get
+        manager.is_ancestor.return_value = True
+        manager.iter_commits_since.return_value = [
+            Commit(hash="head", message="feat: New"),
+        ]
+        release = SemverRelease(DEFAULT_CONFIG)
+
+        # Act.
+        result = compute_cached_release_type(release, manager, "v1.0.0", cache)
+
+        # Assert.
+        assert result == ReleaseType.MINOR
+        manager.iter_commits_since.assert_called_with("old_head")
+        assert cache.get_range("base", "head") == ReleaseType.MINOR
+        assert cache.get_classifications(["head"]) == {
+            "head": (ReleaseType.MINOR, True)
+        }
+        cache.close()
+
+    def test_with_diverged_cached_head_reads_whole_range(self, tmp_path):
+        # Arrange.
+        cache = ReleaseCache(str(tmp_path / "cache.sqlite3"), DEFAULT_CONFIG)
+        cache.put_range("base", "rewritten_head", ReleaseType.MAJOR)
+        manager = MagicMock()
+        manager.resolve_commit.side_effect = {"HEAD": "head", "v1.0.0": "base"}.get
+        manager.is_ancestor.return_value = False
+        manager.iter_commits_since.return_value = [
+            Commit(hash="head", message="fix: New"),
+        ]
+        release = SemverRelease(DEFAULT_CONFIG)
+
+        # Act.
+        result = compute_cached_release_type(release, manager, "v1.0.0", cache)
+        cache.close()
+
+        # Assert.
+        assert result == ReleaseType.PATCH
+        manager.iter_commits_since.assert_called_with("v1.0.0")
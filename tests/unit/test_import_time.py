@@ -0,0 +1,75 @@
+"""Test what importing the CLI imports, which is most of its startup time."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Set
+
+import pagekey_semver
+
+
+# Modules that only some commands or config need, so they must load lazily.
+LAZY_MODULES = [
+    "requests",
+    "urllib3",
+    "yaml",
+    "toml",
+    "tomllib",
+    "multiprocessing",
+]
+# Modules that only the commands using them import, not `import pagekey_semver.cli`.
+COMMAND_MODULES = [
+    "sqlite3",
+    "pydantic",
+    "pagekey_semver.cache",
+    "pagekey_semver.integrations.http_client",
+    "pagekey_semver.integrations.release_creator",
+    "pagekey_semver.integrations.release_spool",
+]
+
+
+def imported_modules(statement: str) -> Set[str]:
+    """Run a statement in a fresh interpreter.
+
+    Returns:
+        The names in `sys.modules` once the statement has run.
+    """
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(Path(pagekey_semver.__file__).parent.parent),
+    }
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"import sys; {statement}; print('\\n'.join(sys.modules))",
+        ],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(result.stdout.splitlines())
+
+
+def test_import_cli_does_not_import_lazy_modules():
+    # Arrange.
+    baseline = imported_modules("pass")
+
+    # Act.
+    imported = imported_modules("import pagekey_semver.cli") - baseline
+
+    # Assert.
+    assert [name for name in LAZY_MODULES if name in imported] == []
+
+
+def test_import_cli_does_not_import_command_modules():
+    # Arrange.
+    baseline = imported_modules("pass")
+
+    # Act.
+    imported = imported_modules("import pagekey_semver.cli") - baseline
+
+    # Assert.
+    assert [name for name in COMMAND_MODULES if name in imported] == []
@@ -0,0 +1,90 @@
+"""Test models module."""
+
+import dataclasses
+
+import pytest
+
+from pagekey_semver.models import Tag, TagIndex
+
+
+class TestTag:
+    def test_with_same_version_orders_by_name(self):
+        # Arrange.
+        tag = Tag("v1.2.3", 1, 2, 3)
+        other = Tag("1.2.3", 1, 2, 3)
+
+        # Act, Assert.
+        assert tag != other
+        assert other < tag and other <= tag
+        assert tag > other and tag >= other
+        assert not tag <= other
+        assert sorted([tag, other]) == [other, tag]
+        assert Tag("v1.10.0", 1, 10, 0) > Tag("v1.9.0", 1, 9, 0)
+        assert Tag("a2.0.0", 2, 0, 0) > Tag("z1.99.99", 1, 99, 99)
+
+    def test_with_equal_tags_compares_consistently_with_eq(self):
+        # Arrange.
+        tag = Tag("v1.2.3", 1, 2, 3)
+        same = Tag("v1.2.3", 1, 2, 3)
+
+        # Act, Assert.
+        assert tag == same
+        assert tag <= same and tag >= same
+        assert not tag < same and not tag > same
+
+    def test_with_frozen_dataclass_is_hashable_and_immutable(self):
+        # Arrange.
+        tag = Tag("v1.2.3", 1, 2, 3)
+
+        # Act, Assert.
+        assert {tag, Tag("v1.2.3", 1, 2, 3)} == {tag}
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            tag.major = 2
+
+
+class TestTagIndex:
+    @pytest.fixture
+    def index(self):
+        return TagIndex(
+            ["v0.2.0", "v1.0.0", "latest", "v0.10.0", "v1.0.0-rc1"],
+            [
+                Tag("v0.2.0", 0, 2, 0),
+                Tag("v1.0.0", 1, 0, 0),
+                Tag("v0.10.0", 0, 10, 0),
+                Tag("v1.0.0-rc1", 1, 0, 0),
+            ],
+        )
+
+    def test_contains_with_name_or_tag_checks_all_names(self, index):
+        # Act, Assert.
+        assert "latest" in index
+        assert Tag("v0.10.0", 0, 10, 0) in index
+        assert "v2.0.0" not in index
+        assert len(index) == 5
+
+    def test_biggest_with_tied_versions_returns_first_by_name(self, index):
+        # Act.
+        result = index.biggest()
+
+        # Assert.
+        assert result == Tag("v1.0.0", 1, 0, 0)
+        assert TagIndex(["latest"]).biggest() is None
+
+    def test_floor_with_version_returns_biggest_tag_at_most_version(self, index):
+        # Act, Assert.
+        assert index.floor((0, 9, 99)) == Tag("v0.2.0", 0, 2, 0)
+        assert index.floor(Tag("v0.10.0", 0, 10, 0)) == Tag("v0.10.0", 0, 10, 0)
+        assert index.floor((0, 1, 0)) is None
+
+    def test_between_with_bounds_returns_tags_in_order(self, index):
+        # Act.
+        result = index.between((0, 2, 0), (1, 0, 0))
+
+        # Assert.
+        assert [tag.name for tag in result] == ["v0.10.0", "v1.0.0", "v1.0.0-rc1"]
+        assert [tag.name for tag in index] == [
+            "v0.2.0",
+            "v0.10.0",
+            "v1.0.0",
+            "v1.0.0-rc1",
+        ]
@@ -1,12 +1,18 @@
 """Test release module."""
 
+import os
+import subprocess
+from unittest.mock import MagicMock
+
 import pytest
 from pagekey_semver.config import DEFAULT_CONFIG, DEFAULT_CONFIG_DICT, SemverConfig
+from pagekey_semver.git.manager import GitManager
 from pagekey_semver.release import (
+    PrefixMatcher,
     SemverRelease,
     release_greater,
 )
-from pagekey_semver.models import Commit, Tag, ReleaseType
+from pagekey_semver.models import ClassifiedCommits, Commit, Prefix, Tag, ReleaseType
 
 
 @pytest.mark.parametrize(
@@ -38,6 +44,62 @@ def test_release_greater_with_releasetype_returns_valid_result(a, b, expected):
     assert result == expected
 
 
+@pytest.fixture
+def history_repo(tmp_path, monkeypatch):
+    """Create a repo with a merge and a few dozen commits in the current directory."""
+    monkeypatch.chdir(tmp_path)
+
+    def git(*args, timestamp=None):
+        env = dict(os.environ)
+        if timestamp is not None:
+            env["GIT_AUTHOR_DATE"] = f"@{timestamp} +0000"
+            env["GIT_COMMITTER_DATE"] = f"@{timestamp} +0000"
+        subprocess.run(["git", *args], check=True, stdout=subprocess.DEVNULL, env=env)
+
+    git("init", "-q", "-b", "main")
+    git("config", "user.name", "tester")
+    git("config", "user.email", "tester@example.com")
+    messages = ["chore: Tidy", "fix: Bug", "feat: Thing", "docs: Words", "Merge x"]
+    for index in range(30):
+        if index == 15:
+            git("checkout", "-q", "-b", "side")
+        if index == 20:
+            git("checkout", "-q", "main")
+        message = f"{messages[index % len(messages)]} {index}"
+        git("commit", "-q", "--allow-empty", "-m", message, timestamp=170000000 + index)
+    git("merge", "-q", "--no-ff", "side", "-m", "Merge side", timestamp=170001000)
+    return tmp_path
+
+
+class TestPrefixMatcher:
+    @pytest.mark.parametrize(
+        "message, expected",
+        [
+            ("fix: Something", ReleaseType.PATCH),
+            ("fix:Something", None),
+            ("fixup: Something", None),
+            ('Revert "fix: Something"', None),
+            ("fix: ui: Something", ReleaseType.MINOR),
+            ("major: Breaking", ReleaseType.MAJOR),
+            ("", None),
+        ],
+    )
+    def test_match_with_message_returns_biggest_prefix_type(self, message, expected):
+        # Arrange.
+        matcher = PrefixMatcher(
+            [
+                Prefix(label="fix", type=ReleaseType.PATCH),
+                Prefix(label="fix: ui", type=ReleaseType.MINOR),
+                Prefix(label="major", type=ReleaseType.PATCH),
+                Prefix(label="major", type=ReleaseType.MAJOR),
+            ]
+        )
+        # Act.
+        result = matcher.match(message)
+        # Assert.
+        assert result == expected
+
+
 class TestSemverRelease:
     class Test_compute_release_type:
         def test_with_no_prefixes_returns_no_release(self):
@@ -96,6 +158,133 @@ class TestSemverRelease:
             # Assert.
             assert result == ReleaseType.MAJOR
 
+        def test_with_commit_stream_consumes_generator(self):
+            # Arrange.
+            commits = (
+                Commit(hash=f"aaaaa{i}", message=message)
+                for i, message in enumerate(["chore: Nothing", "feat: Add something"])
+            )
+            release = SemverRelease(DEFAULT_CONFIG)
+            # Act.
+            result = release.compute_release_type(commits)
+            # Assert.
+            assert result == ReleaseType.MINOR
+
+        def test_with_major_stops_reading_and_closes_stream(self):
+            # Arrange.
+            consumed = []
+
+            def stream():
+                for message in ["fix: One", "major: Two", "feat: Three"]:
+                    consumed.append(message)
+                    yield Commit(hash="aaaaa1", message=message)
+
+            commits = stream()
+            release = SemverRelease(DEFAULT_CONFIG)
+            # Act.
+            result = release.compute_release_type(commits)
+            # Assert.
+            assert result == ReleaseType.MAJOR
+            assert consumed == ["fix: One", "major: Two"]
+            assert next(commits, None) is None
+
+        def test_with_no_major_prefix_stops_at_minor(self):
+            # Arrange.
+            config = SemverConfig(
+                **{
+                    **DEFAULT_CONFIG_DICT,
+                    "prefixes": [
+                        {"label": "feat", "type": "minor"},
+                        {"label": "fix", "type": "patch"},
+                    ],
+                }
+            )
+            commits = iter(
+                [
+                    Commit(hash="aaaaa1", message="feat: One"),
+                    Commit(hash="aaaaa2", message="fix: Two"),
+                ]
+            )
+            release = SemverRelease(config)
+            # Act.
+            result = release.compute_release_type(commits)
+            # Assert.
+            assert result == ReleaseType.MINOR
+            assert next(commits).message == "fix: Two"
+
+    class Test_classify_commits:
+        def test_with_commits_returns_release_type_and_matched_commits(self):
+            # Arrange.
+            commits = [
+                Commit(hash="aaaaa1", message="fix: One"),
+                Commit(hash="aaaaa2", message="chore: Two"),
+                Commit(hash="aaaaa3", message="feat: Three"),
+            ]
+            release = SemverRelease(DEFAULT_CONFIG)
+            # Act.
+            result = release.classify_commits(iter(commits))
+            # Assert.
+            assert result == ClassifiedCommits(
+                release_type=ReleaseType.MINOR, matched=[commits[0], commits[2]]
+            )
+            assert release.compute_release_type(result) == ReleaseType.MINOR
+
+    class Test_classify_commits_parallel:
+        def test_with_shards_matches_serial_scan(self, history_repo):
+            # Arrange.
+            release = SemverRelease(DEFAULT_CONFIG)
+            manager = GitManager(DEFAULT_CONFIG)
+            expected = release.classify_commits(manager.get_commit_messages_since(None))
+            # Act.
+            result = release.classify_commits_parallel(
+                manager, None, jobs=3, min_shard_size=4
+            )
+            # Assert.
+            assert result == expected
+            assert result.release_type == ReleaseType.MINOR
+            assert len(result.matched) == 12
+
+        def test_with_short_history_reads_in_process(self):
+            # Arrange.
+            manager = MagicMock()
+            manager.get_commit_hashes_since.return_value = ["aaaaa1", "aaaaa2"]
+            manager.get_commits_by_hash.return_value = [
+                Commit(hash="aaaaa1", message="fix: One"),
+                Commit(hash="aaaaa2", message="chore: Two"),
+            ]
+            release = SemverRelease(DEFAULT_CONFIG)
+            # Act.
+            result = release.classify_commits_parallel(manager, "v1.0.0", jobs=4)
+            # Assert.
+            manager.get_commit_hashes_since.assert_called_with("v1.0.0")
+            manager.get_commits_by_hash.assert_called_with(["aaaaa1", "aaaaa2"])
+            assert result.release_type == ReleaseType.PATCH
+
+    class Test_split_into_releases:
+        def test_with_tagged_history_yields_each_release(self):
+            # Arrange.
+            c = [
+                Commit(hash=f"aaaaa{index}", message=f"fix: {index}")
+                for index in range(5)
+            ]
+            tagged_commits = iter(
+                [
+                    (c[0], []),
+                    (c[1], ["v1.1.0", "v1.1.0-final"]),
+                    (c[2], ["nightly"]),
+                    (c[3], ["v1.0.0"]),
+                    (c[4], []),
+                ]
+            )
+            release = SemverRelease(DEFAULT_CONFIG)
+            # Act.
+            result = list(release.split_into_releases(tagged_commits))
+            # Assert.
+            assert result == [
+                (Tag("v1.1.0", 1, 1, 0), [c[1], c[2]]),
+                (Tag("v1.0.0", 1, 0, 0), [c[3], c[4]]),
+            ]
+
     class Test_get_matching_tags:
         TEST_TAGS = [
             "v0.1.0",
@@ -153,6 +342,54 @@ class TestSemverRelease:
             # Assert.
             assert result == Tag("ver_1-2-3", 1, 2, 3)
 
+    class Test_get_tag_glob:
+        @pytest.mark.parametrize(
+            "format, expected",
+            [
+                ("v%M.%m.%p", "v*.*.*"),
+                ("ver_%M-%m-%p", "ver_*-*-*"),
+                ("%m.%M.%p", None),
+                ("v%M.%m", None),
+                ("v%M.%m.%p.%p", None),
+            ],
+        )
+        def test_with_format_returns_glob_if_sortable(self, format, expected):
+            # Arrange.
+            config = SemverConfig(**{**DEFAULT_CONFIG_DICT, "format": format})
+            release = SemverRelease(config)
+            # Act.
+            result = release.get_tag_glob()
+            # Assert.
+            assert result == expected
+
+    class Test_find_biggest_tag:
+        def test_with_sorted_stream_stops_after_biggest_version(self):
+            # Arrange.
+            def tag_names():
+                yield "v2.0.0-rc1"
+                yield "v2.0.0"
+                yield "vnightly.1.2"
+                yield "v1.9.0"
+                raise AssertionError("Read past the biggest version")
+
+            stream = tag_names()
+            release = SemverRelease(DEFAULT_CONFIG)
+            # Act.
+            result = release.find_biggest_tag(stream)
+            # Assert.
+            assert result == Tag("v2.0.0", 2, 0, 0)
+            # Same as the full scan over `git tag` output, which is sorted by name.
+            assert result == release.get_biggest_tag(["v1.9.0", "v2.0.0", "v2.0.0-rc1"])
+            assert stream.gi_frame is None
+
+        def test_with_no_matching_tags_returns_none(self):
+            # Arrange.
+            release = SemverRelease(DEFAULT_CONFIG)
+            # Act.
+            result = release.find_biggest_tag(["nightly", "other"])
+            # Assert.
+            assert result is None
+
     class Test_compute_next_version:
         def test_with_no_existing_tags_returns_default_value(self):
             # Arrange.
@@ -0,0 +1,39 @@
+"""Test atomic_file module."""
+
+import os
+
+import pytest
+
+from pagekey_semver.util.atomic_file import atomic_write
+
+
+def test_atomic_write_with_existing_file_replaces_it_and_keeps_mode(tmp_path):
+    # Arrange.
+    path = tmp_path / "CHANGELOG.md"
+    path.write_text("old\n")
+    os.chmod(path, 0o640)
+
+    # Act.
+    with atomic_write(str(path)) as file_handle:
+        file_handle.write("new\n")
+
+    # Assert.
+    assert path.read_text() == "new\n"
+    assert os.stat(path).st_mode & 0o777 == 0o640
+    assert os.listdir(tmp_path) == ["CHANGELOG.md"]
+
+
+def test_atomic_write_with_error_leaves_file_untouched(tmp_path):
+    # Arrange.
+    path = tmp_path / "CHANGELOG.md"
+    path.write_text("old\n")
+
+    # Act.
+    with pytest.raises(RuntimeError):
+        with atomic_write(str(path)) as file_handle:
+            file_handle.write("partial")
+            raise RuntimeError("boom")
+
+    # Assert.
+    assert path.read_text() == "old\n"
+    assert os.listdir(tmp_path) == ["CHANGELOG.md"]
@@ -71,3 +71,58 @@ class TestSubprocessCommandRunner:
             assert result.exit_code == 1
             assert result.stdout == "hello world\n"
             assert result.stderr == "none\n"
+
+        def test_with_stdin_passes_it_to_command(self):
+            # Arrange.
+            runner = SubprocessCommandRunner()
+
+            # Act.
+            result = runner.run("tr a-z A-Z", stdin="hello\n")
+
+            # Assert.
+            assert result.stdout == "HELLO\n"
+
+        def test_with_env_adds_it_to_environment(self, monkeypatch):
+            # Arrange.
+            monkeypatch.setenv("SEMVER_TEST_KEPT", "kept")
+            runner = SubprocessCommandRunner()
+
+            # Act.
+            result = runner.run(
+                'echo "$SEMVER_TEST_KEPT $SEMVER_TEST_ADDED"',
+                env={"SEMVER_TEST_ADDED": "added"},
+            )
+
+            # Assert.
+            assert result.stdout == "kept added\n"
+
+    class Test_stream:
+        def test_with_successful_command_yields_stdout(self):
+            # Arrange.
+            runner = SubprocessCommandRunner()
+
+            # Act.
+            result = b"".join(runner.stream("printf 'hello\\0world'", chunk_size=4))
+
+            # Assert.
+            assert result == b"hello\0world"
+
+        def test_with_failed_command_raises_error(self):
+            # Arrange.
+            runner = SubprocessCommandRunner()
+
+            # Act, Assert.
+            with pytest.raises(CommandRunnerException):
+                list(runner.stream("echo oops >&2; exit 3"))
+
+        def test_with_early_close_stops_command(self):
+            # Arrange.
+            runner = SubprocessCommandRunner()
+            chunks = runner.stream("yes", chunk_size=16)
+
+            # Act.
+            first = next(chunks)
+            chunks.close()
+
+            # Assert.
+            assert first.startswith(b"y\n")
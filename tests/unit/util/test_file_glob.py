@@ -0,0 +1,118 @@
+"""Test file_glob module."""
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+from pagekey_semver.util.file_glob import expand_glob, is_glob
+
+
+MODULE_UNDER_TEST = "pagekey_semver.util.file_glob"
+
+
+@pytest.fixture
+def monorepo(tmp_path, monkeypatch):
+    for path in [
+        "package.json",
+        "packages/a/package.json",
+        "packages/b/package.json",
+        "packages/b/README.md",
+        "packages/b/node_modules/dep/package.json",
+        "tools/deep/nested/package.json",
+        ".cache/package.json",
+    ]:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text("{}")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.mark.parametrize(
+    "pattern, expected",
+    [
+        ("package.json", False),
+        ("packages/*/package.json", True),
+        ("**/package.json", True),
+        ("version-?.txt", True),
+        ("[ab].json", True),
+    ],
+)
+def test_is_glob(pattern, expected):
+    # Act, Assert.
+    assert is_glob(pattern) == expected
+
+
+class Test_expand_glob:
+    def test_with_double_star_matches_every_directory(self, monorepo):
+        # Act.
+        result = expand_glob("**/package.json")
+
+        # Assert.
+        assert result == [
+            "package.json",
+            "packages/a/package.json",
+            "packages/b/node_modules/dep/package.json",
+            "packages/b/package.json",
+            "tools/deep/nested/package.json",
+        ]
+
+    def test_with_exclude_skips_excluded_directories(self, monorepo):
+        # Arrange.
+        listed = []
+        scandir = os.scandir
+
+        def record_scandir(path):
+            listed.append(path)
+            return scandir(path)
+
+        # Act.
+        with patch(f"{MODULE_UNDER_TEST}.os.scandir", side_effect=record_scandir):
+            result = expand_glob("**/package.json", exclude=["node_modules", "tools"])
+
+        # Assert.
+        assert result == [
+            "package.json",
+            "packages/a/package.json",
+            "packages/b/package.json",
+        ]
+        assert "packages/b/node_modules" not in listed
+        assert "tools" not in listed
+
+    def test_with_wildcard_component_only_lists_matching_directories(self, monorepo):
+        # Arrange.
+        listed = []
+        scandir = os.scandir
+
+        def record_scandir(path):
+            listed.append(path)
+            return scandir(path)
+
+        # Act.
+        with patch(f"{MODULE_UNDER_TEST}.os.scandir", side_effect=record_scandir):
+            result = expand_glob("packages/*/package.json")
+
+        # Assert.
+        assert result == ["packages/a/package.json", "packages/b/package.json"]
+        assert listed == ["packages"]
+
+    def test_with_exclude_path_pattern_skips_matching_files(self, monorepo):
+        # Act.
+        result = expand_glob("packages/*/*", exclude=["packages/b/*.md"])
+
+        # Assert.
+        assert result == ["packages/a/package.json", "packages/b/package.json"]
+
+    def test_with_absolute_pattern_returns_absolute_paths(self, monorepo):
+        # Act.
+        result = expand_glob(str(monorepo / "packages" / "?" / "package.json"))
+
+        # Assert.
+        assert result == [
+            str(monorepo / "packages" / "a" / "package.json"),
+            str(monorepo / "packages" / "b" / "package.json"),
+        ]
+
+    def test_with_no_match_returns_empty_list(self, monorepo):
+        # Act, Assert.
+        assert expand_glob("missing/**/*.toml") == []
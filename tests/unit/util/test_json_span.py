@@ -0,0 +1,62 @@
+"""Test json_span module."""
+
+import pytest
+
+from pagekey_semver.util.json_span import find_value_span
+
+
+DOCUMENT = b"""{
+  "name": "demo [v1] {x}",
+  "escaped \\"key\\"": "a \\" } ] value",
+  "list": [1, {"version": "nested"}, [[]], "]"],
+  "number": -1.5e3,
+  "project" : { "metadata": {"version" :"0.1.0"}, "flag": true },
+  "version": "0.1.0"
+}
+"""
+
+
+class Test_find_value_span:
+    @pytest.mark.parametrize(
+        "path, expected",
+        [
+            ("version", b'"0.1.0"'),
+            ("project.metadata.version", b'"0.1.0"'),
+            ("project.metadata", b'{"version" :"0.1.0"}'),
+            ('escaped "key"', b'"a \\" } ] value"'),
+            ("list", b'[1, {"version": "nested"}, [[]], "]"]'),
+            ("number", b"-1.5e3"),
+            ("project.flag", b"true"),
+        ],
+    )
+    def test_with_existing_key_returns_span_of_value(self, path, expected):
+        # Act.
+        start, end = find_value_span(DOCUMENT, path)
+
+        # Assert.
+        assert DOCUMENT[start:end] == expected
+
+    @pytest.mark.parametrize(
+        "path", ["missing", "project.missing.version", "name.version", "list.version"]
+    )
+    def test_with_missing_key_returns_none(self, path):
+        # Act.
+        result = find_value_span(DOCUMENT, path)
+
+        # Assert.
+        assert result is None
+
+    def test_with_custom_separator_splits_path(self):
+        # Act.
+        start, end = find_value_span(DOCUMENT, "project/metadata/version", sep="/")
+
+        # Assert.
+        assert DOCUMENT[start:end] == b'"0.1.0"'
+
+    @pytest.mark.parametrize(
+        "document", [b'{"list": [1, 2, "version": "0.1.0"}', b'{"a" 1}', b'{"a": ]}']
+    )
+    def test_with_invalid_document_raises_error(self, document):
+        # Act, Assert.
+        with pytest.raises(ValueError):
+            find_value_span(document, "version")
@@ -0,0 +1,57 @@
+"""Test lazy_import module."""
+
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from pagekey_semver.util.lazy_import import lazy_import
+
+
+MODULE_UNDER_TEST = "pagekey_semver.util.lazy_import"
+
+
+@pytest.fixture
+def slow_module(tmp_path, monkeypatch):
+    (tmp_path / "semver_slow_module.py").write_text("VALUE = 42\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield "semver_slow_module"
+    sys.modules.pop("semver_slow_module", None)
+
+
+def test_lazy_import_imports_on_first_attribute_use(slow_module):
+    # Arrange.
+    module = lazy_import(slow_module)
+    assert slow_module not in sys.modules
+
+    # Act.
+    result = module.VALUE
+
+    # Assert.
+    assert result == 42
+    assert slow_module in sys.modules
+
+
+def test_lazy_import_with_patched_attribute_restores_it(slow_module):
+    # Arrange.
+    module = lazy_import(slow_module)
+
+    # Act.
+    with patch.object(module, "VALUE", 7):
+        patched = module.VALUE
+
+    # Assert.
+    assert patched == 7
+    assert module.VALUE == 42
+
+
+def test_lazy_import_with_dunder_attribute_does_not_import(slow_module):
+    # Arrange.
+    module = lazy_import(slow_module)
+
+    # Act.
+    result = hasattr(module, "__wrapped__")
+
+    # Assert.
+    assert result is False
+    assert slow_module not in sys.modules
@@ -0,0 +1,130 @@
+"""Test sed_script module."""
+
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from pagekey_semver.util.sed_script import SedScriptException, compile_script
+
+
+INPUT = (
+    'name = "demo"\n'
+    'version = "0.1.0"\n'
+    "[tool.other]\n"
+    'version = "0.1.0"\n'
+    "Version: 0.1.0 (0.1.0)\n"
+    "a+b (c) {d} x|y $5 ^up\n"
+    "last 0.1.0"
+)
+SCRIPTS = [
+    's/^version = ".*"/version = "1.2.3"/',
+    "s/0\\.1\\.0/1.2.3/g",
+    "s/0\\.1\\.0/1.2.3/2",
+    "s/0\\.1\\.0/1.2.3/2g",
+    "s/version/release/I",
+    "s|0.1.0|1.2.3|",
+    "s/\\(Version: \\)[0-9.]*/\\11.2.3/",
+    "s/[[:digit:]]\\{1,\\}/N/g",
+    "s/[^0-9 ]*/<&>/",
+    "s/a+b (c) {d} x|y/literal/",
+    "s/\\$5 \\^up/cash/",
+    "s/o\\+/0/g",
+    "s/\\<version\\>/VERSION/",
+    "2s/0/9/",
+    "$s/0/9/",
+    "/^\\[tool/,/^version/s/0\\.1\\.0/2.0.0/",
+    "/^\\[tool/,$s/0/7/g",
+    "2,3s/^/> /",
+    "4,2s/^/> /",
+    "/^version/!s/0/Z/",
+    "1,/demo/s/^/# /",
+    "s/0/A/;s/A/B/\n/last/s/1/one/",
+    "\\,^name,s,demo,DEMO,",
+    "s/.*/[&]/",
+    "s/x*/-/g",
+]
+
+
+class TestSedScript:
+    @pytest.mark.skipif(shutil.which("sed") is None, reason="sed is not installed")
+    @pytest.mark.parametrize("script", SCRIPTS)
+    def test_apply_matches_sed(self, script):
+        # Arrange.
+        expected = subprocess.run(
+            ["sed", "-e", script],
+            input=INPUT.encode(),
+            capture_output=True,
+            check=True,
+            env={"LC_ALL": "C"},
+        ).stdout.decode()
+
+        # Act.
+        result = "".join(compile_script(script).apply(INPUT.splitlines(True)))
+
+        # Assert.
+        assert result == expected
+
+    @pytest.mark.parametrize(
+        "script",
+        [
+            "/x/d",
+            "s/a/b/w out.txt",
+            "s/a/\\Ub/",
+            "s/a/b",
+            "s//b/",
+            "s/\\(a/b/",
+            "s/a/\\1/",
+            "0,/a/s/a/b/",
+            "1~2s/a/b/",
+            "/a/,+2s/a/b/",
+            "s/[[:word:]]/b/",
+            "s/a\\|ab/X/",
+            "s/\\(0\\|1\\)\\.1/X/g",
+        ],
+    )
+    def test_compile_script_with_unsupported_script_raises_error(self, script):
+        # Act, Assert.
+        with pytest.raises(SedScriptException):
+            compile_script(script)
+
+    def test_apply_to_file_keeps_line_endings_and_bytes(self, tmp_path):
+        # Arrange.
+        path = tmp_path / "file.txt"
+        path.write_bytes(b"version=0.1.0\r\n\xff\xfe 0.1.0\nno newline 0.1.0")
+
+        # Act.
+        compile_script("s/0\\.1\\.0/1.0.0/").apply_to_file(str(path))
+
+        # Assert.
+        assert path.read_bytes() == (
+            b"version=1.0.0\r\n\xff\xfe 1.0.0\nno newline 1.0.0"
+        )
+        assert [entry.name for entry in tmp_path.iterdir()] == ["file.txt"]
+
+    def test_apply_to_file_with_no_change_does_not_write_file(self, tmp_path):
+        # Arrange.
+        path = tmp_path / "file.txt"
+        path.write_text("version=1.0.0\n")
+        modified = path.stat().st_mtime_ns - 10**9
+        os.utime(path, ns=(modified, modified))
+
+        # Act.
+        result = compile_script("s/0\\.1\\.0/1.0.0/").apply_to_file(str(path))
+
+        # Assert.
+        assert result is False
+        assert path.stat().st_mtime_ns == modified
+
+    def test_apply_to_file_with_late_change_keeps_earlier_lines(self, tmp_path):
+        # Arrange.
+        path = tmp_path / "file.txt"
+        path.write_bytes(b"a\r\n\xff b\n" * 1000 + b"version=0.1.0\nz")
+
+        # Act.
+        result = compile_script("s/0\\.1\\.0/1.0.0/").apply_to_file(str(path))
+
+        # Assert.
+        assert result is True
+        assert path.read_bytes() == b"a\r\n\xff b\n" * 1000 + b"version=1.0.0\nz"
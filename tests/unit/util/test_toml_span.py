@@ -0,0 +1,85 @@
+"""Test toml_span module."""
+
+import pytest
+
+from pagekey_semver.util.toml_span import find_value_span
+
+
+DOCUMENT = """# version = "not this"
+title = "demo" # [not.a.table]
+description = \"\"\"
+[tool.poetry]
+version = "not this either"
+\"\"\"
+literal = '''
+version = 'nope'
+'''
+matrix = [
+  [1, 2],  # ]
+  ["]", '['],
+]
+inline = { version = "inline" }
+date = 1979-05-27 07:32:00Z
+
+[tool.poetry]
+name = "demo"
+version = "0.1.0"   # The version
+
+[ tool . "other.table" ]
+version='0.2.0'
+
+[[tool.items]]
+version = "0.3.0"
+
+[project]
+metadata.version = 7
+"""
+
+
+class Test_find_value_span:
+    @pytest.mark.parametrize(
+        "path, expected",
+        [
+            ("tool.poetry.version", '"0.1.0"'),
+            ("tool.other.table.version", None),
+            ("project.metadata.version", "7"),
+            ("date", "1979-05-27 07:32:00Z"),
+            (
+                "matrix",
+                """[
+  [1, 2],  # ]
+  ["]", '['],
+]""",
+            ),
+            ("title", '"demo"'),
+        ],
+    )
+    def test_with_key_returns_span_of_value(self, path, expected):
+        # Act.
+        span = find_value_span(DOCUMENT, path)
+
+        # Assert.
+        assert (span and DOCUMENT[span[0] : span[1]]) == expected
+
+    def test_with_quoted_table_key_uses_custom_separator(self):
+        # Act.
+        start, end = find_value_span(DOCUMENT, "tool/other.table/version", sep="/")
+
+        # Assert.
+        assert DOCUMENT[start:end] == "'0.2.0'"
+
+    @pytest.mark.parametrize(
+        "path", ["version", "inline.version", "tool.items.version", "tool.missing"]
+    )
+    def test_with_unreachable_key_returns_none(self, path):
+        # Act.
+        result = find_value_span(DOCUMENT, path)
+
+        # Assert.
+        assert result is None
+
+    @pytest.mark.parametrize("document", ['a = "open\n', "a = [1, 2\n", "= 1\n"])
+    def test_with_invalid_document_raises_error(self, document):
+        # Act, Assert.
+        with pytest.raises(ValueError):
+            find_value_span(document, "b")
@@ -0,0 +1,85 @@
+"""Test yaml_span module."""
+
+import pytest
+
+from pagekey_semver.util.yaml_span import find_value_span
+
+
+DOCUMENT = """%YAML 1.2
+---
+# version: not this
+name: demo
+description: |
+  version: not this either
+  image:
+    tag: nope
+image:
+  repository: "registry/demo" # Repo
+  tag: 0.1.0 # The tag
+  pullPolicy: IfNotPresent
+args: ["--version: x", {a: b}]
+containers:
+  - name: app
+    version: in a sequence
+  - image:
+      tag: also in a sequence
+anchored: &base
+  version: '0.2.0'
+"quoted key": "0.3.0"
+url: http://example.com:8080/x
+"""
+
+
+class Test_find_value_span:
+    @pytest.mark.parametrize(
+        "path, expected",
+        [
+            ("image.tag", "0.1.0"),
+            ("image.repository", '"registry/demo"'),
+            ("anchored.version", "'0.2.0'"),
+            ("quoted key", '"0.3.0"'),
+            ("url", "http://example.com:8080/x"),
+            ("name", "demo"),
+        ],
+    )
+    def test_with_key_returns_span_of_scalar(self, path, expected):
+        # Act.
+        start, end = find_value_span(DOCUMENT, path)
+
+        # Assert.
+        assert DOCUMENT[start:end] == expected
+
+    @pytest.mark.parametrize(
+        "path",
+        [
+            "version",
+            "description",
+            "image",
+            "containers.version",
+            "containers.image.tag",
+            "missing.key",
+            "args",
+        ],
+    )
+    def test_with_unsupported_or_missing_value_returns_none(self, path):
+        # Act.
+        result = find_value_span(DOCUMENT, path)
+
+        # Assert.
+        assert result is None
+
+    @pytest.mark.parametrize(
+        "document",
+        [
+            "name: demo\n---\nversion: 0.2.0\n",
+            "version: 0.1.0\n  continued\n",
+            "version: &v 0.1.0\n",
+            "list: [a,\n  b]\nversion: 0.1.0\n",
+        ],
+    )
+    def test_with_ambiguous_document_returns_none(self, document):
+        # Act.
+        result = find_value_span(document, "version")
+
+        # Assert.
+        assert result is None